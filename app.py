@@ -1,35 +1,128 @@
-from flask import Flask, render_template, request, jsonify
-from modules.data_collector import DataCollector
-from modules.sentiment_analyzer import SentimentAnalyzer
+from flask import Flask, render_template, request, jsonify, url_for, Response, g, has_request_context
+from modules.data_collector import DataCollector, get_collection_flight_stats, get_resolution_cache
+from modules.sentiment_analyzer import SentimentAnalyzer, get_sentiment_memo
 from modules.risk_assessor import RiskAssessor
 from modules.report_generator import ReportGenerator
 import os
+import json
+import queue
 import time
 from dotenv import load_dotenv
 import logging
 from autogen_flows.flows import run_underwriter_workflow
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+from autogen_flows.flows.underwriter_workflow import get_workflow_flight_stats
+from autogen_flows.flows.job_manager import get_job_manager, get_job_stats, JobQueueFullError, JOB_SUCCEEDED, JOB_FAILED
+from autogen_flows.flows.agent_pool import get_agent_pool_stats
+from autogen_flows.flows.batch import BatchRunner
+from autogen_flows.config.config import config
+from autogen_flows.utils import json_default
+from autogen_flows.utils.llm_utils import get_cache_stats
+from autogen_flows.utils.rate_limiter import get_rate_limiter_stats
+from modules.tracing import start_trace, trace_in_report
+from modules.metrics import counter, histogram, register_collector, render_metrics, cache_samples, metrics_enabled
+from modules.log_utils import configure_logging
 
 load_dotenv()
 
+# Configure logging (LOG_LEVEL, LOG_FORMAT; records are written by a queue listener thread)
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 
+# Seconds between keep-alive comments on an idle progress stream
+SSE_HEARTBEAT_SECONDS = 15
+
 # Initialize modules
 data_collector = DataCollector()
 sentiment_analyzer = SentimentAnalyzer()
 risk_assessor = RiskAssessor()
 report_generator = ReportGenerator()
 
+http_requests = counter("underwriter_http_requests_total", "HTTP requests by route, method and status",
+                        ("route", "method", "status"))
+http_request_seconds = histogram("underwriter_http_request_duration_seconds",
+                                 "HTTP request latency until the response is closed (streams included)",
+                                 ("route", "method"))
+fallback_reports = counter("underwriter_fallback_reports_total",
+                           "Reports served by the traditional flow after the workflow failed", ("route",))
+sample_data_fallbacks = counter("underwriter_sample_data_fallbacks_total",
+                                "Analyses that fell back to sample data", ("route", "reason"))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Routes are labelled by their rule, e.g. /api/jobs/<job_id>, to keep label values bounded
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    method = request.method
+    start = g.get('request_start', time.perf_counter())
+    http_requests.inc(route=route, method=method, status=str(response.status_code))
+    # Streamed responses (SSE, NDJSON) are only finished when the server closes them
+    response.call_on_close(
+        lambda: http_request_seconds.observe(time.perf_counter() - start, route=route, method=method)
+    )
+    return response
+
+def collect_component_metrics():
+    """Report the statistics kept by caches, rate limiters, single-flight groups and pools at scrape time"""
+    families = cache_samples({
+        "xano_responses": data_collector.response_cache.stats() if data_collector.response_cache is not None else {},
+        "yelp_resolution": get_resolution_cache().stats(),
+        "llm_responses": get_cache_stats(),
+        "sentiment_memo": get_sentiment_memo().stats() if get_sentiment_memo() is not None else {}
+    })
+    
+    limiters = get_rate_limiter_stats()
+    families += [
+        ("underwriter_llm_rate_limited_calls_total", "counter", "LLM calls admitted by the rate limiter",
+         [({"limiter": name}, stats["calls"]) for name, stats in limiters.items()]),
+        ("underwriter_llm_rate_limit_delayed_total", "counter", "LLM calls that waited for rate limit capacity",
+         [({"limiter": name}, stats["delayed"]) for name, stats in limiters.items()]),
+        ("underwriter_llm_rate_limit_wait_seconds_total", "counter", "Time LLM calls spent waiting for capacity",
+         [({"limiter": name}, stats["wait_seconds"]) for name, stats in limiters.items()]),
+        ("underwriter_llm_throttled_total", "counter", "429 responses that paused the provider/model",
+         [({"limiter": name}, stats["throttled"]) for name, stats in limiters.items()]),
+        ("underwriter_llm_rate_limit_timeouts_total", "counter", "LLM calls that gave up waiting for capacity",
+         [({"limiter": name}, stats["timeouts"]) for name, stats in limiters.items()]),
+        ("underwriter_llm_in_flight", "gauge", "LLM calls currently in flight",
+         [({"limiter": name}, stats["in_flight"]) for name, stats in limiters.items()])
+    ]
+    
+    flights = {"workflow": get_workflow_flight_stats(), "collection": get_collection_flight_stats()}
+    families += [
+        ("underwriter_single_flight_executions_total", "counter", "Calls that ran the shared work",
+         [({"group": name}, stats["executions"]) for name, stats in flights.items()]),
+        ("underwriter_single_flight_coalesced_total", "counter", "Calls that joined an in-flight call",
+         [({"group": name}, stats["coalesced"]) for name, stats in flights.items()]),
+        ("underwriter_single_flight_in_flight", "gauge", "Shared calls currently running",
+         [({"group": name}, stats["in_flight"]) for name, stats in flights.items()])
+    ]
+    
+    jobs = get_job_stats()
+    if jobs:
+        families.append(("underwriter_jobs", "gauge", "Background jobs by status",
+                         [({"status": status}, count) for status, count in jobs["jobs"].items()]))
+    pool = get_agent_pool_stats()
+    if pool:
+        families.append(("underwriter_agent_pool_idle", "gauge", "Agent sets idle in the pool", [({}, pool["idle"])]))
+        families.append(("underwriter_agent_pool_size", "gauge", "Agent sets the pool holds", [({}, pool["size"])]))
+    return families
+
+register_collector(collect_component_metrics)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
+    with start_trace("analyze_form", data_source=request.form.get('data_source', 'sample')):
+        return _analyze_form()
+
+def _analyze_form():
     # Get form data
     data_source = request.form.get('data_source', 'sample')
     form_id = request.form.get('form_id')
@@ -42,30 +135,18 @@ def analyze():
         return render_template('error.html', error="Either Form ID, Business ID, or Restaurant Name and Address are required"), 400
     
     try:
-        # Determine which method to use to fetch data
-        if business_id:
-            logger.info(f"Fetching data from Yelp API with business ID: {business_id}")
-            data = data_collector.get_xano_data(business_id=business_id)
-        elif form_id:
-            logger.info(f"Fetching data from Xano API with form ID: {form_id}")
-            data = data_collector.get_xano_data(form_id=form_id)
-        elif restaurant_name and restaurant_address:
-            logger.info(f"Fetching data using restaurant name and address: {restaurant_name}, {restaurant_address}")
-            # Create a temporary data structure to make a restaurant lookup
-            yelp_data = data_collector.get_yelp_reviews(restaurant_name=restaurant_name, restaurant_address=restaurant_address)
-            if yelp_data and "data" in yelp_data and yelp_data["data"] and len(yelp_data["data"]) > 0:
-                business_id = yelp_data["data"][0].get("id", None)
-                if business_id:
-                    logger.info(f"Found business ID: {business_id}, fetching full details")
-                    data = data_collector.get_xano_data(business_id=business_id)
-                else:
-                    logger.warning("No business ID found for the provided name and address")
-                    data = data_collector.get_sample_data()
-            else:
-                logger.warning("Failed to find business with provided name and address")
-                data = data_collector.get_sample_data()
-        else:
-            logger.info("Using sample data")
+        # Collect with whichever identifiers were given (sample data if none); name and
+        # address are resolved to a business ID once and the full payload fetched once
+        logger.info(f"Collecting data for form ID: {form_id}, business ID: {business_id}, " +
+                    f"restaurant: {restaurant_name}, {restaurant_address}")
+        data, business_id = data_collector.collect_restaurant_data(
+            form_id=form_id,
+            business_id=business_id,
+            restaurant_name=restaurant_name,
+            restaurant_address=restaurant_address
+        )
+        if data is None:
+            logger.warning("Failed to find business with provided name and address")
             data = data_collector.get_sample_data()
         
         # Log what we got
@@ -114,6 +195,7 @@ def analyze():
             
             # Add a note that this is a fallback report
             report["fallback_report"] = True
+            fallback_reports.inc(route="/analyze")
             report["error_message"] = str(e)
             
             return render_template('report.html', report=report)
@@ -129,6 +211,31 @@ def api_analyze():
     if not data:
         return jsonify({"error": "No data provided"}), 400
     
+    payload, status_code = analyze_api_request(data)
+    return jsonify(payload), status_code
+
+def analyze_api_request(data, progress_callback=None):
+    """Collect data for and analyze the restaurant identified by an API request body
+    
+    The analysis is traced; the trace is added to the report as "trace" when the
+    body sets include_trace or TRACE_IN_REPORT is on.
+    
+    Args:
+        data (dict): Request body with form_id, business_id or restaurant_name and restaurant_address
+        progress_callback (callable, optional): Called as progress_callback(event, payload) as
+            workflow stages complete
+        
+    Returns:
+        tuple: (JSON-serializable response body, HTTP status code)
+    """
+    with start_trace("analyze", **_request_fields(data)) as trace:
+        payload, status_code = _analyze_api_request(data, progress_callback)
+    if trace is not None and status_code == 200 and (_flag(data.get('include_trace')) or trace_in_report()):
+        payload = dict(payload, trace=trace.to_dict())
+    return payload, status_code
+
+def _analyze_api_request(data, progress_callback):
+    """Body of analyze_api_request, run inside its trace"""
     # Extract request parameters
     form_id = data.get('form_id')
     business_id = data.get('business_id')
@@ -136,53 +243,34 @@ def api_analyze():
     restaurant_address = data.get('restaurant_address')
     
     try:
-        # Determine which method to use to fetch data
-        if business_id:
-            # Fetch data using Yelp business ID
-            logger.info(f"API: Fetching data with Yelp business ID: {business_id}")
-            restaurant_data = data_collector.get_xano_data(business_id=business_id)
-            if not restaurant_data:
-                return jsonify({"error": "Failed to fetch data from Yelp API with business ID"}), 500
-        elif form_id:
-            # Fetch data from Xano API using form ID
-            logger.info(f"API: Fetching data with form ID: {form_id}")
-            restaurant_data = data_collector.get_xano_data(form_id=form_id)
-            if not restaurant_data:
-                return jsonify({"error": "Failed to fetch data from API with form ID"}), 500
-        elif restaurant_name and restaurant_address:
-            # Fetch data using restaurant name and address
-            logger.info(f"API: Fetching data with restaurant name and address: {restaurant_name}, {restaurant_address}")
-            # First lookup the business ID
-            yelp_data = data_collector.get_yelp_reviews(restaurant_name=restaurant_name, restaurant_address=restaurant_address)
-            if yelp_data and "data" in yelp_data and yelp_data["data"] and len(yelp_data["data"]) > 0:
-                business_id = yelp_data["data"][0].get("id", None)
-                if business_id:
-                    logger.info(f"API: Found business ID: {business_id}, fetching full details")
-                    restaurant_data = data_collector.get_xano_data(business_id=business_id)
-                    if not restaurant_data:
-                        return jsonify({"error": "Failed to fetch data for found business ID"}), 500
-                else:
-                    logger.warning("API: No business ID found for the provided name and address")
-                    restaurant_data = data_collector.get_sample_data()
-            else:
-                logger.warning("API: Failed to find business with provided name and address")
-                restaurant_data = data_collector.get_sample_data()
-        else:
-            # Use sample data
-            logger.info("API: No identifiers provided, using sample data")
+        # Collect with whichever identifiers were given (sample data if none); name and
+        # address are resolved to a business ID once and the full payload fetched once
+        logger.info(f"API: Collecting data for form ID: {form_id}, business ID: {business_id}, " +
+                    f"restaurant: {restaurant_name}, {restaurant_address}")
+        restaurant_data, business_id = data_collector.collect_restaurant_data(
+            form_id=form_id,
+            business_id=business_id,
+            restaurant_name=restaurant_name,
+            restaurant_address=restaurant_address
+        )
+        if restaurant_data is None:
+            logger.warning("API: Failed to find business with provided name and address")
             restaurant_data = data_collector.get_sample_data()
+            sample_data_fallbacks.inc(route=_current_route(), reason="business_not_found")
     except Exception as e:
         logger.error(f"API: Error fetching data: {str(e)}")
-        return jsonify({"error": f"Error fetching data: {str(e)}"}), 500
+        return {"error": f"Error fetching data: {str(e)}"}, 500
     
     # Check for required data fields
     if not restaurant_data.get('reviews'):
         logger.warning("API: No reviews found in data, using sample data instead")
         restaurant_data = data_collector.get_sample_data()
+        sample_data_fallbacks.inc(route=_current_route(), reason="no_reviews")
         
     if not restaurant_data.get('business_details'):
         logger.warning("API: No business details found in data, using sample data instead")
         restaurant_data = data_collector.get_sample_data()
+        sample_data_fallbacks.inc(route=_current_route(), reason="no_business_details")
     
     # Try to use the AutoGen workflow
     try:
@@ -194,9 +282,10 @@ def api_analyze():
             data_source="xano", 
             identifier=identifier,
             form_id=form_id,
-            business_id=business_id
+            business_id=business_id,
+            progress_callback=progress_callback
         )
-        return jsonify(result)
+        return result, 200
     except Exception as e:
         logger.error(f"API: Error in underwriter workflow: {str(e)}")
         # Fallback to our traditional flow
@@ -206,13 +295,187 @@ def api_analyze():
             overall_sentiment = sentiment_analyzer.get_overall_sentiment(analyzed_reviews)
             risk_assessment = risk_assessor.assess_risk(overall_sentiment, fallback_data['business_details'])
             report = report_generator.generate_report(fallback_data['business_details'], overall_sentiment, risk_assessment)
-            return jsonify(report)
+            fallback_reports.inc(route=_current_route())
+            return report, 200
         except Exception as fallback_error:
             logger.error(f"API: Error in fallback flow: {str(fallback_error)}")
-            return jsonify({"error": "An error occurred during analysis"}), 500
+            return {"error": "An error occurred during analysis"}, 500
+
+def _current_route():
+    """The route rule of the current request, or "job" for analyses run by the job manager and batches"""
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return "job"
+
+def _run_analysis_job(data):
+    """Job body for /api/jobs: run the API analysis and fail the job on an error response"""
+    payload, status_code = analyze_api_request(data)
+    if status_code != 200:
+        raise RuntimeError(payload.get("error", "Analysis failed"))
+    return payload
+
+def _flag(value):
+    """Read a boolean request field: JSON booleans as they are, strings like the env flags (true, 1, t)"""
+    if isinstance(value, bool):
+        return value
+    return value is not None and str(value).lower() in ('true', '1', 't')
+
+def _request_fields(data):
+    """The request fields reported with a job's status and a trace"""
+    return {key: data.get(key) for key in ('form_id', 'business_id', 'restaurant_name', 'restaurant_address')}
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an analysis (same body as /api/analyze) and return its job ID immediately"""
+    data = request.json
+    
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    description = _request_fields(data)
+    try:
+        job_id = get_job_manager().submit(_run_analysis_job, data, description=description)
+    except JobQueueFullError as e:
+        logger.warning(f"API: Rejecting job: {str(e)}")
+        return jsonify({"error": str(e)}), 503
+    
+    response = jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": url_for('job_status', job_id=job_id),
+        "result_url": url_for('job_result', job_id=job_id)
+    })
+    response.headers['Location'] = url_for('job_status', job_id=job_id)
+    return response, 202
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Get the status of a queued analysis"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job ID"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """Get the report of a finished analysis (202 with the status while it is still pending)"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job ID"}), 404
+    if job.status == JOB_SUCCEEDED:
+        return jsonify(job.result)
+    if job.status == JOB_FAILED:
+        return jsonify(job.to_dict()), 500
+    return jsonify(job.to_dict()), 202
+
+def _run_streamed_analysis_job(data, events):
+    """Job body for /api/analyze/stream: run the API analysis, queueing progress events for the stream"""
+    def progress(event, payload):
+        events.put((event, payload))
+    
+    try:
+        payload, status_code = analyze_api_request(data, progress_callback=progress)
+    except Exception as e:
+        events.put(("error", {"error": str(e)}))
+        raise
+    if status_code != 200:
+        events.put(("error", payload))
+        raise RuntimeError(payload.get("error", "Analysis failed"))
+    events.put(("complete", payload))
+    return payload
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(payload, default=json_default)}\n\n"
+
+def _stream_events(job, events):
+    """Yield a job's progress events as Server-Sent Events until it completes or fails"""
+    yield _sse_event("job", job)
+    while True:
+        try:
+            event, payload = events.get(timeout=SSE_HEARTBEAT_SECONDS)
+        except queue.Empty:
+            # Comment line: keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
+            continue
+        yield _sse_event(event, payload)
+        if event in ("complete", "error"):
+            return
+
+@app.route('/api/analyze/stream', methods=['GET', 'POST'])
+def api_analyze_stream():
+    """Run an analysis and stream its progress as Server-Sent Events
+    
+    Takes the /api/analyze fields as a JSON body (POST) or query parameters
+    (GET, for EventSource). The analysis runs as a background job; the stream
+    opens with a "job" event, then sends "data_collected", one event per
+    workflow stage with its partial result (sentiment_scored, risk_assessed,
+    summary_ready, ...), and ends with "complete" (the full report) or
+    "error". If the client disconnects the job still finishes and its result
+    can be fetched from /api/jobs.
+    """
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args.to_dict()
+    
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    events = queue.Queue()
+    try:
+        job_id = get_job_manager().submit(_run_streamed_analysis_job, data, events,
+                                          description=_request_fields(data))
+    except JobQueueFullError as e:
+        logger.warning(f"API: Rejecting streamed analysis: {str(e)}")
+        return jsonify({"error": str(e)}), 503
+    
+    job = {
+        "job_id": job_id,
+        "status_url": url_for('job_status', job_id=job_id),
+        "result_url": url_for('job_result', job_id=job_id)
+    }
+    return Response(
+        _stream_events(job, events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """Analyze a portfolio of restaurants, streaming one JSON line per restaurant as it completes
+    
+    The body lists the restaurants as business_ids, form_ids and/or items (dicts
+    with the /api/analyze fields). Up to BATCH_MAX_WORKERS run at once. Each
+    line has the item's index, request, status, latency_seconds and result or
+    error; the last line is {"summary": ...} with throughput and latency figures.
+    """
+    data = request.json
+    
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    items = list(data.get('items', []))
+    items += [{'business_id': business_id} for business_id in data.get('business_ids', [])]
+    items += [{'form_id': form_id} for form_id in data.get('form_ids', [])]
+    if not items:
+        return jsonify({"error": "No business_ids, form_ids or items provided"}), 400
+    if len(items) > config.workflow.batch_max_items:
+        return jsonify({"error": f"Batch of {len(items)} items exceeds the limit of {config.workflow.batch_max_items}"}), 413
+    
+    runner = BatchRunner(analyze_api_request)
+    logger.info(f"API: Running batch of {len(items)} items with {runner.max_workers} workers")
+    
+    def generate():
+        for record in runner.iter_results(items):
+            yield json.dumps(record, default=json_default) + "\n"
+        yield json.dumps({"summary": runner.summary()}) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.route('/demo')
 def demo():
+    with start_trace("demo"):
+        return _demo()
+
+def _demo():
     # Use sample data
     data = data_collector.get_sample_data()
     
@@ -228,6 +491,7 @@ def demo():
             overall_sentiment = sentiment_analyzer.get_overall_sentiment(analyzed_reviews)
             risk_assessment = risk_assessor.assess_risk(overall_sentiment, data['business_details'])
             report = report_generator.generate_report(data['business_details'], overall_sentiment, risk_assessment)
+            fallback_reports.inc(route="/demo")
             return render_template('report.html', report=report)
         except Exception as fallback_error:
             logger.error(f"Error in fallback flow: {str(fallback_error)}")
@@ -237,5 +501,11 @@ def demo():
 def health_check():
     return jsonify({"status": "healthy", "version": "1.2.0"})
 
+@app.route('/metrics')
+def metrics():
+    if not metrics_enabled():
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
\ No newline at end of file
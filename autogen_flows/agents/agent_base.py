@@ -1,12 +1,17 @@
 import logging
-from autogen_flows.utils.llm_utils import generate_response
+import threading
+from autogen_flows.config.config import config
+from autogen_flows.utils.llm_utils import generate_response, estimate_message_tokens, agent_context
+from modules.tracing import span
 
 logger = logging.getLogger(__name__)
 
+HISTORY_POLICIES = ("full", "window", "token_budget", "summarize", "none")
+
 class AgentBase:
     """Base class for all agents in the system"""
     
-    def __init__(self, name, description, system_message):
+    def __init__(self, name, description, system_message, history_policy=None):
         """
         Initialize the agent
         
@@ -14,11 +19,26 @@ class AgentBase:
             name (str): Agent name
             description (str): Brief description of agent's role
             system_message (str): System message for LLM
+            history_policy (str, optional): How conversation history is bounded
+                (full, window, token_budget, summarize, none). Defaults to the
+                AGENT_HISTORY_POLICY setting.
         """
         self.name = name
         self.description = description
         self.system_message = system_message
+        self.history_policy = history_policy or config.agents.history_policy
+        if self.history_policy not in HISTORY_POLICIES:
+            logger.warning(f"Unknown history policy '{self.history_policy}', using 'window'")
+            self.history_policy = "window"
+        self.history_window = config.agents.history_window
+        self.history_token_budget = config.agents.history_token_budget
         self.conversation_history = []
+        # Running summary of exchanges dropped under the "summarize" policy
+        self.history_summary = ""
+        # Guards conversation_history when workflow stages call the agent concurrently
+        self._history_lock = threading.Lock()
+        # Serializes updates of history_summary, which span an LLM call
+        self._summary_lock = threading.Lock()
     
     def add_message(self, role, content):
         """
@@ -28,10 +48,11 @@ class AgentBase:
             role (str): Message role (system, user, assistant)
             content (str): Message content
         """
-        self.conversation_history.append({
-            "role": role,
-            "content": content
-        })
+        with self._history_lock:
+            self.conversation_history.append({
+                "role": role,
+                "content": content
+            })
     
     def get_messages(self):
         """
@@ -41,36 +62,128 @@ class AgentBase:
             list: List of message dictionaries
         """
         # Always include the system message first
-        return [{"role": "system", "content": self.system_message}] + self.conversation_history
+        messages = [{"role": "system", "content": self.system_message}]
+        with self._history_lock:
+            if self.history_summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{self.history_summary}"
+                })
+            return messages + list(self.conversation_history)
     
-    def generate_response(self, user_message, **kwargs):
+    def generate_response(self, user_message, stateless=False, **kwargs):
         """
         Generate a response to a user message
         
         Args:
             user_message (str): User message to respond to
+            stateless (bool, optional): Send only the system message and this prompt,
+                and leave the conversation history untouched. Use this for
+                self-contained prompts. Defaults to False.
             **kwargs: Additional arguments for the LLM API call
         
         Returns:
             str: Agent's response
         """
-        # Add user message to conversation
-        self.add_message("user", user_message)
+        with span(f"agent.{self.name}"), agent_context(self.name):
+            return self._generate_response(user_message, stateless, **kwargs)
+    
+    def _generate_response(self, user_message, stateless, **kwargs):
+        """Body of generate_response, run inside the agent's trace span and metrics context"""
+        if stateless or self.history_policy == "none":
+            messages = [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": user_message}
+            ]
+            return generate_response(messages, **kwargs)
         
-        # Get messages for LLM
-        messages = self.get_messages()
+        # Build the prompt from the turns completed so far. The exchange is only
+        # recorded once the response arrives so concurrent calls on the same
+        # agent never see each other's unanswered prompts.
+        messages = self.get_messages() + [{"role": "user", "content": user_message}]
         
         # Generate response
         response_content = generate_response(messages, **kwargs)
         
-        # Add assistant response to conversation
-        self.add_message("assistant", response_content)
+        # Add the user message and assistant response to the conversation together
+        with self._history_lock:
+            self.conversation_history.append({"role": "user", "content": user_message})
+            self.conversation_history.append({"role": "assistant", "content": response_content})
+        
+        self._apply_history_policy()
         
         return response_content
     
+    def _apply_history_policy(self):
+        """Trim the conversation history according to the agent's history policy"""
+        if self.history_policy == "full":
+            return
+        
+        with self._history_lock:
+            history = self.conversation_history
+            keep_from = 0
+            if self.history_policy in ("window", "summarize"):
+                keep_from = max(0, len(history) - 2 * self.history_window)
+            elif self.history_policy == "token_budget":
+                # Drop whole exchanges, oldest first, until the history fits the budget
+                while keep_from < len(history) and \
+                        estimate_message_tokens(history[keep_from:]) > self.history_token_budget:
+                    keep_from += 2
+            dropped = history[:keep_from]
+            self.conversation_history = history[keep_from:]
+        
+        if dropped and self.history_policy == "summarize":
+            self._summarize_dropped(dropped)
+    
+    def _summarize_dropped(self, dropped):
+        """
+        Fold exchanges dropped from the window into the running history summary
+        
+        Concurrent calls are serialized so each one builds on the summary the
+        previous one wrote, and no dropped exchange is lost.
+        
+        Args:
+            dropped (list): Messages removed from the conversation history
+        """
+        with self._summary_lock:
+            with self._history_lock:
+                current_summary = self.history_summary
+            summary = self._summarize(current_summary, dropped)
+            with self._history_lock:
+                self.history_summary = summary
+    
+    def _summarize(self, current_summary, dropped):
+        """
+        Ask the LLM to fold dropped exchanges into a summary
+        
+        Args:
+            current_summary (str): The running summary so far
+            dropped (list): Messages removed from the conversation history
+        
+        Returns:
+            str: The updated summary
+        """
+        transcript = "\n\n".join(f"{message['role'].upper()}: {message['content']}" for message in dropped)
+        prompt = f"""
+        Update the running summary of a conversation with the new exchanges below.
+        Keep every fact, figure and decision that later questions may depend on, and stay under 200 words.
+        
+        CURRENT SUMMARY:
+        {current_summary or "(none)"}
+        
+        NEW EXCHANGES:
+        {transcript}
+        """
+        return generate_response([
+            {"role": "system", "content": "You summarize conversations concisely and accurately."},
+            {"role": "user", "content": prompt}
+        ], temperature=0.0, max_tokens=400)
+    
     def reset_conversation(self):
         """Clear the conversation history"""
-        self.conversation_history = []
+        with self._history_lock:
+            self.conversation_history = []
+            self.history_summary = ""
     
     def __str__(self):
-        return f"{self.name} - {self.description}"
\ No newline at end of file
+        return f"{self.name} - {self.description}"
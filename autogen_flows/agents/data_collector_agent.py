@@ -2,6 +2,7 @@ import json
 import logging
 import re
 from autogen_flows.agents.agent_base import AgentBase
+from autogen_flows.agents import schemas
 from autogen_flows.config.config import config
 from modules.data_collector import DataCollector
 from autogen_flows.utils import extract_json_from_response
@@ -103,7 +104,7 @@ class DataCollectorAgent(AgentBase):
         Format your response as a structured assessment with clear recommendations.
         """
         
-        return self.generate_response(prompt, temperature=0.2)
+        return self.generate_response(prompt, temperature=0.2, stateless=True)
     
     def extract_key_business_info(self, data):
         """
@@ -201,7 +202,8 @@ class DataCollectorAgent(AgentBase):
             IMPORTANT: Be very precise with the business_type classification as it affects insurance class codes.
             """
             
-            response = self.generate_response(prompt, temperature=0.1)
+            response = self.generate_response(prompt, temperature=0.1, stateless=True,
+                                              response_schema=schemas.BUSINESS_INFO)
             
             # Use our improved JSON extraction utility
             enhanced_info = extract_json_from_response(response)
@@ -1,9 +1,10 @@
 import json
 import logging
 from autogen_flows.agents.agent_base import AgentBase
+from autogen_flows.agents import schemas
 from autogen_flows.config.config import config
 from modules.report_generator import ReportGenerator
-from autogen_flows.utils import extract_json_from_response
+from autogen_flows.utils import extract_json_from_response, json_default
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +73,7 @@ class ReportGeneratorAgent(AgentBase):
         Keep the summary concise (3-5 paragraphs) but comprehensive enough for an underwriting executive to understand the decision.
         """
         
-        return self.generate_response(prompt, temperature=0.3)
+        return self.generate_response(prompt, temperature=0.3, stateless=True)
     
     def generate_detailed_findings(self, business_data, sentiment_results, risk_assessment):
         """
@@ -109,7 +110,7 @@ class ReportGeneratorAgent(AgentBase):
         {json.dumps(business_data.get("business_details", {}), indent=2)}
         
         SENTIMENT ANALYSIS:
-        {json.dumps(sentiment_results, indent=2)}
+        {json.dumps(sentiment_results, indent=2, default=json_default)}
         
         RISK ASSESSMENT:
         {json.dumps(risk_assessment, indent=2)}
@@ -135,7 +136,8 @@ class ReportGeneratorAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.3)
+        response = self.generate_response(prompt, temperature=0.3, stateless=True,
+                                          response_schema=schemas.DETAILED_FINDINGS)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -164,13 +166,6 @@ class ReportGeneratorAgent(AgentBase):
         Returns:
             dict: Comprehensive report
         """
-        # Generate basic report from module
-        business_details = business_data.get("business_details", {})
-        overall_sentiment = sentiment_results.get("overall_sentiment", {})
-        basic_risk = risk_assessment.get("basic_assessment", {})
-        
-        basic_report = self.generate_basic_report(business_details, overall_sentiment, basic_risk)
-        
         # Generate executive summary
         executive_summary = self.generate_executive_summary(
             business_data, sentiment_results, risk_assessment
@@ -181,6 +176,31 @@ class ReportGeneratorAgent(AgentBase):
             business_data, sentiment_results, risk_assessment
         )
         
+        return self.assemble_report(
+            business_data, sentiment_results, risk_assessment, executive_summary, detailed_findings
+        )
+    
+    def assemble_report(self, business_data, sentiment_results, risk_assessment, executive_summary, detailed_findings):
+        """
+        Combine the basic report and the LLM-generated sections into the final report
+        
+        Args:
+            business_data (dict): Business details
+            sentiment_results (dict): Sentiment analysis results
+            risk_assessment (dict): Risk assessment results
+            executive_summary (str): Executive summary
+            detailed_findings (dict): Detailed findings
+        
+        Returns:
+            dict: Comprehensive report
+        """
+        # Generate basic report from module
+        business_details = business_data.get("business_details", {})
+        overall_sentiment = sentiment_results.get("overall_sentiment", {})
+        basic_risk = risk_assessment.get("basic_assessment", {})
+        
+        basic_report = self.generate_basic_report(business_details, overall_sentiment, basic_risk)
+        
         # Extract advanced risk assessment and coverage recommendations
         advanced_assessment = risk_assessment.get("advanced_assessment", {})
         coverage_recommendations = risk_assessment.get("coverage_recommendations", {})
@@ -1,6 +1,7 @@
 import json
 import logging
 from autogen_flows.agents.agent_base import AgentBase
+from autogen_flows.agents import schemas
 from autogen_flows.config.config import config
 from modules.risk_assessor import RiskAssessor
 from autogen_flows.utils import extract_json_from_response
@@ -165,7 +166,8 @@ class RiskAssessorAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.2)
+        response = self.generate_response(prompt, temperature=0.2, stateless=True,
+                                          response_schema=schemas.ADVANCED_RISK_ASSESSMENT)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -234,7 +236,8 @@ class RiskAssessorAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.3)
+        response = self.generate_response(prompt, temperature=0.3, stateless=True,
+                                          response_schema=schemas.COVERAGE_RECOMMENDATIONS)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -0,0 +1,106 @@
+"""
+JSON schemas of the structured responses requested by the agents
+
+Each schema mirrors the JSON structure spelled out in the matching agent
+prompt and is passed to the LLM as response_schema, so providers with
+native structured output return exactly that shape. Objects list every
+property as required and forbid extra ones, as OpenAI's strict mode demands.
+"""
+
+def _object(properties):
+    """Build a strict object schema requiring all of its properties"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+def _schema(name, properties):
+    """Build a named response schema"""
+    return {"name": name, "schema": _object(properties)}
+
+STRING = {"type": "string"}
+STRING_LIST = {"type": "array", "items": STRING}
+
+def _mentions(positive_key, negative_key):
+    return _object({positive_key: STRING_LIST, negative_key: STRING_LIST})
+
+BUSINESS_INFO = _schema("business_info", {
+    "business_name": STRING,
+    "business_type": STRING,
+    "cuisine_type": STRING,
+    "location": STRING,
+    "rating": {"type": "number"},
+    "review_count": {"type": "integer"},
+    "years_in_operation": STRING,
+    "additional_relevant_info": _object({
+        "alcohol_served": {"type": "boolean"},
+        "has_delivery": {"type": "boolean"},
+        "has_outdoor_seating": {"type": "boolean"}
+    })
+})
+
+DEEP_REVIEW_ANALYSIS = _schema("deep_review_analysis", {
+    "common_themes": STRING_LIST,
+    "safety_issues": STRING_LIST,
+    "customer_service": _mentions("positive_mentions", "negative_mentions"),
+    "cleanliness": _mentions("positive_mentions", "negative_mentions"),
+    "food_quality": _mentions("positive_mentions", "negative_mentions"),
+    "management": _mentions("positive_indicators", "negative_indicators"),
+    "overall_impression": STRING
+})
+
+IMAGE_CONTENT_ANALYSIS = _schema("image_content_analysis", {
+    "physical_environment": STRING_LIST,
+    "safety_indicators": _mentions("positive", "negative"),
+    "cleanliness_observations": _mentions("positive", "negative"),
+    "organization_observations": _mentions("positive", "negative"),
+    "overall_impression": STRING
+})
+
+RISK_FACTORS = _schema("risk_factors", {
+    "high_risk_factors": STRING_LIST,
+    "medium_risk_factors": STRING_LIST,
+    "low_risk_factors": STRING_LIST,
+    "risk_explanation": STRING,
+    "risk_sentiment_correlation": STRING
+})
+
+ADVANCED_RISK_ASSESSMENT = _schema("advanced_risk_assessment", {
+    "risk_level": {"type": "string", "enum": ["low", "medium", "high"]},
+    "class_code": STRING,
+    "eligibility": {"type": "string", "enum": ["ELIGIBLE", "INELIGIBLE", "NEEDS_REVIEW"]},
+    "confidence": {"type": "number"},
+    "ineligible_criteria": STRING_LIST,
+    "positive_factors": STRING_LIST,
+    "negative_factors": STRING_LIST,
+    "risk_rationale": STRING
+})
+
+COVERAGE_RECOMMENDATIONS = _schema("coverage_recommendations", {
+    "recommended_coverages": {"type": "array", "items": _object({
+        "coverage_type": STRING,
+        "recommended_limits": STRING,
+        "justification": STRING,
+        "special_conditions": STRING
+    })},
+    "premium_considerations": STRING,
+    "exclusions_to_consider": STRING_LIST
+})
+
+DETAILED_FINDINGS = _schema("detailed_findings", {
+    "business_profile_analysis": STRING,
+    "customer_sentiment_analysis": STRING,
+    "safety_risk_concerns": STRING,
+    "management_quality_assessment": STRING,
+    "compliance_assessment": STRING
+})
+
+FINAL_DECISION = _schema("final_decision", {
+    "final_decision": {"type": "string", "enum": ["APPROVE", "DECLINE", "REFER"]},
+    "decision_rationale": STRING,
+    "executive_comments": STRING,
+    "conditions": STRING_LIST,
+    "override_reasons": STRING_LIST
+})
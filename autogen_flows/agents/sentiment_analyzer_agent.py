@@ -1,8 +1,12 @@
 import json
 import logging
+import random
+import numpy as np
 from autogen_flows.agents.agent_base import AgentBase
+from autogen_flows.agents import schemas
 from autogen_flows.config.config import config
 from modules.sentiment_analyzer import SentimentAnalyzer
+from modules.review_batch import AnalyzedReviewBatch
 from autogen_flows.utils import extract_json_from_response
 
 logger = logging.getLogger(__name__)
@@ -28,9 +32,9 @@ class SentimentAnalyzerAgent(AgentBase):
             reviews (list): List of review dictionaries
         
         Returns:
-            list: List of reviews with sentiment analysis added
+            AnalyzedReviewBatch: Columnar batch of reviews with sentiment analysis added
         """
-        return self.sentiment_analyzer.analyze_reviews(reviews)
+        return self.sentiment_analyzer.analyze_reviews_batch(reviews)
     
     def analyze_images(self, image_analyses):
         """
@@ -49,7 +53,7 @@ class SentimentAnalyzerAgent(AgentBase):
         Calculate overall sentiment metrics from analyzed reviews
         
         Args:
-            analyzed_reviews (list): List of reviews with sentiment analysis
+            analyzed_reviews (AnalyzedReviewBatch or list): Reviews with sentiment analysis
             analyzed_images (list, optional): List of images with sentiment analysis
         
         Returns:
@@ -93,7 +97,6 @@ class SentimentAnalyzerAgent(AgentBase):
             neutral_reviews = [r for r in reviews if r.get('rating', 3) == 3]
             
             # Shuffle each category to increase randomness
-            import random
             random.shuffle(positive_reviews)
             random.shuffle(negative_reviews)
             random.shuffle(neutral_reviews)
@@ -171,7 +174,8 @@ class SentimentAnalyzerAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.2)
+        response = self.generate_response(prompt, temperature=0.2, stateless=True,
+                                          response_schema=schemas.DEEP_REVIEW_ANALYSIS)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -247,7 +251,8 @@ class SentimentAnalyzerAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.2)
+        response = self.generate_response(prompt, temperature=0.2, stateless=True,
+                                          response_schema=schemas.IMAGE_CONTENT_ANALYSIS)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -270,7 +275,7 @@ class SentimentAnalyzerAgent(AgentBase):
         
         Args:
             reviews (list): List of original review dictionaries
-            analyzed_reviews (list): List of reviews with sentiment analysis
+            analyzed_reviews (AnalyzedReviewBatch or list): Reviews with sentiment analysis
             overall_sentiment (dict): Overall sentiment metrics
             image_analyses (list, optional): List of image analyses with sentiment
         
@@ -293,48 +298,41 @@ class SentimentAnalyzerAgent(AgentBase):
         neg_percentage = overall_sentiment.get('negative_percentage', 0)
         neg_keywords = overall_sentiment.get('negative_keyword_frequency', {})
         
-        # For large review sets, be strategic about which reviews to include
-        negative_reviews = []
-        critical_reviews = []
+        if not isinstance(analyzed_reviews, AnalyzedReviewBatch):
+            analyzed_reviews = AnalyzedReviewBatch.from_records(analyzed_reviews)
         
         # Look for reviews with critical keywords first
         critical_keywords = ["violation", "hazard", "unsafe", "accident", "injury", "bug", 
                             "dirty", "unclean", "filthy", "sick", "ill", "food poisoning"]
         
-        # First pass - find reviews with critical keywords
-        for review in analyzed_reviews:
-            # Check if this review contains critical negative keywords
-            has_critical = any(kw in review.get('negative_keywords', []) for kw in critical_keywords)
-            if has_critical:
-                critical_reviews.append(review)
-            elif review.get('sentiment_category') == 'negative':
-                negative_reviews.append(review)
-                
-            # If we have enough critical reviews, stop searching
-            if len(critical_reviews) >= 5:
-                break
-                
-        # Prepare the review sample
-        review_sample = []
+        # Select at most 5 critical reviews, and the other negative reviews that
+        # come before the 5th one, with boolean masks over the whole batch
+        critical_mask = analyzed_reviews.keyword_mask('negative', critical_keywords)
+        negative_mask = analyzed_reviews.category_mask('negative') & ~critical_mask
+        critical_idx = np.flatnonzero(critical_mask)[:5]
+        if len(critical_idx) == 5:
+            negative_mask[critical_idx[-1] + 1:] = False
+        negative_idx = np.flatnonzero(negative_mask)
         
-        # First add critical reviews
-        review_sample.extend(critical_reviews[:3])
+        # Prepare the review sample
+        sample_idx = list(critical_idx[:3])
         
-        # Then add other negative reviews
-        negative_remaining_slots = min(5 - len(review_sample), len(negative_reviews))
+        # Then add other negative reviews, most negative compound score first
+        negative_remaining_slots = min(5 - len(sample_idx), len(negative_idx))
         if negative_remaining_slots > 0:
-            # Sort negative reviews by most negative compound score
-            negative_reviews.sort(key=lambda x: x.get('sentiment_scores', {}).get('compound', 0))
-            review_sample.extend(negative_reviews[:negative_remaining_slots])
+            order = np.argsort(analyzed_reviews.compound[negative_idx], kind='stable')
+            sample_idx.extend(negative_idx[order[:negative_remaining_slots]])
             
         # If we still have space, add a few positive/neutral reviews for balance
-        if len(review_sample) < 5 and len(analyzed_reviews) > len(review_sample):
-            other_reviews = [r for r in analyzed_reviews 
-                            if r not in critical_reviews and r not in negative_reviews]
-            
-            import random
-            random.shuffle(other_reviews)
-            review_sample.extend(other_reviews[:5 - len(review_sample)])
+        if len(sample_idx) < 5 and len(analyzed_reviews) > len(sample_idx):
+            other_mask = np.ones(len(analyzed_reviews), dtype=bool)
+            other_mask[critical_idx] = False
+            other_mask[negative_idx] = False
+            other_idx = np.flatnonzero(other_mask)
+            np.random.shuffle(other_idx)
+            sample_idx.extend(other_idx[:5 - len(sample_idx)])
+        
+        review_sample = [analyzed_reviews[i] for i in sample_idx]
             
         # Format for better prompt readability
         reviews_text = "No reviews available"
@@ -346,9 +344,9 @@ class SentimentAnalyzerAgent(AgentBase):
             ])
             
         logger.info(f"Selected {len(review_sample)} reviews for risk factor analysis " +
-                   f"({len(critical_reviews[:3])} critical, " +
-                   f"{min(negative_remaining_slots, len(negative_reviews))} negative, " +
-                   f"{max(0, 5 - len(critical_reviews[:3]) - min(negative_remaining_slots, len(negative_reviews)))} other)")
+                   f"({len(critical_idx[:3])} critical, " +
+                   f"{min(negative_remaining_slots, len(negative_idx))} negative, " +
+                   f"{max(0, 5 - len(critical_idx[:3]) - min(negative_remaining_slots, len(negative_idx)))} other)")
                    
         # Format image information if available
         images_text = ""
@@ -402,7 +400,8 @@ class SentimentAnalyzerAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.3)
+        response = self.generate_response(prompt, temperature=0.3, stateless=True,
+                                          response_schema=schemas.RISK_FACTORS)
         
         # Use improved JSON extraction
         result = extract_json_from_response(response)
@@ -437,24 +436,22 @@ class SentimentAnalyzerAgent(AgentBase):
                 "neutral_percentage": 0
             }
             
-        # Calculate average rating
-        ratings = [r.get('rating', 3) for r in reviews]
-        average_rating = sum(ratings) / len(ratings)
-        
-        # Calculate rating distribution
-        rating_counts = {}
-        for rating in ratings:
-            rating_counts[rating] = rating_counts.get(rating, 0) + 1
-            
-        # Format as percentages
+        # Vectorise over the ratings; the labels use the ratings as given, so 4 stays "4★"
+        rating_objects = [r.get('rating', 3) for r in reviews]
+        ratings = np.array(rating_objects, dtype=np.float64)
+        average_rating = float(ratings.mean())
+        
+        # Calculate rating distribution, formatted as percentages, in order of first appearance
+        _, first_index, rating_counts = np.unique(ratings, return_index=True, return_counts=True)
+        order = np.argsort(first_index)
         rating_distribution = {
-            f"{rating}★": f"{count/len(reviews)*100:.1f}%" 
-            for rating, count in rating_counts.items()
+            f"{rating_objects[first_index[k]]}★": f"{rating_counts[k]/len(reviews)*100:.1f}%" 
+            for k in order.tolist()
         }
         
         # Calculate sentiment percentages
-        positive_count = sum(1 for r in reviews if r.get('rating', 3) >= 4)
-        negative_count = sum(1 for r in reviews if r.get('rating', 3) <= 2)
+        positive_count = int(np.count_nonzero(ratings >= 4))
+        negative_count = int(np.count_nonzero(ratings <= 2))
         neutral_count = len(reviews) - positive_count - negative_count
         
         positive_percentage = (positive_count / len(reviews)) * 100
@@ -529,24 +526,58 @@ class SentimentAnalyzerAgent(AgentBase):
             }
         
         # Use the module for basic analysis
-        analyzed_reviews = self.batch_analyze_reviews(reviews)
-        analyzed_images = self.analyze_images(image_analyses) if image_analyses else []
-        overall_sentiment = self.calculate_overall_sentiment(analyzed_reviews, analyzed_images)
+        basic_sentiment = self.analyze_basic_sentiment(reviews, image_analyses)
         
         # Use LLM for deeper analysis
         deep_analysis = self.deep_analyze_review_content(reviews)
-        image_analysis = self.analyze_image_content(image_analyses) if image_analyses else {
-            "physical_environment": [],
-            "overall_impression": "No images available for analysis"
-        }
+        image_analysis = self.analyze_restaurant_images(image_analyses)
         
-        risk_factors = self.identify_risk_factors(reviews, analyzed_reviews, overall_sentiment, analyzed_images)
+        risk_factors = self.identify_risk_factors(
+            reviews, basic_sentiment["analyzed_reviews"], basic_sentiment["overall_sentiment"],
+            basic_sentiment["analyzed_images"]
+        )
         
         return {
-            "analyzed_reviews": analyzed_reviews,
-            "analyzed_images": analyzed_images,
-            "overall_sentiment": overall_sentiment,
+            **basic_sentiment,
             "deep_analysis": deep_analysis,
             "image_analysis": image_analysis,
             "risk_factors": risk_factors
-        }
\ No newline at end of file
+        }
+    
+    def analyze_basic_sentiment(self, reviews, image_analyses=None):
+        """
+        Run the module-based (non-LLM) sentiment analysis of reviews and images
+        
+        Args:
+            reviews (list): List of review dictionaries
+            image_analyses (list, optional): List of image analysis dictionaries
+        
+        Returns:
+            dict: analyzed_reviews, analyzed_images and overall_sentiment
+        """
+        analyzed_reviews = self.batch_analyze_reviews(reviews)
+        analyzed_images = self.analyze_images(image_analyses) if image_analyses else []
+        overall_sentiment = self.calculate_overall_sentiment(analyzed_reviews, analyzed_images)
+        
+        return {
+            "analyzed_reviews": analyzed_reviews,
+            "analyzed_images": analyzed_images,
+            "overall_sentiment": overall_sentiment
+        }
+    
+    def analyze_restaurant_images(self, image_analyses):
+        """
+        Run the LLM image analysis, or return an empty analysis when there are no images
+        
+        Args:
+            image_analyses (list): List of image analysis dictionaries
+        
+        Returns:
+            dict: Deep image analysis results
+        """
+        if not image_analyses:
+            return {
+                "physical_environment": [],
+                "overall_impression": "No images available for analysis"
+            }
+        return self.analyze_image_content(image_analyses)
\ No newline at end of file
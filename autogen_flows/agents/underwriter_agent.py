@@ -1,11 +1,13 @@
 import json
 import logging
 from autogen_flows.agents.agent_base import AgentBase
+from autogen_flows.agents import schemas
 from autogen_flows.config.config import config
 from autogen_flows.agents.data_collector_agent import DataCollectorAgent
 from autogen_flows.agents.sentiment_analyzer_agent import SentimentAnalyzerAgent
 from autogen_flows.agents.risk_assessor_agent import RiskAssessorAgent
 from autogen_flows.agents.report_generator_agent import ReportGeneratorAgent
+from autogen_flows.utils.stage_graph import StageGraph
 from autogen_flows.utils import extract_json_from_response
 
 logger = logging.getLogger(__name__)
@@ -13,6 +15,18 @@ logger = logging.getLogger(__name__)
 class UnderwriterAgent(AgentBase):
     """The coordinator agent that oversees the entire underwriting process"""
     
+    # Workflow stages reported to progress callbacks, and the event each is reported as.
+    # "data_collected" is reported before the stages start and "final_decision" after them.
+    PROGRESS_EVENTS = {
+        "business_info": "business_info",
+        "basic_sentiment": "sentiment_scored",
+        "sentiment_results": "sentiment_complete",
+        "risk_assessment": "risk_assessed",
+        "executive_summary": "summary_ready",
+        "detailed_findings": "findings_ready",
+        "report": "report_assembled"
+    }
+    
     def __init__(self):
         # Initialize with config from the config module
         super().__init__(
@@ -27,7 +41,14 @@ class UnderwriterAgent(AgentBase):
         self.risk_assessor_agent = RiskAssessorAgent()
         self.report_generator_agent = ReportGeneratorAgent()
     
-    def process_restaurant_data(self, data=None, data_source="sample", identifier=None, form_id=None, business_id=None):
+    def reset(self):
+        """Clear the conversations of this agent and all specialized agents"""
+        for agent in (self, self.data_collector_agent, self.sentiment_analyzer_agent,
+                      self.risk_assessor_agent, self.report_generator_agent):
+            agent.reset_conversation()
+    
+    def process_restaurant_data(self, data=None, data_source="sample", identifier=None, form_id=None, business_id=None,
+                                progress_callback=None):
         """
         Process restaurant data through the entire underwriting workflow
         
@@ -37,6 +58,8 @@ class UnderwriterAgent(AgentBase):
             identifier (str, optional): Business ID or Form ID. Defaults to None.
             form_id (str, optional): Form ID for fetching Google images. Defaults to None.
             business_id (str, optional): Yelp business ID for fetching reviews. Defaults to None.
+            progress_callback (callable, optional): Called as progress_callback(event, payload)
+                with partial results as the workflow progresses (see PROGRESS_EVENTS). Defaults to None.
         
         Returns:
             dict: Final comprehensive underwriting report
@@ -84,74 +107,201 @@ class UnderwriterAgent(AgentBase):
                     f"{len(restaurant_data.get('images', []))} Yelp images, and " +
                     f"{len(restaurant_data.get('google_images', []))} Google images")
         
-        # Step 2: Extract key business information
-        business_info = self.data_collector_agent.extract_key_business_info(restaurant_data)
-        logger.info(f"Processed business info for: {business_info.get('business_name', 'Unknown Restaurant')}")
-        logger.info(f"Business type: {business_info.get('business_type', 'Unknown')}")
-        logger.info(f"Cuisine: {business_info.get('cuisine_type', 'Unknown')}")
+        if progress_callback:
+            progress_callback("data_collected", {
+                "business_details": restaurant_data.get("business_details", {}),
+                "review_count": len(restaurant_data.get("reviews", [])),
+                "image_count": len(restaurant_data.get("images", [])),
+                "google_image_count": len(restaurant_data.get("google_images", []))
+            })
+        
+        # Steps 2-5 run as a dependency graph so independent LLM calls overlap
+        on_stage_complete = None
+        if progress_callback:
+            on_stage_complete = lambda stage, result: self._report_progress(progress_callback, stage, result)
+        results = self._build_stage_graph(restaurant_data).run(on_stage_complete=on_stage_complete)
+        
+        business_info = results["business_info"]
+        sentiment_results = results["sentiment_results"]
+        risk_assessment = results["risk_assessment"]
+        final_report = results["report"]
         
-        # Analyze restaurant images if available
-        image_analyses = restaurant_data.get("image_analyses", [])
-        if image_analyses:
-            logger.info(f"Found {len(image_analyses)} pre-analyzed images")
-        elif restaurant_data.get("google_images"):
-            logger.info(f"Restaurant has {len(restaurant_data.get('google_images', []))} Google images available")
-            image_analysis_prompt = f"""
-            Analyze the following restaurant Google images to identify potential risk factors.
-            Restaurant: {business_info.get('business_name', 'Unknown')}
-            Type: {business_info.get('business_type', 'Unknown')}
-            Google Image URLs: {[img.get('url') for img in restaurant_data.get('google_images', [])]}
-            
-            Based on the restaurant type and name, what risk factors might be visible in these images?
-            Consider factors like cleanliness, safety equipment, crowding, etc.
-            """
-            
-            # This is a placeholder - in the actual code, the image analyses are already
-            # done by the data_collector module and included in the restaurant_data
-            logger.info("Using pre-analyzed Google images for risk assessment")
-        
-        # Step 3: Analyze sentiment of reviews and images
-        sentiment_results = self.sentiment_analyzer_agent.analyze_restaurant_data(restaurant_data)
-        logger.info(f"Completed sentiment analysis with {len(sentiment_results.get('analyzed_reviews', []))} reviews")
-        
-        # Additional sentiment metrics
-        positive_pct = sentiment_results.get("overall_sentiment", {}).get("positive_percentage", 0)
-        negative_pct = sentiment_results.get("overall_sentiment", {}).get("negative_percentage", 0)
-        logger.info(f"Sentiment breakdown: {positive_pct:.1f}% positive, {negative_pct:.1f}% negative")
-        
-        # Image sentiment if available
-        image_sentiment = sentiment_results.get("overall_sentiment", {}).get("image_sentiment", {})
-        if image_sentiment:
-            img_positive_pct = image_sentiment.get("positive_percentage", 0)
-            img_negative_pct = image_sentiment.get("negative_percentage", 0)
-            logger.info(f"Image sentiment: {img_positive_pct:.1f}% positive, {img_negative_pct:.1f}% negative")
-            
-            # Log key findings from images
-            image_analysis = sentiment_results.get("image_analysis", {})
-            if image_analysis:
-                logger.info(f"Image analysis found: " + 
-                           f"{len(image_analysis.get('safety_indicators', {}).get('positive', []))} positive safety indicators, " +
-                           f"{len(image_analysis.get('safety_indicators', {}).get('negative', []))} negative safety indicators")
-        
-        # Step 4: Assess risk based on sentiment and business details
-        risk_assessment = self.risk_assessor_agent.generate_risk_assessment(restaurant_data, sentiment_results)
-        
-        # Get eligibility from the advanced assessment
         eligibility = risk_assessment.get("advanced_assessment", {}).get("eligibility", "UNKNOWN")
         risk_level = risk_assessment.get("advanced_assessment", {}).get("risk_level", "unknown")
         class_code = risk_assessment.get("advanced_assessment", {}).get("class_code", "unknown")
-        logger.info(f"Completed risk assessment: {eligibility} with {risk_level} risk level, class code {class_code}")
-        
-        # Step 5: Generate comprehensive report
-        final_report = self.report_generator_agent.generate_comprehensive_report(
-            restaurant_data, sentiment_results, risk_assessment
-        )
         
         logger.info(f"Generated comprehensive report for {business_info.get('business_name', 'Unknown Restaurant')}")
         logger.info(f"Report summary: {eligibility} ({risk_level} risk) with class code {class_code}")
         
         return final_report
     
+    def _report_progress(self, progress_callback, stage, result):
+        """
+        Forward a finished stage to a progress callback as a public progress event
+        
+        Internal stages not listed in PROGRESS_EVENTS are not reported. The
+        per-review sentiment records are left out of the partial results to keep
+        events small; they are part of the final report.
+        
+        Args:
+            progress_callback (callable): Called as progress_callback(event, payload)
+            stage (str): Name of the finished stage
+            result: The stage result
+        """
+        event = self.PROGRESS_EVENTS.get(stage)
+        if event is None:
+            return
+        if stage == "basic_sentiment":
+            result = {"overall_sentiment": result.get("overall_sentiment", {})}
+        elif stage == "sentiment_results":
+            result = {key: value for key, value in result.items()
+                      if key not in ("analyzed_reviews", "analyzed_images")}
+        progress_callback(event, result)
+    
+    def _build_stage_graph(self, restaurant_data):
+        """
+        Build the dependency graph of analysis stages for one restaurant
+        
+        Stages without a data dependency on each other (business info extraction,
+        deep review analysis, image analysis, module-based sentiment) start
+        together; later stages start as soon as their inputs are ready.
+        
+        Args:
+            restaurant_data (dict): Collected restaurant data
+        
+        Returns:
+            StageGraph: Graph whose "report" stage produces the final report
+        """
+        reviews = restaurant_data.get("reviews", [])
+        image_analyses = restaurant_data.get("image_analyses", [])
+        business_details = restaurant_data.get("business_details", {})
+        graph = StageGraph(max_workers=config.workflow.max_workers)
+        
+        def business_info_stage(inputs):
+            # Extract key business information
+            business_info = self.data_collector_agent.extract_key_business_info(restaurant_data)
+            logger.info(f"Processed business info for: {business_info.get('business_name', 'Unknown Restaurant')}")
+            logger.info(f"Business type: {business_info.get('business_type', 'Unknown')}")
+            logger.info(f"Cuisine: {business_info.get('cuisine_type', 'Unknown')}")
+            return business_info
+        
+        def basic_sentiment_stage(inputs):
+            if image_analyses:
+                logger.info(f"Found {len(image_analyses)} pre-analyzed images")
+            elif restaurant_data.get("google_images"):
+                # Image analyses are produced by the data_collector module; without them
+                # there is nothing further to analyze here
+                logger.info(f"Restaurant has {len(restaurant_data.get('google_images', []))} Google images available")
+            basic_sentiment = self.sentiment_analyzer_agent.analyze_basic_sentiment(reviews, image_analyses)
+            logger.info(f"Completed sentiment analysis with {len(basic_sentiment.get('analyzed_reviews', []))} reviews")
+            
+            # Additional sentiment metrics
+            positive_pct = basic_sentiment.get("overall_sentiment", {}).get("positive_percentage", 0)
+            negative_pct = basic_sentiment.get("overall_sentiment", {}).get("negative_percentage", 0)
+            logger.info(f"Sentiment breakdown: {positive_pct:.1f}% positive, {negative_pct:.1f}% negative")
+            
+            # Image sentiment if available
+            image_sentiment = basic_sentiment.get("overall_sentiment", {}).get("image_sentiment", {})
+            if image_sentiment:
+                img_positive_pct = image_sentiment.get("positive_percentage", 0)
+                img_negative_pct = image_sentiment.get("negative_percentage", 0)
+                logger.info(f"Image sentiment: {img_positive_pct:.1f}% positive, {img_negative_pct:.1f}% negative")
+            return basic_sentiment
+        
+        def deep_analysis_stage(inputs):
+            return self.sentiment_analyzer_agent.deep_analyze_review_content(reviews)
+        
+        def image_analysis_stage(inputs):
+            image_analysis = self.sentiment_analyzer_agent.analyze_restaurant_images(image_analyses)
+            if image_analyses:
+                # Log key findings from images
+                logger.info(f"Image analysis found: " + 
+                           f"{len(image_analysis.get('safety_indicators', {}).get('positive', []))} positive safety indicators, " +
+                           f"{len(image_analysis.get('safety_indicators', {}).get('negative', []))} negative safety indicators")
+            return image_analysis
+        
+        def risk_factors_stage(inputs):
+            basic_sentiment = inputs["basic_sentiment"]
+            return self.sentiment_analyzer_agent.identify_risk_factors(
+                reviews, basic_sentiment["analyzed_reviews"], basic_sentiment["overall_sentiment"],
+                basic_sentiment["analyzed_images"]
+            )
+        
+        def sentiment_results_stage(inputs):
+            return {
+                **inputs["basic_sentiment"],
+                "deep_analysis": inputs["deep_analysis"],
+                "image_analysis": inputs["image_analysis"],
+                "risk_factors": inputs["risk_factors"]
+            }
+        
+        def basic_assessment_stage(inputs):
+            overall_sentiment = inputs["basic_sentiment"]["overall_sentiment"]
+            return self.risk_assessor_agent.assess_basic_risk(overall_sentiment, business_details)
+        
+        def advanced_assessment_stage(inputs):
+            return self.risk_assessor_agent.advanced_risk_assessment(
+                business_details, inputs["basic_sentiment"]["overall_sentiment"],
+                inputs["deep_analysis"], inputs["risk_factors"]
+            )
+        
+        def coverage_stage(inputs):
+            return self.risk_assessor_agent.assess_coverage_recommendations(
+                business_details, inputs["advanced_assessment"]
+            )
+        
+        def risk_assessment_stage(inputs):
+            risk_assessment = {
+                "basic_assessment": inputs["basic_assessment"],
+                "advanced_assessment": inputs["advanced_assessment"],
+                "coverage_recommendations": inputs["coverage_recommendations"]
+            }
+            eligibility = risk_assessment["advanced_assessment"].get("eligibility", "UNKNOWN")
+            risk_level = risk_assessment["advanced_assessment"].get("risk_level", "unknown")
+            class_code = risk_assessment["advanced_assessment"].get("class_code", "unknown")
+            logger.info(f"Completed risk assessment: {eligibility} with {risk_level} risk level, class code {class_code}")
+            return risk_assessment
+        
+        def executive_summary_stage(inputs):
+            # The summary only reads the overall sentiment and the advanced assessment,
+            # so it can run alongside the coverage recommendations
+            return self.report_generator_agent.generate_executive_summary(
+                restaurant_data, inputs["basic_sentiment"],
+                {"advanced_assessment": inputs["advanced_assessment"]}
+            )
+        
+        def detailed_findings_stage(inputs):
+            return self.report_generator_agent.generate_detailed_findings(
+                restaurant_data, inputs["sentiment_results"], inputs["risk_assessment"]
+            )
+        
+        def report_stage(inputs):
+            return self.report_generator_agent.assemble_report(
+                restaurant_data, inputs["sentiment_results"], inputs["risk_assessment"],
+                inputs["executive_summary"], inputs["detailed_findings"]
+            )
+        
+        graph.add_stage("business_info", business_info_stage)
+        graph.add_stage("basic_sentiment", basic_sentiment_stage)
+        graph.add_stage("deep_analysis", deep_analysis_stage)
+        graph.add_stage("image_analysis", image_analysis_stage)
+        graph.add_stage("risk_factors", risk_factors_stage, depends_on=["basic_sentiment"])
+        graph.add_stage("sentiment_results", sentiment_results_stage,
+                        depends_on=["basic_sentiment", "deep_analysis", "image_analysis", "risk_factors"])
+        graph.add_stage("basic_assessment", basic_assessment_stage, depends_on=["basic_sentiment"])
+        graph.add_stage("advanced_assessment", advanced_assessment_stage,
+                        depends_on=["basic_sentiment", "deep_analysis", "risk_factors"])
+        graph.add_stage("coverage_recommendations", coverage_stage, depends_on=["advanced_assessment"])
+        graph.add_stage("risk_assessment", risk_assessment_stage,
+                        depends_on=["basic_assessment", "advanced_assessment", "coverage_recommendations"])
+        graph.add_stage("executive_summary", executive_summary_stage,
+                        depends_on=["basic_sentiment", "advanced_assessment"])
+        graph.add_stage("detailed_findings", detailed_findings_stage,
+                        depends_on=["sentiment_results", "risk_assessment"])
+        graph.add_stage("report", report_stage,
+                        depends_on=["sentiment_results", "risk_assessment", "executive_summary", "detailed_findings"])
+        return graph
+    
     def finalize_decision(self, report):
         """
         Finalize the underwriting decision with executive-level review
@@ -191,7 +341,8 @@ class UnderwriterAgent(AgentBase):
         }}
         """
         
-        response = self.generate_response(prompt, temperature=0.3)
+        response = self.generate_response(prompt, temperature=0.3, stateless=True,
+                                          response_schema=schemas.FINAL_DECISION)
         
         # Use improved JSON extraction
         final_decision = extract_json_from_response(response)
@@ -213,7 +364,8 @@ class UnderwriterAgent(AgentBase):
         
         return report
     
-    def run_full_workflow(self, data=None, data_source="sample", identifier=None, form_id=None, business_id=None):
+    def run_full_workflow(self, data=None, data_source="sample", identifier=None, form_id=None, business_id=None,
+                          progress_callback=None):
         """
         Run the full underwriting workflow from data collection to final decision
         
@@ -223,14 +375,19 @@ class UnderwriterAgent(AgentBase):
             identifier (str, optional): Business ID or Form ID. Defaults to None.
             form_id (str, optional): Form ID for fetching Google images. Defaults to None.
             business_id (str, optional): Yelp business ID for fetching reviews. Defaults to None.
+            progress_callback (callable, optional): Called as progress_callback(event, payload)
+                with partial results as the workflow progresses. Defaults to None.
         
         Returns:
             dict: Final approved report with decision
         """
         # Step 1-5: Process restaurant data through the entire pipeline
-        report = self.process_restaurant_data(data, data_source, identifier, form_id, business_id)
+        report = self.process_restaurant_data(data, data_source, identifier, form_id, business_id,
+                                              progress_callback=progress_callback)
         
         # Step 6: Finalize decision with executive review
         final_report = self.finalize_decision(report)
+        if progress_callback:
+            progress_callback("final_decision", final_report.get("final_decision", {}))
         
         return final_report
\ No newline at end of file
@@ -13,6 +13,8 @@ class LLMConfig:
         # OpenAI configs
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4")
+        # OpenAI-compatible endpoint, e.g. a proxy or the load test's local stand-in
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
         
         # Azure OpenAI configs
         self.azure_api_key = os.getenv("AZURE_OPENAI_API_KEY")
@@ -23,9 +25,45 @@ class LLMConfig:
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
         self.anthropic_model = os.getenv("ANTHROPIC_MODEL", "claude-2")
 
+        # Client connection pool configs (shared per provider/model)
+        self.pool_max_connections = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", 20))
+        self.pool_max_keepalive = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", 10))
+        self.pool_idle_timeout = float(os.getenv("LLM_POOL_IDLE_TIMEOUT", 300))
+        self.request_timeout = float(os.getenv("LLM_REQUEST_TIMEOUT", 120))
+
+        # Response cache configs (LLM_CACHE_PATH enables the on-disk SQLite tier)
+        self.cache_enabled = os.getenv("LLM_CACHE_ENABLED", "True").lower() in ('true', '1', 't')
+        self.cache_ttl = float(os.getenv("LLM_CACHE_TTL", 3600))
+        self.cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+        self.cache_path = os.getenv("LLM_CACHE_PATH") or None
+
+        # Rate limiting per provider/model (0 disables a limit): request and token
+        # budgets per minute and calls in flight, shared by every thread in the process
+        self.requests_per_minute = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+        self.tokens_per_minute = int(os.getenv("LLM_TOKENS_PER_MINUTE", 80000))
+        self.max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", 8))
+        self.rate_limit_max_wait = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", 120))
+
+        # Native structured output for prompts with a response schema: auto (picked
+        # from the model name), json_schema (strict schema), json_object (JSON mode)
+        # or off. Models that reject the requested mode are downgraded automatically.
+        self.structured_output = os.getenv("LLM_STRUCTURED_OUTPUT", "auto").lower()
+
+        # Retries of rate-limited (429), overloaded and transient failures, with
+        # exponential backoff and jitter unless the provider sends Retry-After
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", 5))
+        self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+        self.retry_max_delay = float(os.getenv("LLM_RETRY_MAX_DELAY", 60))
+
 # Agent Configuration
 class AgentConfig:
     def __init__(self):
+        # Conversation history policy for non-stateless agent calls:
+        # full, window, token_budget, summarize or none
+        self.history_policy = os.getenv("AGENT_HISTORY_POLICY", "window")
+        self.history_window = int(os.getenv("AGENT_HISTORY_WINDOW", 5))  # exchanges kept
+        self.history_token_budget = int(os.getenv("AGENT_HISTORY_TOKEN_BUDGET", 4000))
+        
         self.data_collector_agent_config = {
             "name": "DataCollectorAgent",
             "description": "Agent responsible for collecting restaurant data from external APIs",
@@ -85,12 +123,35 @@ class UnderwritingConfig:
             'restaurants with delivery as primary service'
         ]
 
+# Workflow Execution Configuration
+class WorkflowConfig:
+    def __init__(self):
+        # Maximum number of independent workflow stages (LLM calls) run concurrently
+        self.max_workers = int(os.getenv("WORKFLOW_MAX_WORKERS", 4))
+        
+        # Pool of reusable underwriter agent sets shared by concurrent requests
+        self.agent_pool_size = int(os.getenv("AGENT_POOL_SIZE", 4))
+        self.agent_pool_prewarm = int(os.getenv("AGENT_POOL_PREWARM", 1))
+        self.agent_pool_timeout = float(os.getenv("AGENT_POOL_TIMEOUT", 60))
+        
+        # Background analysis jobs (/api/jobs): concurrent jobs, jobs allowed to
+        # wait for a worker, and seconds finished jobs are kept for polling
+        self.job_max_workers = int(os.getenv("JOB_MAX_WORKERS", 4))
+        self.job_queue_size = int(os.getenv("JOB_QUEUE_SIZE", 100))
+        self.job_result_ttl = float(os.getenv("JOB_RESULT_TTL", 3600))
+        
+        # Portfolio batches (/api/batch and batch_underwrite.py): items analyzed at
+        # once (keep within AGENT_POOL_SIZE) and items accepted per HTTP request
+        self.batch_max_workers = int(os.getenv("BATCH_MAX_WORKERS", 4))
+        self.batch_max_items = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+
 # Create an all-in-one config object
 class Config:
     def __init__(self):
         self.llm = LLMConfig()
         self.agents = AgentConfig()
         self.underwriting = UnderwritingConfig()
+        self.workflow = WorkflowConfig()
         
         # API Configuration
         self.apis = {
@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from autogen_flows.agents.underwriter_agent import UnderwriterAgent
+from autogen_flows.config.config import config
+from modules.tracing import span
+
+logger = logging.getLogger(__name__)
+
+class AgentPool:
+    """
+    A bounded pool of reusable UnderwriterAgent instances
+    
+    Building an UnderwriterAgent constructs five agents and their data, sentiment,
+    risk and report modules (including parsing the VADER lexicon), so requests
+    check a pre-built agent set out of the pool instead. Each agent set serves
+    one request at a time and its conversations are reset when it is returned.
+    """
+    
+    def __init__(self, size=None, checkout_timeout=None):
+        """
+        Initialize the pool
+        
+        Args:
+            size (int, optional): Maximum number of agent sets. Defaults to AGENT_POOL_SIZE.
+            checkout_timeout (float, optional): Seconds to wait for a free agent set.
+                Defaults to AGENT_POOL_TIMEOUT.
+        """
+        self.size = size or config.workflow.agent_pool_size
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else config.workflow.agent_pool_timeout
+        # LIFO so the most recently used (warmest) agent set is handed out first
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def prewarm(self, count=None):
+        """
+        Build agent sets ahead of the first requests
+        
+        Args:
+            count (int, optional): Number of agent sets to build. Defaults to AGENT_POOL_PREWARM.
+        """
+        count = min(count if count is not None else config.workflow.agent_pool_prewarm, self.size)
+        while True:
+            with self._lock:
+                if self._created >= count:
+                    return
+                self._created += 1
+            self._idle.put(self._create_agent())
+    
+    def _create_agent(self):
+        """Build a new agent set, releasing its slot if construction fails"""
+        try:
+            logger.info("Creating pooled UnderwriterAgent")
+            return UnderwriterAgent()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+    
+    @contextmanager
+    def checkout(self):
+        """
+        Borrow an agent set for the duration of one workflow
+        
+        Yields:
+            UnderwriterAgent: An agent set with empty conversations
+        
+        Raises:
+            TimeoutError: If no agent set becomes free within checkout_timeout
+        """
+        with span("agent_pool.checkout"):
+            agent = self._acquire()
+        try:
+            yield agent
+        finally:
+            self._release(agent)
+    
+    def _release(self, agent):
+        """Reset an agent set and return it to the pool, or discard it if the reset fails"""
+        try:
+            agent.reset()
+        except Exception as e:
+            # A half-reset agent set could leak one request's conversation into the
+            # next, so drop it and free its slot for a fresh one
+            logger.error(f"Discarding pooled UnderwriterAgent after failed reset: {str(e)}")
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(agent)
+    
+    def _try_create(self):
+        """Build a new agent set if the pool is under capacity, otherwise return None"""
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        return self._create_agent() if can_create else None
+    
+    def _acquire(self):
+        """Take an idle agent set, build one if under capacity, or wait for one"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        agent = self._try_create()
+        if agent is not None:
+            return agent
+        
+        # Wait in short slices so a slot freed by a discarded agent set is noticed
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No underwriter agent available after {self.checkout_timeout}s")
+            try:
+                return self._idle.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                agent = self._try_create()
+                if agent is not None:
+                    return agent
+    
+    def stats(self):
+        """
+        Get pool utilisation
+        
+        Returns:
+            dict: Pool size, agent sets created and agent sets idle
+        """
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+_agent_pool = None
+_agent_pool_lock = threading.Lock()
+
+def get_agent_pool():
+    """
+    Get the process-wide agent pool, creating and prewarming it on first use
+    
+    Returns:
+        AgentPool: The shared pool
+    """
+    global _agent_pool
+    if _agent_pool is None:
+        with _agent_pool_lock:
+            if _agent_pool is None:
+                pool = AgentPool()
+                pool.prewarm()
+                _agent_pool = pool
+    return _agent_pool
+
+def get_agent_pool_stats():
+    """
+    Get utilisation of the process-wide agent pool without creating it
+    
+    Returns:
+        dict: Pool statistics, empty if no workflow has run yet
+    """
+    pool = _agent_pool
+    return pool.stats() if pool is not None else {}
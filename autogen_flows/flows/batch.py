@@ -0,0 +1,214 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from autogen_flows.config.config import config
+from autogen_flows.utils import json_default
+
+logger = logging.getLogger(__name__)
+
+# Request fields passed through from a batch item to the analysis
+ITEM_FIELDS = ('form_id', 'business_id', 'restaurant_name', 'restaurant_address')
+
+def normalize_batch_item(item, id_type="business_id"):
+    """
+    Turn a batch item into an analysis request body
+    
+    Args:
+        item (str or dict): A bare ID, or a dict with form_id, business_id or
+            restaurant_name and restaurant_address
+        id_type (str, optional): What a bare ID is ("business_id" or "form_id"). Defaults to "business_id".
+    
+    Returns:
+        dict: The request body
+    
+    Raises:
+        ValueError: If the item identifies no restaurant
+    """
+    if isinstance(item, dict):
+        request = {key: item[key] for key in ITEM_FIELDS if item.get(key)}
+    elif isinstance(item, (str, int)) and str(item).strip():
+        request = {id_type: str(item).strip()}
+    else:
+        request = {}
+    
+    if not (request.get('form_id') or request.get('business_id') or
+            (request.get('restaurant_name') and request.get('restaurant_address'))):
+        raise ValueError(f"Batch item does not identify a restaurant: {item!r}")
+    return request
+
+class BatchRunner:
+    """
+    Runs a portfolio of restaurant analyses with bounded concurrency
+    
+    At most max_workers items are in flight at once and items are only
+    submitted as earlier ones finish, so a long batch does not queue every
+    item up front and stops submitting as soon as its consumer stops
+    reading. Results are produced in completion order, each with its own
+    latency; throughput and latency percentiles are kept for the summary.
+    
+    All items go through the one analyze callable, so they share its data
+    collector (HTTP connection pool, resolution and response caches), the
+    sentiment memo, the LLM cache and the agent pool.
+    """
+    
+    def __init__(self, analyze, max_workers=None):
+        """
+        Initialize the batch runner
+        
+        Args:
+            analyze (callable): Called with a request body; returns (response body, HTTP status code)
+            max_workers (int, optional): Items analyzed concurrently. Defaults to BATCH_MAX_WORKERS.
+        """
+        self.analyze = analyze
+        self.max_workers = max_workers or config.workflow.batch_max_workers
+        self._lock = threading.Lock()
+        self._reset_stats()
+    
+    def _reset_stats(self):
+        """Clear the counters of the previous run"""
+        self.started_at = None
+        self.finished_at = None
+        self.succeeded = 0
+        self.failed = 0
+        self.latencies = []
+    
+    def _run_item(self, index, request):
+        """Analyze one item and build its result record"""
+        start = time.perf_counter()
+        record = {"index": index, "request": request}
+        try:
+            payload, status_code = self.analyze(request)
+            if status_code == 200:
+                record["status"] = "succeeded"
+                record["result"] = payload
+            else:
+                record["status"] = "failed"
+                record["error"] = payload.get("error", f"HTTP {status_code}")
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {str(e)}")
+            record["status"] = "failed"
+            record["error"] = str(e)
+        record["latency_seconds"] = round(time.perf_counter() - start, 3)
+        return record
+    
+    def iter_results(self, items, id_type="business_id"):
+        """
+        Analyze every item, yielding result records as they complete
+        
+        Items that do not identify a restaurant are reported as failed
+        without being analyzed.
+        
+        Args:
+            items (list): Bare IDs or request dicts (see normalize_batch_item)
+            id_type (str, optional): What bare IDs are. Defaults to "business_id".
+        
+        Yields:
+            dict: index, request, status ("succeeded" or "failed"), latency_seconds,
+                and result or error
+        """
+        self._reset_stats()
+        self.started_at = time.time()
+        queued = iter(enumerate(items))
+        running = set()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            try:
+                while True:
+                    # Keep up to max_workers items in flight
+                    while len(running) < self.max_workers:
+                        entry = next(queued, None)
+                        if entry is None:
+                            break
+                        index, item = entry
+                        try:
+                            request = normalize_batch_item(item, id_type)
+                        except ValueError as e:
+                            record = {"index": index, "request": item, "status": "failed",
+                                      "error": str(e), "latency_seconds": 0.0}
+                            self._record(record)
+                            yield record
+                            continue
+                        running.add(executor.submit(self._run_item, index, request))
+                    
+                    if not running:
+                        break
+                    
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = future.result()
+                        self._record(record)
+                        yield record
+            finally:
+                # Consumer went away: let in-flight items finish but start no more
+                for future in running:
+                    future.cancel()
+                self.finished_at = time.time()
+    
+    def _record(self, record):
+        """Count a finished item"""
+        with self._lock:
+            if record["status"] == "succeeded":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.latencies.append(record["latency_seconds"])
+    
+    def run(self, items, output=None, id_type="business_id"):
+        """
+        Analyze every item, writing each result as a JSON line as soon as it completes
+        
+        Args:
+            items (list): Bare IDs or request dicts (see normalize_batch_item)
+            output (file, optional): Text stream for the JSON Lines results. Defaults to None (not written).
+            id_type (str, optional): What bare IDs are. Defaults to "business_id".
+        
+        Returns:
+            dict: The batch summary (see summary)
+        """
+        for record in self.iter_results(items, id_type):
+            logger.info(f"Batch item {record['index']} {record['status']} in {record['latency_seconds']:.2f}s")
+            if output is not None:
+                output.write(json.dumps(record, default=json_default) + "\n")
+                output.flush()
+        summary = self.summary()
+        logger.info(f"Batch finished: {summary['succeeded']} succeeded, {summary['failed']} failed, " +
+                    f"{summary['items_per_minute']:.1f} items/min")
+        return summary
+    
+    def summary(self):
+        """
+        Get throughput and latency figures for the last run
+        
+        Returns:
+            dict: Item counts, elapsed seconds, items per minute and latency
+                mean/p50/p95/max in seconds
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            succeeded, failed = self.succeeded, self.failed
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        completed = succeeded + failed
+        
+        def percentile(fraction):
+            # Nearest-rank percentile
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, max(0, int(round(fraction * len(latencies))) - 1))]
+        
+        return {
+            "items": completed,
+            "succeeded": succeeded,
+            "failed": failed,
+            "max_workers": self.max_workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_minute": round(completed / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "latency_seconds": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": latencies[-1] if latencies else 0.0
+            }
+        }
@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from autogen_flows.config.config import config
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the job queue is at capacity"""
+
+class Job:
+    """A unit of background work and its outcome"""
+    
+    def __init__(self, job_id, description=None):
+        self.job_id = job_id
+        self.description = description or {}
+        self.status = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+    
+    def to_dict(self):
+        """
+        Get the job's status without its result
+        
+        Returns:
+            dict: Job ID, status, description, timestamps and error (if failed)
+        """
+        status = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "request": self.description,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.started_at is not None:
+            status["queue_seconds"] = self.started_at - self.submitted_at
+        if self.finished_at is not None:
+            status["run_seconds"] = self.finished_at - self.started_at
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+class JobManager:
+    """
+    Runs submitted work on a bounded worker pool and keeps the outcomes for polling
+    
+    At most max_workers jobs run at once and at most queue_size more wait for a
+    worker; submissions beyond that are rejected with JobQueueFullError rather
+    than queued without bound. Finished jobs are kept for result_ttl seconds.
+    """
+    
+    def __init__(self, max_workers=None, queue_size=None, result_ttl=None):
+        """
+        Initialize the job manager
+        
+        Args:
+            max_workers (int, optional): Jobs run concurrently. Defaults to JOB_MAX_WORKERS.
+            queue_size (int, optional): Jobs allowed to wait for a worker. Defaults to JOB_QUEUE_SIZE.
+            result_ttl (float, optional): Seconds finished jobs are kept. Defaults to JOB_RESULT_TTL.
+        """
+        self.max_workers = max_workers or config.workflow.job_max_workers
+        self.queue_size = queue_size if queue_size is not None else config.workflow.job_queue_size
+        self.result_ttl = result_ttl if result_ttl is not None else config.workflow.job_result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="underwriter-job")
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+    
+    def submit(self, func, *args, description=None, **kwargs):
+        """
+        Queue func(*args, **kwargs) to run in the background
+        
+        Args:
+            func (callable): The work to run; its return value becomes the job result
+            description (dict, optional): Request details reported with the job status
+            *args, **kwargs: Arguments for func
+        
+        Returns:
+            str: The job ID
+        
+        Raises:
+            JobQueueFullError: If max_workers + queue_size jobs are already queued or running
+        """
+        with self._lock:
+            self._prune_finished()
+            if self._active >= self.max_workers + self.queue_size:
+                raise JobQueueFullError(f"Job queue is full ({self._active} jobs queued or running)")
+            self._active += 1
+            job = Job(uuid.uuid4().hex, description)
+            self._jobs[job.job_id] = job
+        
+        logger.info(f"Queued job {job.job_id}")
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job.job_id
+    
+    def _run(self, job, func, args, kwargs):
+        """Run a job on a worker thread and record its outcome"""
+        job.started_at = time.time()
+        job.status = JOB_RUNNING
+        try:
+            job.result = func(*args, **kwargs)
+            job.status = JOB_SUCCEEDED
+            logger.info(f"Job {job.job_id} succeeded")
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active -= 1
+    
+    def _prune_finished(self):
+        """Forget finished jobs older than result_ttl (caller holds the lock)"""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+    
+    def get(self, job_id):
+        """
+        Look up a job
+        
+        Args:
+            job_id (str): The job ID
+        
+        Returns:
+            Job: The job, or None if it is unknown or has expired
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def stats(self):
+        """
+        Get queue utilisation
+        
+        Returns:
+            dict: Worker and queue capacity and jobs per status
+        """
+        with self._lock:
+            counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_SUCCEEDED: 0, JOB_FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return {"max_workers": self.max_workers, "queue_size": self.queue_size, "jobs": counts}
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """
+    Get the process-wide job manager, creating it on first use
+    
+    Returns:
+        JobManager: The shared job manager
+    """
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                _job_manager = JobManager()
+    return _job_manager
+
+def get_job_stats():
+    """
+    Get utilisation of the process-wide job manager without creating it
+    
+    Returns:
+        dict: Job manager statistics, empty if no job has been submitted yet
+    """
+    manager = _job_manager
+    return manager.stats() if manager is not None else {}
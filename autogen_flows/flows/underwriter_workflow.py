@@ -1,30 +1,63 @@
 import logging
-from autogen_flows.agents.underwriter_agent import UnderwriterAgent
+from autogen_flows.flows.agent_pool import get_agent_pool
+from modules.single_flight import SingleFlight
+from modules.tracing import span
 
 logger = logging.getLogger(__name__)
 
-def run_underwriter_workflow(data=None, data_source="sample", identifier=None, form_id=None, business_id=None):
+# Concurrent workflows for the same form/business share one in-flight run
+_workflow_flights = SingleFlight()
+
+def run_underwriter_workflow(data=None, data_source="sample", identifier=None, form_id=None, business_id=None,
+                             progress_callback=None):
     """
     Run the complete restaurant underwriter workflow
     
+    Concurrent calls with the same form_id/business_id are coalesced: one
+    workflow runs and every caller receives a shallow copy of its report.
+    Calls without either identifier, and calls with a progress_callback
+    (whose events could not be replayed to a coalesced caller), always run
+    their own workflow.
+    
     Args:
         data (dict, optional): Restaurant data to analyze. Defaults to None.
         data_source (str, optional): Source of data if data is None. Defaults to "sample".
         identifier (str, optional): Business ID or Form ID for API lookup. Defaults to None.
         form_id (str, optional): Form ID for fetching Google images. Defaults to None.
         business_id (str, optional): Yelp business ID for fetching reviews. Defaults to None.
+        progress_callback (callable, optional): Called as progress_callback(event, payload)
+            with partial results as each stage completes. Defaults to None.
     
     Returns:
         dict: Comprehensive underwriting report
     """
-    logger.info("Initializing underwriter workflow")
+    if progress_callback or not (form_id or business_id):
+        return _run_workflow(data, data_source, identifier, form_id, business_id, progress_callback)
+    
+    key = f"{data_source}|{str(form_id or '').strip()}|{str(business_id or '').strip()}"
+    with span("workflow.single_flight", key=key):
+        return _workflow_flights.do(
+            key, lambda: _run_workflow(data, data_source, identifier, form_id, business_id)
+        )
+
+def get_workflow_flight_stats():
+    """
+    Get counters of workflows run and requests coalesced into in-flight workflows
     
-    # Initialize the underwriter agent
-    underwriter = UnderwriterAgent()
+    Returns:
+        dict: executions, coalesced and in_flight counts
+    """
+    return _workflow_flights.stats()
+
+def _run_workflow(data, data_source, identifier, form_id, business_id, progress_callback=None):
+    """Run one workflow on a pooled agent set (see run_underwriter_workflow)"""
+    logger.info("Initializing underwriter workflow")
     
-    # Run the full workflow
+    # Borrow a pre-built underwriter agent set from the pool
     try:
-        final_report = underwriter.run_full_workflow(data, data_source, identifier, form_id, business_id)
+        with span("workflow"), get_agent_pool().checkout() as underwriter:
+            final_report = underwriter.run_full_workflow(data, data_source, identifier, form_id, business_id,
+                                                         progress_callback=progress_callback)
         logger.info("Underwriter workflow completed successfully")
         return final_report
     except Exception as e:
@@ -1,4 +1,4 @@
 # Utils Package
-from autogen_flows.utils.json_utils import extract_json_from_response
+from autogen_flows.utils.json_utils import extract_json_from_response, json_default
 
-__all__ = ['extract_json_from_response']
\ No newline at end of file
+__all__ = ['extract_json_from_response', 'json_default']
\ No newline at end of file
@@ -1,12 +1,58 @@
 import json
 import re
 import logging
+from modules.metrics import counter
 
 logger = logging.getLogger(__name__)
 
+# Unparseable responses make the agents fall back to placeholder results
+_parse_failures = counter("underwriter_llm_parse_failures_total",
+                          "LLM responses no JSON object could be extracted from")
+
+def json_default(obj):
+    """
+    json.dumps default hook for objects used in workflow results
+    
+    Columnar containers such as AnalyzedReviewBatch are serialized through
+    their to_records() method and NumPy scalars/arrays through tolist().
+    
+    Args:
+        obj: Object the json module cannot serialize natively
+        
+    Returns:
+        A JSON-serializable equivalent of obj
+    """
+    if hasattr(obj, "to_records"):
+        return obj.to_records()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+_decoder = json.JSONDecoder()
+
+# One-pass repairs for near-JSON: trailing commas and Python literals outside strings
+_REPAIRS = re.compile(r'"(?:[^"\\]|\\.)*"|,(\s*[}\]])|\b(True|False|None)\b')
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+def _repair(match):
+    """Substitution for _REPAIRS: drop the trailing comma, convert the literal, keep strings as they are"""
+    if match.group(1) is not None:
+        return match.group(1)
+    if match.group(2) is not None:
+        return _LITERALS[match.group(2)]
+    return match.group(0)
+
 def extract_json_from_response(response_text):
     """
-    Attempts to extract valid JSON from a potentially messy LLM response
+    Extract a JSON object from an LLM response
+    
+    Responses produced with native structured output parse directly. For
+    anything else the first JSON object in the text is decoded in place with
+    JSONDecoder.raw_decode, which skips any prose or code fence around it and
+    stops at the object's closing brace, so the text is scanned once rather
+    than re-matched by several regular expressions. If that fails, trailing
+    commas and Python-style True/False/None (outside strings) are repaired in
+    a single pass and the object is decoded again.
     
     Args:
         response_text (str): The raw text response from an LLM
@@ -14,49 +60,28 @@ def extract_json_from_response(response_text):
     Returns:
         dict: Parsed JSON object, or None if parsing fails
     """
-    # Try to extract JSON directly
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        pass
+    if not response_text:
+        logger.error("Failed to extract JSON from empty response")
+        _parse_failures.inc()
+        return None
     
-    # Try to extract JSON between backticks (common for code blocks)
+    text = response_text.strip()
     try:
-        json_match = re.search(r'```(?:json)?(.*?)```', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1).strip()
-            return json.loads(json_str)
-    except (json.JSONDecodeError, AttributeError):
-        pass
-    
-    # Try to extract JSON between curly braces (most JSON objects)
-    try:
-        json_match = re.search(r'({.*})', response_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1).strip()
-            return json.loads(json_str)
-    except (json.JSONDecodeError, AttributeError):
+        result = json.loads(text)
+        if isinstance(result, dict):
+            return result
+    except json.JSONDecodeError:
         pass
     
-    # Try to fix common formatting issues that might cause JSON parsing to fail
-    try:
-        # Replace single quotes with double quotes
-        fixed_str = response_text.replace("'", '"')
-        # Fix malformed booleans
-        fixed_str = re.sub(r':\s*True\b', ': true', fixed_str)
-        fixed_str = re.sub(r':\s*False\b', ': false', fixed_str)
-        # Fix trailing commas
-        fixed_str = re.sub(r',\s*}', '}', fixed_str)
-        fixed_str = re.sub(r',\s*]', ']', fixed_str)
-        
-        # Try to extract a JSON object with the fixes
-        json_match = re.search(r'({.*})', fixed_str, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1).strip()
-            return json.loads(json_str)
-    except (json.JSONDecodeError, AttributeError):
-        pass
+    if "{" in text:
+        for candidate in (text, _REPAIRS.sub(_repair, text)):
+            try:
+                result, _ = _decoder.raw_decode(candidate, candidate.find("{"))
+                if isinstance(result, dict):
+                    return result
+            except json.JSONDecodeError:
+                pass
     
-    # If all attempts fail, log the issue and return None
     logger.error("Failed to extract JSON from response")
-    return None
\ No newline at end of file
+    _parse_failures.inc()
+    return None
@@ -1,14 +1,98 @@
 import os
+import contextvars
 import requests
 import json
 import logging
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
 from autogen_flows.config.config import config
+from autogen_flows.utils.rate_limiter import get_rate_limiter, RateLimitTimeoutError
+from modules.cache import TieredCache
+from modules.tracing import span, current_span
+from modules.metrics import counter, histogram
 
 logger = logging.getLogger(__name__)
 
-def get_llm_client():
+# Name of the agent making LLM calls in the current context, used as a metrics label
+_current_agent = contextvars.ContextVar("llm_agent", default="none")
+
+_llm_calls = counter("underwriter_llm_calls_total", "LLM calls by outcome (success, error or cached)",
+                     ("provider", "model", "agent", "outcome"))
+_llm_tokens = counter("underwriter_llm_tokens_total", "LLM tokens consumed (reported or estimated)",
+                      ("provider", "model", "agent", "kind"))
+_llm_seconds = histogram("underwriter_llm_call_duration_seconds", "Latency of uncached LLM calls, including retries",
+                         ("provider", "model", "agent"))
+_llm_retries = counter("underwriter_llm_retries_total", "LLM call attempts retried after a transient error",
+                       ("provider", "model"))
+
+@contextmanager
+def agent_context(name):
+    """
+    Attribute the LLM calls made inside the with block to an agent in metrics
+    
+    Args:
+        name (str): Agent name
+    """
+    token = _current_agent.set(name)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+def current_agent():
+    """
+    Get the name of the agent making LLM calls in the current context
+    
+    Returns:
+        str: Agent name, or "none" outside an agent
     """
-    Get the appropriate LLM client based on configuration
+    return _current_agent.get()
+
+def _build_http_client():
+    """
+    Build a keep-alive HTTP client shared by all calls to one provider/model
+
+    Returns:
+        httpx.Client: Pooled HTTP client, or None if httpx is unavailable
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+
+    limits = httpx.Limits(
+        max_connections=config.llm.pool_max_connections,
+        max_keepalive_connections=config.llm.pool_max_keepalive,
+        keepalive_expiry=config.llm.pool_idle_timeout
+    )
+    return httpx.Client(limits=limits, timeout=config.llm.request_timeout)
+
+def _client_key():
+    """
+    Get the registry key for the currently configured provider and model
+
+    Returns:
+        tuple: (provider, model)
+    """
+    provider = config.llm.provider
+    if provider == "openai":
+        return (provider, config.llm.openai_model)
+    elif provider == "azure":
+        return (provider, config.llm.azure_deployment)
+    elif provider == "anthropic":
+        return (provider, config.llm.anthropic_model)
+    return (provider, None)
+
+def create_llm_client():
+    """
+    Create a new LLM client based on configuration
+
+    Prefer get_llm_client(), which reuses a pooled client per provider/model.
+    The SDKs' own retries are disabled: LLMClient.chat_completion retries in
+    step with the shared rate limiter instead.
     """
     if config.llm.provider == "openai":
         if not config.llm.openai_api_key:
@@ -16,7 +100,13 @@ def get_llm_client():
             return MockLLMClient()
         try:
             import openai
-            client = openai.OpenAI(api_key=config.llm.openai_api_key)
+            http_client = _build_http_client()
+            client_kwargs = {"api_key": config.llm.openai_api_key, "max_retries": 0}
+            if config.llm.openai_base_url:
+                client_kwargs["base_url"] = config.llm.openai_base_url
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+            client = openai.OpenAI(**client_kwargs)
             return OpenAIClient(client)
         except ImportError:
             logger.error("openai package not installed.")
@@ -28,11 +118,16 @@ def get_llm_client():
             return MockLLMClient()
         try:
             import openai
-            client = openai.AzureOpenAI(
-                api_key=config.llm.azure_api_key,
-                api_version="2023-05-15",
-                azure_endpoint=config.llm.azure_endpoint
-            )
+            http_client = _build_http_client()
+            client_kwargs = {
+                "api_key": config.llm.azure_api_key,
+                "api_version": "2023-05-15",
+                "azure_endpoint": config.llm.azure_endpoint,
+                "max_retries": 0
+            }
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+            client = openai.AzureOpenAI(**client_kwargs)
             return AzureOpenAIClient(client, config.llm.azure_deployment)
         except ImportError:
             logger.error("openai package not installed.")
@@ -44,7 +139,11 @@ def get_llm_client():
             return MockLLMClient()
         try:
             import anthropic
-            client = anthropic.Anthropic(api_key=config.llm.anthropic_api_key)
+            http_client = _build_http_client()
+            client_kwargs = {"api_key": config.llm.anthropic_api_key, "max_retries": 0}
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+            client = anthropic.Anthropic(**client_kwargs)
             return AnthropicClient(client)
         except ImportError:
             logger.error("anthropic package not installed.")
@@ -54,101 +153,407 @@ def get_llm_client():
         logger.warning(f"Unknown LLM provider: {config.llm.provider}. Using a mock LLM client.")
         return MockLLMClient()
 
+class LLMClientRegistry:
+    """
+    Process-wide registry of LLM clients keyed by provider and model
+
+    Clients are created lazily on first use and reused by every later call, so
+    each process keeps one keep-alive connection pool per provider/model.
+    Clients that have not been used for longer than the idle timeout are closed
+    and dropped, unless a call is still in flight on them.
+    """
+
+    def __init__(self, idle_timeout=None):
+        """
+        Initialize the registry
+
+        Args:
+            idle_timeout (float, optional): Seconds before an unused client is evicted.
+                Defaults to the LLM_POOL_IDLE_TIMEOUT setting.
+        """
+        self.idle_timeout = idle_timeout if idle_timeout is not None else config.llm.pool_idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        """
+        Borrow the pooled client for the configured provider/model
+
+        Yields:
+            LLMClient: The shared client
+        """
+        key = _client_key()
+        with self._lock:
+            self._evict_idle(exclude=key)
+            entry = self._entries.get(key)
+            if entry is None:
+                logger.info(f"Creating pooled LLM client for {key[0]} ({key[1]})")
+                entry = {"client": create_llm_client(), "last_used": time.monotonic(), "active": 0}
+                self._entries[key] = entry
+            entry["active"] += 1
+            entry["last_used"] = time.monotonic()
+        try:
+            yield entry["client"]
+        finally:
+            with self._lock:
+                entry["active"] -= 1
+                entry["last_used"] = time.monotonic()
+
+    def get(self):
+        """
+        Get the pooled client for the configured provider/model
+
+        Returns:
+            LLMClient: The shared client
+        """
+        with self.lease() as client:
+            return client
+
+    def _evict_idle(self, exclude=None):
+        """Close clients idle for longer than the idle timeout (caller holds the lock)"""
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if key == exclude or entry["active"] > 0:
+                continue
+            if now - entry["last_used"] > self.idle_timeout:
+                logger.info(f"Evicting idle LLM client for {key[0]} ({key[1]})")
+                del self._entries[key]
+                entry["client"].close()
+
+    def close_all(self):
+        """Close and drop every pooled client"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries = {}
+        for entry in entries:
+            entry["client"].close()
+
+_client_registry = LLMClientRegistry()
+
+def get_llm_client():
+    """
+    Get the pooled LLM client for the configured provider/model
+    """
+    return _client_registry.get()
+
+def close_llm_clients():
+    """Close all pooled LLM clients (e.g. at shutdown or after a config change)"""
+    _client_registry.close_all()
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+# and Anthropic's 529 "overloaded"
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# SDK exceptions without a status code that are still transient
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "ConnectTimeout"}
+
+def _error_status(error):
+    """Get the HTTP status of an SDK exception, or None"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def _retry_after(error):
+    """
+    Get the provider's requested retry delay from an SDK exception
+    
+    Returns:
+        float: Seconds from the retry-after-ms or retry-after header, or None
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # HTTP-date form; fall back to exponential backoff
+        pass
+    return None
+
+def _retry_delay(error, attempt):
+    """
+    Decide whether and when to retry a failed LLM call
+    
+    Args:
+        error (Exception): The exception raised by the SDK
+        attempt (int): Zero-based attempt number that failed
+    
+    Returns:
+        float: Seconds to wait before retrying, or None if the error is not retryable
+    """
+    status = _error_status(error)
+    if status is not None:
+        if status not in RETRYABLE_STATUS_CODES:
+            return None
+    elif type(error).__name__ not in RETRYABLE_ERROR_NAMES and not isinstance(error, (ConnectionError, TimeoutError)):
+        return None
+    
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        return min(retry_after, config.llm.retry_max_delay)
+    # Exponential backoff with jitter so retries from concurrent calls spread out
+    backoff = min(config.llm.retry_max_delay, config.llm.retry_base_delay * (2 ** attempt))
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
 class LLMClient:
-    """Base LLM client interface"""
+    """
+    Base LLM client interface
+    
+    Subclasses implement _complete(). chat_completion() wraps it with the
+    shared rate limiter of the client's provider/model and retries rate-limited
+    (429), overloaded and transient failures with backoff.
+    """
+    provider = None
+    
+    def rate_limit_model(self):
+        """Get the model or deployment this client's calls are rate limited under"""
+        return getattr(self, "model", None)
+    
     def chat_completion(self, messages, **kwargs):
-        """Send a chat completion request to the LLM"""
+        """
+        Send a chat completion request to the LLM
+        
+        Args:
+            messages (list): List of message dictionaries with 'role' and 'content'
+            **kwargs: temperature, max_tokens and provider-specific options
+        
+        Returns:
+            dict: content, role, finish_reason ("error" if the call failed after
+                retries) and usage (token counts, when the provider reports them)
+        """
+        if self.provider is None:
+            return self._complete(messages, **kwargs)
+        
+        limiter = get_rate_limiter(self.provider, self.rate_limit_model())
+        # Providers count max_tokens against the token budget when the request starts
+        estimated_tokens = estimate_message_tokens(messages) + kwargs.get("max_tokens", 2000)
+        attempt = 0
+        while True:
+            try:
+                with limiter.limit(estimated_tokens) as lease:
+                    if lease.waited:
+                        current_span().add("rate_limit_wait_ms", round(lease.waited * 1000.0, 3))
+                    response = self._complete(messages, **kwargs)
+                    lease.tokens_used = (response.get("usage") or {}).get("total_tokens")
+                return response
+            except RateLimitTimeoutError as e:
+                logger.error(f"Error calling {self.provider} API: {str(e)}")
+                return {"content": f"Error: {str(e)}", "role": "assistant", "finish_reason": "error"}
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt >= config.llm.max_retries:
+                    logger.error(f"Error calling {self.provider} API: {str(e)}")
+                    return {"content": f"Error: {str(e)}", "role": "assistant", "finish_reason": "error"}
+                attempt += 1
+                current_span().add("retries")
+                _llm_retries.inc(provider=self.provider, model=str(self.rate_limit_model()))
+                if _error_status(e) == 429:
+                    # Hold back every caller on this provider/model, not just this one
+                    limiter.pause(delay)
+                else:
+                    logger.warning(f"{self.provider} call failed ({str(e)}), retrying in {delay:.1f}s " +
+                                   f"(attempt {attempt} of {config.llm.max_retries})")
+                    time.sleep(delay)
+    
+    def _complete(self, messages, **kwargs):
+        """Make one provider call; raise the SDK's exception on failure"""
         raise NotImplementedError("Subclasses must implement this method")
 
-class OpenAIClient(LLMClient):
+    def close(self):
+        """Release the underlying SDK client and its connection pool"""
+        client = getattr(self, "client", None)
+        if client is not None and hasattr(client, "close"):
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing LLM client: {str(e)}")
+
+def _usage(response):
+    """Get the token counts of an OpenAI-style response, or None"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None)
+    }
+
+# Models that accept json_schema response formats (prefixes), less the dated or
+# preview releases that predate it, and older models without any JSON mode
+_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4")
+_NO_JSON_SCHEMA_MODELS = ("gpt-4o-2024-05-13", "o1-mini", "o1-preview")
+_NO_JSON_MODE_MODELS = {
+    "gpt-4", "gpt-4-0314", "gpt-4-0613", "gpt-4-32k", "gpt-4-32k-0314", "gpt-4-32k-0613",
+    "gpt-3.5-turbo-0301", "gpt-3.5-turbo-0613", "gpt-3.5-turbo-16k", "gpt-3.5-turbo-16k-0613"
+}
+
+def structured_output_mode(model):
+    """
+    Pick the structured output mode for LLM_STRUCTURED_OUTPUT=auto from a model name
+    
+    Args:
+        model (str): Model or deployment name
+    
+    Returns:
+        str: json_schema for models known to support it, off for models without a
+            JSON mode, and json_object otherwise (including unrecognised Azure
+            deployment names; a rejection still steps down to off)
+    """
+    name = (model or "").lower()
+    if name in _NO_JSON_MODE_MODELS:
+        return "off"
+    if name.startswith(_JSON_SCHEMA_MODELS) and not name.startswith(_NO_JSON_SCHEMA_MODELS):
+        return "json_schema"
+    return "json_object"
+
+class _OpenAIChatClient(LLMClient):
+    """
+    Chat completions call shared by the OpenAI and Azure OpenAI clients
+    
+    A response_schema kwarg is sent as the provider's native structured output
+    (LLM_STRUCTURED_OUTPUT; auto picks the mode from the model name). If the
+    model rejects that response_format the client steps down, json_schema to
+    json_object to off, and remembers it.
+    """
+    structured_output = None
+    
+    def _response_format(self, response_schema, target):
+        """Map a response schema to the response_format of the current structured output mode"""
+        mode = self.structured_output or config.llm.structured_output
+        if mode == "auto":
+            mode = structured_output_mode(target.get("model") or target.get("deployment_id"))
+        if not response_schema or mode not in ("json_schema", "json_object"):
+            return None
+        if mode == "json_schema":
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": response_schema["name"], "schema": response_schema["schema"], "strict": True}
+            }
+        return {"type": "json_object"}
+    
+    def _chat_create(self, messages, target, **kwargs):
+        """
+        Call chat.completions.create
+        
+        Args:
+            messages (list): List of message dictionaries with 'role' and 'content'
+            target (dict): model= or deployment_id= argument
+            **kwargs: temperature, max_tokens and response_schema
+        
+        Returns:
+            dict: content, role, finish_reason and usage
+        """
+        request = dict(
+            target,
+            messages=messages,
+            temperature=kwargs.get("temperature", 0.7),
+            max_tokens=kwargs.get("max_tokens", 2000)
+        )
+        response_format = self._response_format(kwargs.get("response_schema"), target)
+        if response_format is not None:
+            request["response_format"] = response_format
+        try:
+            response = self.client.chat.completions.create(**request)
+        except Exception as e:
+            if response_format is None or _error_status(e) != 400 or "response_format" not in str(e):
+                raise
+            self.structured_output = "json_object" if response_format["type"] == "json_schema" else "off"
+            logger.warning(f"{self.provider} model rejected {response_format['type']} output, " +
+                           f"falling back to {self.structured_output}")
+            return self._chat_create(messages, target, **kwargs)
+        return {
+            "content": response.choices[0].message.content,
+            "role": response.choices[0].message.role,
+            "finish_reason": response.choices[0].finish_reason,
+            "usage": _usage(response)
+        }
+
+class OpenAIClient(_OpenAIChatClient):
     """OpenAI client implementation"""
+    provider = "openai"
+    
     def __init__(self, client):
         self.client = client
         self.model = config.llm.openai_model
     
-    def chat_completion(self, messages, **kwargs):
-        try:
-            response = self.client.chat.completions.create(
-                model=kwargs.get("model", self.model),
-                messages=messages,
-                temperature=kwargs.get("temperature", 0.7),
-                max_tokens=kwargs.get("max_tokens", 2000)
-            )
-            return {
-                "content": response.choices[0].message.content,
-                "role": response.choices[0].message.role,
-                "finish_reason": response.choices[0].finish_reason
-            }
-        except Exception as e:
-            logger.error(f"Error calling OpenAI API: {str(e)}")
-            return {"content": f"Error: {str(e)}", "role": "assistant", "finish_reason": "error"}
+    def _complete(self, messages, **kwargs):
+        return self._chat_create(messages, {"model": kwargs.get("model", self.model)}, **kwargs)
 
-class AzureOpenAIClient(LLMClient):
+class AzureOpenAIClient(_OpenAIChatClient):
     """Azure OpenAI client implementation"""
+    provider = "azure"
+    
     def __init__(self, client, deployment_name):
         self.client = client
         self.deployment_name = deployment_name
     
-    def chat_completion(self, messages, **kwargs):
-        try:
-            response = self.client.chat.completions.create(
-                deployment_id=self.deployment_name,
-                messages=messages,
-                temperature=kwargs.get("temperature", 0.7),
-                max_tokens=kwargs.get("max_tokens", 2000)
-            )
-            return {
-                "content": response.choices[0].message.content,
-                "role": response.choices[0].message.role,
-                "finish_reason": response.choices[0].finish_reason
-            }
-        except Exception as e:
-            logger.error(f"Error calling Azure OpenAI API: {str(e)}")
-            return {"content": f"Error: {str(e)}", "role": "assistant", "finish_reason": "error"}
+    def rate_limit_model(self):
+        return self.deployment_name
+    
+    def _complete(self, messages, **kwargs):
+        return self._chat_create(messages, {"deployment_id": self.deployment_name}, **kwargs)
 
 class AnthropicClient(LLMClient):
     """Anthropic client implementation"""
+    provider = "anthropic"
+    
     def __init__(self, client):
         self.client = client
         self.model = config.llm.anthropic_model
     
-    def chat_completion(self, messages, **kwargs):
-        try:
-            # Convert messages from OpenAI format to Anthropic format
-            prompt = ""
-            for message in messages:
-                role = message["role"]
-                content = message["content"]
-                if role == "system":
-                    # For system messages, we prefix the first user message
-                    continue
-                elif role == "user":
-                    prompt += f"\n\nHuman: {content}"
-                elif role == "assistant":
-                    prompt += f"\n\nAssistant: {content}"
-            
-            # Add the final assistant prompt
-            prompt += "\n\nAssistant:"
-            
-            response = self.client.completions.create(
-                model=self.model,
-                prompt=prompt,
-                max_tokens_to_sample=kwargs.get("max_tokens", 2000),
-                temperature=kwargs.get("temperature", 0.7)
-            )
-            
-            return {
-                "content": response.completion,
-                "role": "assistant",
-                "finish_reason": "stop"  # Anthropic doesn't provide this directly
+    def _complete(self, messages, **kwargs):
+        # Convert messages from OpenAI format to Anthropic format
+        prompt = ""
+        for message in messages:
+            role = message["role"]
+            content = message["content"]
+            if role == "system":
+                # For system messages, we prefix the first user message
+                continue
+            elif role == "user":
+                prompt += f"\n\nHuman: {content}"
+            elif role == "assistant":
+                prompt += f"\n\nAssistant: {content}"
+        
+        # Add the final assistant prompt. The text completions API has no JSON mode, so
+        # when a structured response is wanted the answer is prefilled with its opening brace.
+        prompt += "\n\nAssistant:"
+        prefill = "{" if kwargs.get("response_schema") else ""
+        if prefill:
+            prompt += " " + prefill
+        
+        response = self.client.completions.create(
+            model=self.model,
+            prompt=prompt,
+            max_tokens_to_sample=kwargs.get("max_tokens", 2000),
+            temperature=kwargs.get("temperature", 0.7)
+        )
+        
+        # The text completions API reports no usage; estimate it so the token budget stays honest
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(response.completion)
+        return {
+            "content": prefill + response.completion,
+            "role": "assistant",
+            "finish_reason": "stop",  # Anthropic doesn't provide this directly
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
             }
-        except Exception as e:
-            logger.error(f"Error calling Anthropic API: {str(e)}")
-            return {"content": f"Error: {str(e)}", "role": "assistant", "finish_reason": "error"}
+        }
 
 class MockLLMClient(LLMClient):
     """Mock LLM client for testing purposes"""
-    def chat_completion(self, messages, **kwargs):
+    def _complete(self, messages, **kwargs):
         # Get the last user message
         last_message = "No user message found"
         for message in reversed(messages):
@@ -162,17 +567,144 @@ class MockLLMClient(LLMClient):
             "finish_reason": "stop"
         }
 
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of tokens in a piece of text
+    
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for budgeting without loading a tokenizer.
+    
+    Args:
+        text (str): Text to measure
+    
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+def estimate_message_tokens(messages):
+    """
+    Roughly estimate the number of tokens in a list of chat messages
+    
+    Args:
+        messages (list): List of message dictionaries with 'role' and 'content'
+    
+    Returns:
+        int: Estimated token count, including a small per-message overhead
+    """
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
 def generate_response(messages, **kwargs):
     """
     Generate a response from an LLM using the configured client
     
     Args:
         messages (list): List of message dictionaries with 'role' and 'content'
-        **kwargs: Additional arguments for the LLM API call
+        **kwargs: Additional arguments for the LLM API call. Pass use_cache=False
+            to bypass the response cache, and response_schema (see
+            autogen_flows.agents.schemas) to request native structured output.
     
     Returns:
         str: The content of the LLM response
     """
-    client = get_llm_client()
-    response = client.chat_completion(messages, **kwargs)
-    return response["content"]
\ No newline at end of file
+    use_cache = kwargs.pop("use_cache", True)
+    cache = get_response_cache() if use_cache else None
+    provider, model = _client_key()
+    
+    labels = {"provider": provider, "model": str(kwargs.get("model", model)), "agent": current_agent()}
+    
+    with span("llm.call", provider=provider, model=kwargs.get("model", model)) as call_span:
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(messages, **kwargs)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for {cache_key[:12]}")
+                call_span.set(cached=True)
+                _llm_calls.inc(outcome="cached", **labels)
+                return cached["content"]
+        
+        start = time.perf_counter()
+        with _client_registry.lease() as client:
+            response = client.chat_completion(messages, **kwargs)
+        _llm_seconds.observe(time.perf_counter() - start, **labels)
+        
+        usage = response.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or estimate_message_tokens(messages)
+        completion_tokens = usage.get("completion_tokens") or estimate_tokens(response.get("content"))
+        call_span.set(
+            cached=False,
+            finish_reason=response.get("finish_reason"),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=not usage
+        )
+        _llm_calls.inc(outcome="error" if response.get("finish_reason") == "error" else "success", **labels)
+        _llm_tokens.inc(prompt_tokens, kind="prompt", **labels)
+        _llm_tokens.inc(completion_tokens, kind="completion", **labels)
+        
+        # Never cache failed calls, so the next request retries the provider
+        if cache is not None and response.get("finish_reason") != "error":
+            cache.set(cache_key, response)
+        return response["content"]
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Get the process-wide LLM response cache
+    
+    Returns:
+        TieredCache: The shared cache, or None if caching is disabled
+    """
+    global _response_cache
+    if not config.llm.cache_enabled:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = TieredCache(
+                    max_entries=config.llm.cache_max_entries,
+                    default_ttl=config.llm.cache_ttl,
+                    path=config.llm.cache_path,
+                    namespace="llm_responses"
+                )
+    return _response_cache
+
+def make_cache_key(messages, **kwargs):
+    """
+    Build a content-addressed cache key for an LLM call
+    
+    The key is a SHA-256 hash of the provider, model, sampling parameters and
+    messages, so byte-identical requests map to the same entry.
+    
+    Args:
+        messages (list): List of message dictionaries with 'role' and 'content'
+        **kwargs: Additional arguments for the LLM API call
+    
+    Returns:
+        str: Hex digest identifying the request
+    """
+    provider, model = _client_key()
+    payload = {
+        "provider": provider,
+        "model": kwargs.get("model", model),
+        "temperature": kwargs.get("temperature", 0.7),
+        "params": {k: v for k, v in kwargs.items() if k not in ("model", "temperature")},
+        "messages": messages
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+def get_cache_stats():
+    """
+    Get hit/miss counters of the LLM response cache
+    
+    Returns:
+        dict: Cache statistics, empty if caching is disabled
+    """
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {}
\ No newline at end of file
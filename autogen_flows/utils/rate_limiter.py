@@ -0,0 +1,257 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from autogen_flows.config.config import config
+
+logger = logging.getLogger(__name__)
+
+class RateLimitTimeoutError(RuntimeError):
+    """Raised when a call waits longer than the limiter's max_wait for capacity"""
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at a per-minute rate
+
+    The bucket starts full and holds at most one minute of budget, so short
+    bursts are allowed while the average stays within the rate. It is not
+    thread-safe on its own; RateLimiter serialises access to it.
+    """
+
+    def __init__(self, per_minute):
+        """
+        Initialize the bucket
+
+        Args:
+            per_minute (float): Budget refilled per minute, also the bucket capacity
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """
+        Get the seconds until amount can be taken (0 if it can be taken now)
+
+        Args:
+            amount (float): Budget needed, at most the capacity
+            now (float): Current time.monotonic()
+
+        Returns:
+            float: Seconds to wait
+        """
+        self._refill(now)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        """Spend budget (call after wait_time returned 0)"""
+        self.tokens -= amount
+
+    def adjust(self, delta):
+        """
+        Correct an earlier take once the real cost is known
+
+        A positive delta spends more (the bucket may go into debt, delaying
+        later calls); a negative delta refunds unused budget.
+        """
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class RateLimitLease:
+    """A granted call slot; set tokens_used once the provider reports usage"""
+
+    def __init__(self, reserved_tokens, waited=0.0):
+        self.reserved_tokens = reserved_tokens
+        self.waited = waited
+        self.tokens_used = None
+
+class RateLimiter:
+    """
+    Governs calls to one LLM provider/model
+
+    A call waits (queued on a condition variable, never spinning) until a
+    request-per-minute token, its estimated tokens-per-minute budget and an
+    in-flight slot are all available. The token estimate is corrected with the
+    provider's reported usage when the call finishes. When the provider
+    answers 429, pause() holds every caller back until the Retry-After time,
+    so concurrent workflows back off together instead of retrying into the
+    same limit.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, max_in_flight=0, max_wait=None, name=""):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute (int, optional): Request budget per minute; 0 for no limit. Defaults to 0.
+            tokens_per_minute (int, optional): Token budget per minute; 0 for no limit. Defaults to 0.
+            max_in_flight (int, optional): Concurrent calls; 0 for no limit. Defaults to 0.
+            max_wait (float, optional): Seconds a call may wait before RateLimitTimeoutError;
+                None waits indefinitely. Defaults to None.
+            name (str, optional): Label used in log messages. Defaults to "".
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.name = name
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._stats = {"calls": 0, "delayed": 0, "wait_seconds": 0.0, "throttled": 0, "timeouts": 0}
+
+    def acquire(self, tokens=0):
+        """
+        Wait for capacity for one call and reserve it
+
+        Args:
+            tokens (int, optional): Estimated tokens the call will consume. Defaults to 0.
+
+        Returns:
+            RateLimitLease: The reservation, to be passed to release()
+
+        Raises:
+            RateLimitTimeoutError: If capacity did not free up within max_wait
+        """
+        if self.token_bucket is not None:
+            # A call larger than a whole minute of budget would never fit
+            tokens = min(tokens, self.token_bucket.capacity)
+        start = time.monotonic()
+        deadline = start + self.max_wait if self.max_wait is not None else None
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                delay = max(0.0, self._paused_until - now)
+                if self.request_bucket is not None:
+                    delay = max(delay, self.request_bucket.wait_time(1, now))
+                if self.token_bucket is not None:
+                    delay = max(delay, self.token_bucket.wait_time(tokens, now))
+                slot_free = not self.max_in_flight or self._in_flight < self.max_in_flight
+
+                if delay <= 0 and slot_free:
+                    if self.request_bucket is not None:
+                        self.request_bucket.take(1)
+                    if self.token_bucket is not None:
+                        self.token_bucket.take(tokens)
+                    self._in_flight += 1
+                    waited = now - start
+                    self._stats["calls"] += 1
+                    if waited > 0.001:
+                        self._stats["delayed"] += 1
+                        self._stats["wait_seconds"] += waited
+                    return RateLimitLease(tokens, waited)
+
+                if deadline is not None and now >= deadline:
+                    self._stats["timeouts"] += 1
+                    raise RateLimitTimeoutError(
+                        f"Waited {now - start:.1f}s for LLM capacity{' on ' + self.name if self.name else ''}"
+                    )
+                # Without a free slot wait for a release (notify); otherwise until the budget refills
+                timeout = delay if slot_free else None
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now) if timeout is not None else deadline - now
+                self._cond.wait(timeout)
+
+    def release(self, lease):
+        """
+        Return a call slot and reconcile its token estimate with the reported usage
+
+        Args:
+            lease (RateLimitLease): The reservation returned by acquire()
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if self.token_bucket is not None and lease.tokens_used is not None:
+                self.token_bucket.adjust(lease.tokens_used - lease.reserved_tokens)
+            self._cond.notify_all()
+
+    @contextmanager
+    def limit(self, tokens=0):
+        """
+        Hold a call slot for the duration of a with block
+
+        Args:
+            tokens (int, optional): Estimated tokens the call will consume. Defaults to 0.
+
+        Yields:
+            RateLimitLease: Set its tokens_used to the reported usage
+        """
+        lease = self.acquire(tokens)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def pause(self, seconds):
+        """
+        Hold back every new call for a number of seconds (e.g. after a 429)
+
+        Args:
+            seconds (float): Seconds from now before calls may start again
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["throttled"] += 1
+            self._cond.notify_all()
+        logger.warning(f"Rate limited{' on ' + self.name if self.name else ''}, pausing calls for {seconds:.1f}s")
+
+    def stats(self):
+        """
+        Get limiter counters
+
+        Returns:
+            dict: calls, delayed (calls that had to wait), wait_seconds, throttled
+                (429 pauses), timeouts and in_flight
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+        return stats
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider, model=None):
+    """
+    Get the process-wide rate limiter for a provider/model, creating it on first use
+
+    Args:
+        provider (str): LLM provider name
+        model (str, optional): Model or deployment name. Defaults to None.
+
+    Returns:
+        RateLimiter: The shared limiter
+    """
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = RateLimiter(
+                    requests_per_minute=config.llm.requests_per_minute,
+                    tokens_per_minute=config.llm.tokens_per_minute,
+                    max_in_flight=config.llm.max_in_flight,
+                    max_wait=config.llm.rate_limit_max_wait or None,
+                    name=f"{provider}/{model}"
+                )
+                _limiters[key] = limiter
+    return limiter
+
+def get_rate_limiter_stats():
+    """
+    Get the counters of every rate limiter created so far
+
+    Returns:
+        dict: "provider/model" to limiter stats
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
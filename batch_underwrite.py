@@ -0,0 +1,56 @@
+"""Underwrite a portfolio of restaurants from the command line
+
+Reads one restaurant per line (a bare business ID, a bare form ID with
+--form-ids, or a JSON object with the /api/analyze fields), runs them through
+the same analysis as /api/analyze with bounded concurrency, and writes one
+JSON line per restaurant as soon as it completes. The summary (throughput and
+latency) is printed to stderr when the batch finishes.
+
+Examples:
+    python batch_underwrite.py business_ids.txt -o renewals.jsonl
+    python batch_underwrite.py form_ids.txt --form-ids --workers 2
+    cat portfolio.jsonl | python batch_underwrite.py - > results.jsonl
+"""
+import argparse
+import json
+import sys
+from app import analyze_api_request
+from autogen_flows.flows.batch import BatchRunner
+
+def read_items(stream):
+    """Read batch items from a text stream, one per line (blank lines and # comments skipped)"""
+    items = []
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        items.append(json.loads(line) if line.startswith('{') else line)
+    return items
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Underwrite a portfolio of restaurants")
+    parser.add_argument('input', help="File with one business ID, form ID or JSON request per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', help="JSON Lines output file (default: stdout)")
+    parser.add_argument('--form-ids', action='store_true', help="Treat bare IDs as form IDs rather than business IDs")
+    parser.add_argument('--workers', type=int, help="Restaurants analyzed at once (default: BATCH_MAX_WORKERS)")
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        items = read_items(sys.stdin)
+    else:
+        with open(args.input) as f:
+            items = read_items(f)
+
+    runner = BatchRunner(analyze_api_request, max_workers=args.workers)
+    id_type = 'form_id' if args.form_ids else 'business_id'
+    if args.output:
+        with open(args.output, 'w') as output:
+            summary = runner.run(items, output, id_type=id_type)
+    else:
+        summary = runner.run(items, sys.stdout, id_type=id_type)
+
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 0 if summary['failed'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
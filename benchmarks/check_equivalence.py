@@ -0,0 +1,255 @@
+"""Check the optimized review paths against the straightforward logic they replaced
+
+KeywordMatcher (modules/keyword_matcher.py) is compared with testing each
+keyword separately, as SentimentAnalyzer did before it:
+- without word boundaries, a case-insensitive substring check (`kw in text`)
+- with word boundaries, the same check limited to whole words or phrases
+
+Inputs are the indicator lists of SentimentAnalyzer on the synthetic
+restaurants of benchmarks/corpus.py, plus random keyword sets and texts over a
+tiny alphabet. The random cases are built to hit the subtle parts: phrases
+that overlap, keywords contained in other keywords, and punctuation at word
+boundaries.
+
+AnalyzedReviewBatch (modules/review_batch.py) is compared with the list of
+analyzed review dicts it replaced, on the same restaurants:
+- the keyword lists it stores, against the per-keyword reference
+- keyword_mask, category_mask and keyword_frequency, against loops over the dicts
+- take() with boolean masks, index arrays (unordered, repeated) and slices,
+  and nested takes, against selecting from the list
+
+Everything is generated from --seed, so a run is reproducible. Mismatches are
+printed and the exit status is 1 if there are any.
+
+Examples:
+    python -m benchmarks.check_equivalence
+    python -m benchmarks.check_equivalence --seed 7 --cases 100000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.corpus import generate_restaurant
+from modules.keyword_matcher import KeywordMatcher
+from modules.review_batch import AnalyzedReviewBatch, SENTIMENT_CATEGORIES
+
+DEFAULT_SIZES = (10, 1000, 10000)
+DEFAULT_CASES = 20000
+# Mismatches printed per check
+MAX_REPORTED = 5
+
+# Alphabet of the random cases: few letters so keywords collide and overlap often
+FUZZ_CHARS = "abAB -."
+
+# Random selectors tried on each restaurant's batch
+TAKES_PER_RESTAURANT = 50
+# Critical keywords the sentiment agent selects risk-factor reviews with
+CRITICAL_KEYWORDS = ["violation", "hazard", "unsafe", "accident", "injury", "bug",
+                     "dirty", "unclean", "filthy", "sick", "ill", "food poisoning"]
+
+def reference_find_all(groups, text, word_boundaries=True):
+    """Find the keywords of every group by testing each keyword on its own
+
+    Args:
+        groups (dict): Mapping of group name to a list of keywords or phrases
+        text (str): Text to scan
+        word_boundaries (bool, optional): Only match whole words. Defaults to True.
+
+    Returns:
+        dict: Group name to the matching keywords, in the order they were given
+    """
+    text_lower = text.lower()
+    if word_boundaries:
+        def found(kw):
+            return re.search(r"(?<!\w)" + re.escape(kw.lower()) + r"(?!\w)", text_lower) is not None
+    else:
+        def found(kw):
+            return kw.lower() in text_lower
+    return {name: [kw for kw in keywords if found(kw)] for name, keywords in groups.items()}
+
+class Check:
+    """Counts the cases of one check and keeps the first mismatches"""
+
+    def __init__(self, name):
+        self.name = name
+        self.cases = 0
+        self.mismatches = []
+
+    def compare(self, context, expected, actual):
+        """Record one case, and a mismatch if expected != actual"""
+        self.cases += 1
+        if expected != actual:
+            self.mismatches.append((context, expected, actual))
+
+    def report(self):
+        """Print the outcome and the first mismatches
+
+        Returns:
+            bool: Whether every case matched
+        """
+        status = "ok" if not self.mismatches else f"{len(self.mismatches)} MISMATCHES"
+        print(f"{self.name:<40} {self.cases:>8} cases  {status}")
+        for context, expected, actual in self.mismatches[:MAX_REPORTED]:
+            print(f"    {context}")
+            print(f"        expected: {expected!r}")
+            print(f"        actual:   {actual!r}")
+        return not self.mismatches
+
+def _fuzz_string(rng, min_length, max_length):
+    """Random string over FUZZ_CHARS"""
+    return "".join(rng.choice(FUZZ_CHARS) for _ in range(rng.randint(min_length, max_length)))
+
+def check_matcher_corpus(groups, restaurants):
+    """Compare KeywordMatcher with the per-keyword reference on the generated reviews"""
+    checks = []
+    for word_boundaries in (True, False):
+        check = Check(f"matcher/corpus word_boundaries={word_boundaries}")
+        matcher = KeywordMatcher(groups, word_boundaries=word_boundaries)
+        for restaurant in restaurants:
+            for review in restaurant["reviews"]:
+                check.compare(review["id"], reference_find_all(groups, review["text"], word_boundaries),
+                              matcher.find_all(review["text"]))
+        checks.append(check)
+    return checks
+
+def check_matcher_fuzz(rng, cases):
+    """Compare KeywordMatcher with the per-keyword reference on random keywords and texts"""
+    checks = []
+    for word_boundaries in (True, False):
+        check = Check(f"matcher/fuzz word_boundaries={word_boundaries}")
+        for _ in range(cases):
+            groups = {
+                name: [_fuzz_string(rng, 1, 5) for _ in range(rng.randint(0, 4))]
+                for name in ("positive", "negative")
+            }
+            # Keep keywords that contain a word character, as real indicators do
+            groups = {name: [kw for kw in keywords if re.search(r"\w", kw)] for name, keywords in groups.items()}
+            matcher = KeywordMatcher(groups, word_boundaries=word_boundaries)
+            for _ in range(3):
+                text = _fuzz_string(rng, 0, 20)
+                check.compare(f"groups={groups!r} text={text!r}",
+                              reference_find_all(groups, text, word_boundaries), matcher.find_all(text))
+        checks.append(check)
+    return checks
+
+def _random_selector(rng, n):
+    """Random boolean mask, index array or slice over n rows, with its list-path equivalent
+
+    Returns:
+        tuple: (description, selector for take(), selected row indices)
+    """
+    kind = rng.choice(("mask", "indices", "slice"))
+    if kind == "mask":
+        keep = rng.random()
+        mask = np.array([rng.random() < keep for _ in range(n)], dtype=bool)
+        return f"mask of {int(mask.sum())}/{n}", mask, [i for i in range(n) if mask[i]]
+    if kind == "indices":
+        rows = [rng.randrange(n) for _ in range(rng.randint(0, min(n, 50)))] if n else []
+        return f"indices {rows[:10]}...", np.array(rows, dtype=np.int64), rows
+    step = rng.choice((1, 1, 2, 3, -1, -2))
+    selector = slice(rng.randint(-n, n) if n else None, rng.randint(-n, n) if n else None, step)
+    return f"slice {selector}", selector, list(range(n))[selector]
+
+def _list_keyword_mask(records, group, keywords):
+    """keyword_mask over a list of analyzed review dicts"""
+    return [any(kw in r[f'{group}_keywords'] for kw in keywords) for r in records]
+
+def _list_category_mask(records, category):
+    """category_mask over a list of analyzed review dicts"""
+    return [r['sentiment_category'] == category for r in records]
+
+def _list_keyword_frequency(records, group):
+    """keyword_frequency over a list of analyzed review dicts"""
+    return dict(Counter(kw for r in records for kw in r[f'{group}_keywords']))
+
+def _compare_masks(checks, rng, context, groups, batch, records):
+    """Compare the mask and frequency methods of a batch with the list path on its records"""
+    for group, keywords in groups.items():
+        # The agent's critical keywords, a random subset, a keyword outside the vocabulary and none
+        for wanted in (CRITICAL_KEYWORDS, rng.sample(keywords, rng.randint(1, len(keywords))),
+                       ["not an indicator"], []):
+            checks["keyword_mask"].compare(f"{context} {group} {wanted}", _list_keyword_mask(records, group, wanted),
+                                           batch.keyword_mask(group, wanted).tolist())
+        checks["keyword_frequency"].compare(f"{context} {group}", _list_keyword_frequency(records, group),
+                                            batch.keyword_frequency(group))
+    for category in SENTIMENT_CATEGORIES:
+        checks["category_mask"].compare(f"{context} {category}", _list_category_mask(records, category),
+                                        batch.category_mask(category).tolist())
+
+def check_batch(analyzer, groups, restaurants, rng):
+    """Compare AnalyzedReviewBatch with the list of analyzed review dicts on the generated reviews"""
+    checks = {name: Check(f"batch/{name}") for name in
+              ("records", "from_records", "keyword_mask", "category_mask", "keyword_frequency", "take")}
+    for restaurant in restaurants:
+        reviews = restaurant["reviews"]
+        context = restaurant["business_details"]["id"]
+        batch = analyzer.analyze_reviews_batch(reviews)
+        records = batch.to_records()
+
+        # Anchor the list path: the stored keywords are those of the per-keyword reference
+        for review, record in zip(reviews, records):
+            expected = reference_find_all(groups, review["text"])
+            checks["records"].compare(
+                review["id"],
+                (review["id"], review["rating"], review["text"], expected['positive'], expected['negative']),
+                (record['review_id'], record['rating'], record['text'],
+                 record['positive_keywords'], record['negative_keywords'])
+            )
+        checks["from_records"].compare(context, records, AnalyzedReviewBatch.from_records(records).to_records())
+        _compare_masks(checks, rng, context, groups, batch, records)
+
+        for _ in range(TAKES_PER_RESTAURANT):
+            description, selector, rows = _random_selector(rng, len(batch))
+            taken, expected = batch.take(selector), [records[i] for i in rows]
+            checks["take"].compare(f"{context} {description}", expected, taken.to_records())
+            _compare_masks(checks, rng, f"{context} {description}", groups, taken, expected)
+
+            # Take from the taken batch, whose keyword offsets were rebased
+            description, selector, rows = _random_selector(rng, len(taken))
+            checks["take"].compare(f"{context} then {description}", [expected[i] for i in rows],
+                                   taken.take(selector).to_records())
+    return list(checks.values())
+
+def run(sizes=DEFAULT_SIZES, seed=0, cases=DEFAULT_CASES):
+    """Generate the inputs and run every check
+
+    Returns:
+        list: The Check of each comparison
+    """
+    # The memo is irrelevant here; keep it off so nothing is cached across runs
+    os.environ['SENTIMENT_MEMO_ENABLED'] = 'False'
+    from modules.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    groups = {'positive': analyzer.positive_indicators, 'negative': analyzer.negative_indicators}
+    restaurants = [generate_restaurant(size, seed=seed) for size in sizes]
+    # Reviews without any keyword hits leave the batch's keyword index empty
+    restaurants.append(generate_restaurant(min(sizes), seed=seed, keyword_density=0.0))
+    rng = random.Random(seed)
+
+    checks = []
+    checks.extend(check_matcher_corpus(groups, restaurants))
+    checks.extend(check_matcher_fuzz(rng, cases))
+    checks.extend(check_batch(analyzer, groups, restaurants, rng))
+    return checks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the optimized review paths against the logic they replaced")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Review counts of the generated restaurants (default: 10 1000 10000)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the corpora and random cases (default: 0)")
+    parser.add_argument('--cases', type=int, default=DEFAULT_CASES,
+                        help="Random keyword sets per check, each tried on 3 texts (default: 20000)")
+    args = parser.parse_args(argv)
+
+    checks = run(args.sizes, args.seed, args.cases)
+    passed = [check.report() for check in checks]
+    return 0 if all(passed) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
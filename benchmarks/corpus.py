@@ -0,0 +1,175 @@
+"""Synthetic restaurant review corpora for the benchmarks
+
+Restaurants are generated from a seeded random.Random, so the same seed and
+size always produce the same corpus. The vocabulary is fixed here rather than
+read from SentimentAnalyzer, so that changing the analyzer's indicator lists
+does not silently change the input being measured.
+
+Shapes follow public review data:
+- Ratings are J-shaped (mostly 5s, a second peak at 1).
+- Review length is log-normal (median around five sentences, long tail).
+- Sentences carry positive or negative indicator keywords with probabilities
+  that depend on the rating, scaled by keyword_density.
+"""
+import math
+import random
+
+# Share of reviews per star rating
+RATING_WEIGHTS = {5: 0.44, 4: 0.20, 3: 0.10, 2: 0.08, 1: 0.18}
+
+# Chance that a sentence carries a positive / negative indicator, per rating
+SENTENCE_TONE = {
+    5: (0.45, 0.02),
+    4: (0.35, 0.08),
+    3: (0.20, 0.20),
+    2: (0.08, 0.35),
+    1: (0.03, 0.50)
+}
+
+POSITIVE_KEYWORDS = [
+    'professional', 'clean', 'maintained', 'spotless', 'excellent', 'organized', 'delicious',
+    'attentive', 'friendly', 'efficient', 'prompt', 'fresh', 'consistent', 'immaculate', 'reliable'
+]
+NEGATIVE_KEYWORDS = [
+    'dirty', 'unsafe', 'broken', 'slow', 'rude', 'messy', 'undercooked', 'spoiled', 'unclean',
+    'careless', 'contaminated', 'damaged', 'expired'
+]
+# Rarer findings that weigh heavily in risk assessment
+CRITICAL_FINDINGS = [
+    'found bugs near the counter', 'saw a hazard by the kitchen door', 'there was a health code violation posted',
+    'a guest had an accident on the wet floor', 'my friend got food poisoning', 'saw mice in the dining room'
+]
+
+NOUNS = ['staff', 'kitchen', 'dining room', 'restroom', 'service', 'food', 'patio', 'bar', 'menu', 'server']
+OCCASIONS = ['a birthday dinner', 'lunch with coworkers', 'a quick bite', 'date night', 'brunch', 'takeout']
+NEUTRAL_SENTENCES = [
+    "We came for {occasion} on a {day}.",
+    "Parking was about what you would expect for the area.",
+    "The {noun} is on the left as you walk in.",
+    "We ordered the special and a couple of appetizers.",
+    "It was busy when we arrived around {hour}.",
+    "Prices are in line with other places nearby.",
+    "We were seated after about {minutes} minutes."
+]
+POSITIVE_SENTENCES = [
+    "The {noun} was {keyword}.",
+    "Everything about the {noun} felt {keyword} and {keyword2}.",
+    "Our server was {keyword} the whole evening.",
+    "Really {keyword} {noun}, we will be back."
+]
+NEGATIVE_SENTENCES = [
+    "The {noun} was {keyword}.",
+    "Honestly the {noun} looked {keyword} and {keyword2}.",
+    "Service was {keyword} and nobody checked on us.",
+    "Not great: {keyword} {noun} again."
+]
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Category sets exercising each branch of RiskAssessor.determine_class_code
+CATEGORY_SETS = [
+    ["Restaurants", "Italian"],
+    ["Restaurants", "Bars"],
+    ["Sports Bars", "American (Traditional)"],
+    ["Fast Food", "Burgers"],
+    ["Nightlife", "Dance Clubs", "Cocktail Bars"],
+    ["Sushi Bars", "Japanese"],
+    ["Cafes", "Breakfast & Brunch"],
+    ["Pizza", "Quick Service"]
+]
+NAME_PARTS = (['Golden', 'Rustic', 'Blue', 'Corner', 'Harbor', 'Urban', 'Old Town', 'Sunset'],
+              ['Spoon', 'Table', 'Grill', 'Kitchen', 'Tavern', 'Bistro', 'Lounge', 'Express'])
+
+def _sentence(rng, tone, keyword_density):
+    """Build one sentence, positive, negative or neutral according to the rating's tone"""
+    positive, negative = tone
+    roll = rng.random()
+    if roll < positive * keyword_density:
+        template, keywords = rng.choice(POSITIVE_SENTENCES), POSITIVE_KEYWORDS
+    elif roll < (positive + negative) * keyword_density:
+        if rng.random() < 0.1:
+            return rng.choice(CRITICAL_FINDINGS).capitalize() + "."
+        template, keywords = rng.choice(NEGATIVE_SENTENCES), NEGATIVE_KEYWORDS
+    else:
+        template, keywords = rng.choice(NEUTRAL_SENTENCES), None
+    return template.format(
+        noun=rng.choice(NOUNS),
+        keyword=rng.choice(keywords) if keywords else "",
+        keyword2=rng.choice(keywords) if keywords else "",
+        occasion=rng.choice(OCCASIONS),
+        day=rng.choice(DAYS),
+        hour=f"{rng.randint(5, 9)}pm",
+        minutes=rng.choice([5, 10, 15, 20, 30, 45])
+    )
+
+def generate_review(rng, review_id, keyword_density=1.0):
+    """Generate one review
+
+    Args:
+        rng (random.Random): Source of randomness
+        review_id (str): Review ID
+        keyword_density (float, optional): Scale of the chance that a sentence carries an
+            indicator keyword. Defaults to 1.0.
+
+    Returns:
+        dict: id, rating and text, as returned by the Yelp endpoint
+    """
+    rating = rng.choices(list(RATING_WEIGHTS), weights=list(RATING_WEIGHTS.values()))[0]
+    # Log-normal sentence count: median ~5 sentences, occasionally very long reviews
+    sentences = max(1, min(60, round(rng.lognormvariate(math.log(5), 0.6))))
+    tone = SENTENCE_TONE[rating]
+    text = " ".join(_sentence(rng, tone, keyword_density) for _ in range(sentences))
+    return {"id": review_id, "rating": rating, "text": text}
+
+def generate_restaurant(review_count, seed=0, keyword_density=1.0):
+    """Generate a restaurant with its reviews
+
+    Args:
+        review_count (int): Number of reviews
+        seed (int, optional): Random seed; equal seeds produce equal restaurants. Defaults to 0.
+        keyword_density (float, optional): See generate_review. Defaults to 1.0.
+
+    Returns:
+        dict: reviews and business_details, shaped like DataCollector.get_sample_data()
+    """
+    rng = random.Random(f"{seed}:{review_count}:{keyword_density}")
+    business_id = f"bench-{seed}-{review_count}"
+    reviews = [generate_review(rng, f"{business_id}-r{i}", keyword_density) for i in range(review_count)]
+    mean_rating = sum(review["rating"] for review in reviews) / review_count if reviews else 0
+    categories = rng.choice(CATEGORY_SETS)
+    return {
+        "reviews": reviews,
+        "business_details": {
+            "id": business_id,
+            "name": f"{rng.choice(NAME_PARTS[0])} {rng.choice(NAME_PARTS[1])}",
+            "rating": round(mean_rating * 2) / 2,
+            "review_count": review_count,
+            "price": rng.choice(["$", "$$", "$$$"]),
+            "categories": [{"alias": title.lower().replace(" ", "_"), "title": title} for title in categories],
+            "location": {
+                "address1": f"{rng.randint(1, 9999)} Main St",
+                "city": "Anytown",
+                "state": "CA",
+                "zip_code": f"{rng.randint(90000, 96199)}"
+            }
+        }
+    }
+
+def corpus_stats(restaurant):
+    """Summarize a generated restaurant's reviews, recorded with the results
+
+    Returns:
+        dict: review count, mean/median/p95 words per review and the rating histogram
+    """
+    words = sorted(len(review["text"].split()) for review in restaurant["reviews"])
+    ratings = {}
+    for review in restaurant["reviews"]:
+        ratings[review["rating"]] = ratings.get(review["rating"], 0) + 1
+    if not words:
+        return {"reviews": 0}
+    return {
+        "reviews": len(words),
+        "mean_words": round(sum(words) / len(words), 1),
+        "median_words": words[len(words) // 2],
+        "p95_words": words[min(len(words) - 1, int(len(words) * 0.95))],
+        "ratings": {str(star): ratings.get(star, 0) for star in sorted(RATING_WEIGHTS)}
+    }
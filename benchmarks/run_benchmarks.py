@@ -0,0 +1,249 @@
+"""Benchmark the rule-based underwriting pipeline on synthetic restaurants
+
+Each benchmark runs one pipeline step on restaurants with 10, 1k and 100k
+reviews (see benchmarks/corpus.py):
+- SentimentAnalyzer.analyze_reviews and analyze_reviews_batch
+- get_overall_sentiment, on the record list and on the columnar batch
+- RiskAssessor.assess_risk and determine_class_code
+- ReportGenerator.generate_report
+
+The inputs of each step are computed before it is timed.
+
+Throughput is the median of --repeat timed samples. Fast steps are run
+several times per sample so each sample lasts at least --min-time. Peak
+memory is measured in one extra, untimed run under tracemalloc, because
+tracing allocations slows code down. The per-review analysis memo is
+disabled unless --memo is given, so every run measures real scoring.
+
+Results are written as JSON, named after the current commit by default, so
+two commits can be compared with --compare.
+
+Examples:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 10 1000 --repeat 5 -o before.json
+    python -m benchmarks.run_benchmarks --compare before.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_restaurant, corpus_stats
+
+DEFAULT_SIZES = (10, 1000, 100000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def git_revision():
+    """Get the current commit and whether the working tree has uncommitted changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+def measure(func, items, repeat=3, min_time=0.05):
+    """Time func and measure its peak memory
+
+    Args:
+        func (callable): The step to measure, called without arguments
+        items (int): Reviews (or calls) processed by one call, for the throughput figure
+        repeat (int, optional): Timed samples. Defaults to 3.
+        min_time (float, optional): Minimum seconds per sample; fast steps are looped. Defaults to 0.05.
+
+    Returns:
+        dict: Per-call seconds (min, median, mean), items_per_second, calls per
+            sample and peak_memory_bytes allocated above the starting point
+    """
+    # The untraced warm-up run sizes the inner loop
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    number = max(1, int(min_time / elapsed)) if elapsed < min_time else 1
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(samples)
+    return {
+        "calls_per_sample": number,
+        "min_seconds": min(samples),
+        "median_seconds": median,
+        "mean_seconds": statistics.mean(samples),
+        "items_per_second": items / median if median > 0 else None,
+        "peak_memory_bytes": peak
+    }
+
+def benchmark_restaurant(restaurant, analyzer, risk_assessor, report_generator, repeat, min_time):
+    """Run every benchmark on one restaurant
+
+    Returns:
+        list: One result dict per benchmark
+    """
+    reviews = restaurant["reviews"]
+    business_details = restaurant["business_details"]
+    review_count = len(reviews)
+
+    # Inputs of the later steps, computed once outside the measurements
+    analyzed_reviews = analyzer.analyze_reviews(reviews)
+    analyzed_batch = analyzer.analyze_reviews_batch(reviews)
+    overall_sentiment = analyzer.get_overall_sentiment(analyzed_reviews)
+    risk_assessment = risk_assessor.assess_risk(overall_sentiment, business_details)
+
+    steps = [
+        ("analyze_reviews", review_count, lambda: analyzer.analyze_reviews(reviews)),
+        ("analyze_reviews_batch", review_count, lambda: analyzer.analyze_reviews_batch(reviews)),
+        ("get_overall_sentiment", review_count, lambda: analyzer.get_overall_sentiment(analyzed_reviews)),
+        ("get_overall_sentiment_batch", review_count, lambda: analyzer.get_overall_sentiment(analyzed_batch)),
+        ("assess_risk", 1, lambda: risk_assessor.assess_risk(overall_sentiment, business_details)),
+        ("determine_class_code", 1, lambda: risk_assessor.determine_class_code(business_details)),
+        ("generate_report", 1, lambda: report_generator.generate_report(
+            business_details, overall_sentiment, risk_assessment
+        ))
+    ]
+    results = []
+    for name, items, func in steps:
+        result = {"benchmark": name, "reviews": review_count}
+        result.update(measure(func, items, repeat, min_time))
+        results.append(result)
+    return results
+
+def run(sizes=DEFAULT_SIZES, repeat=3, min_time=0.05, seed=0, keyword_density=1.0, parallel=False, memo=False):
+    """Generate the corpora and run every benchmark on each
+
+    Returns:
+        dict: metadata (commit, environment and settings), corpora statistics and results
+    """
+    if not memo:
+        os.environ['SENTIMENT_MEMO_ENABLED'] = 'False'
+    # Imported after the memo setting so the analyzer picks it up
+    from modules.sentiment_analyzer import SentimentAnalyzer
+    from modules.risk_assessor import RiskAssessor
+    from modules.report_generator import ReportGenerator
+
+    commit, dirty = git_revision()
+    report = {
+        "metadata": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "keyword_density": keyword_density,
+            "repeat": repeat,
+            "min_time": min_time,
+            "parallel": parallel,
+            "memo": memo
+        },
+        "corpora": [],
+        "results": []
+    }
+
+    analyzer = SentimentAnalyzer(parallel=parallel)
+    risk_assessor = RiskAssessor()
+    report_generator = ReportGenerator()
+    for size in sizes:
+        restaurant = generate_restaurant(size, seed=seed, keyword_density=keyword_density)
+        report["corpora"].append(corpus_stats(restaurant))
+        print(f"Benchmarking {size} reviews...", file=sys.stderr)
+        results = benchmark_restaurant(restaurant, analyzer, risk_assessor, report_generator, repeat, min_time)
+        report["results"].extend(results)
+    return report
+
+def compare(report, baseline):
+    """Pair each result with the baseline result of the same benchmark and size
+
+    Returns:
+        list: (benchmark, reviews, baseline median, median, speedup) tuples
+    """
+    previous = {(result["benchmark"], result["reviews"]): result for result in baseline["results"]}
+    rows = []
+    for result in report["results"]:
+        before = previous.get((result["benchmark"], result["reviews"]))
+        if before is None:
+            continue
+        speedup = before["median_seconds"] / result["median_seconds"] if result["median_seconds"] else None
+        rows.append((result["benchmark"], result["reviews"], before["median_seconds"], result["median_seconds"], speedup))
+    return rows
+
+def _format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.1f}us"
+
+def print_results(report, baseline=None):
+    """Print a results table, with the speedup over a baseline report when given"""
+    print(f"commit {report['metadata']['commit']}{' (dirty)' if report['metadata']['dirty'] else ''}")
+    print(f"{'benchmark':<28} {'reviews':>8} {'median':>10} {'items/s':>12} {'peak mem':>10}")
+    for result in report["results"]:
+        rate = result["items_per_second"]
+        print(f"{result['benchmark']:<28} {result['reviews']:>8} {_format_seconds(result['median_seconds']):>10} "
+              f"{(f'{rate:,.0f}' if rate else '-'):>12} {result['peak_memory_bytes'] / 1024 / 1024:>8.2f}MB")
+    if baseline is not None:
+        print(f"\ncompared with commit {baseline['metadata']['commit']}")
+        print(f"{'benchmark':<28} {'reviews':>8} {'before':>10} {'after':>10} {'speedup':>8}")
+        for name, reviews, before, after, speedup in compare(report, baseline):
+            print(f"{name:<28} {reviews:>8} {_format_seconds(before):>10} {_format_seconds(after):>10} "
+                  f"{(f'{speedup:.2f}x' if speedup else '-'):>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the underwriting pipeline on synthetic restaurants")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Review counts of the generated restaurants (default: 10 1000 100000)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed samples per benchmark (default: 3)")
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help="Minimum seconds per sample; faster steps are looped (default: 0.05)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument('--keyword-density', type=float, default=1.0,
+                        help="Scale of indicator keyword frequency in reviews (default: 1.0)")
+    parser.add_argument('--parallel', action='store_true', help="Score large review sets on the process pool")
+    parser.add_argument('--memo', action='store_true', help="Keep the per-review analysis memo enabled")
+    parser.add_argument('-o', '--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(sizes=args.sizes, repeat=args.repeat, min_time=args.min_time, seed=args.seed,
+                 keyword_density=args.keyword_density, parallel=args.parallel, memo=args.memo)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        metadata = report["metadata"]
+        output = os.path.join(RESULTS_DIR, f"{metadata['commit']}{'-dirty' if metadata['dirty'] else ''}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+    print(f"\nResults written to {output}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
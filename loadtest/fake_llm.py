@@ -0,0 +1,159 @@
+"""Local stand-in for an OpenAI-compatible chat completions endpoint
+
+POST /v1/chat/completions answers after a time-to-first-token latency plus
+the completion's tokens at a fixed generation rate, so LLM-bound workloads
+behave like a real provider without network access or cost. Responses
+honour response_format:
+- json_schema: an object conforming to the schema.
+- json_object: a small JSON object.
+- Otherwise: prose of --completion-tokens tokens (capped by max_tokens).
+Usage is reported with ~4 characters per token.
+
+Point the app at it with OPENAI_BASE_URL=<url>/v1 and any OPENAI_API_KEY.
+
+Run standalone with:
+    python -m loadtest.fake_llm --port 8200 --latency-ms 400 --tokens-per-second 60
+"""
+import argparse
+import json
+import random
+import time
+
+from loadtest.server import StandInServer, StandInHandler
+
+WORDS = ("the restaurant shows consistent food safety practices and a professional staff with "
+         "moderate liability exposure given the alcohol service and evening hours").split()
+
+def example_for_schema(schema, rng):
+    """Build a value conforming to a JSON schema (the subset used in autogen_flows.agents.schemas)
+
+    Args:
+        schema (dict): JSON schema
+        rng (random.Random): Source of the sample values
+
+    Returns:
+        A JSON-serializable value matching the schema
+    """
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: example_for_schema(prop, rng) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example_for_schema(schema.get("items", {"type": "string"}), rng) for _ in range(rng.randint(1, 3))]
+    if kind == "number":
+        return round(rng.uniform(0.5, 0.95), 2)
+    if kind == "integer":
+        return rng.randint(1, 500)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+def _prompt_tokens(messages):
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4 + 4 * len(messages)
+
+class FakeLLMHandler(StandInHandler):
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "Not found"}})
+            return
+        request = self.read_json() or {}
+        if self.stand_in.inject():
+            self.send_injected_error()
+            return
+        self.send_json(200, self.stand_in.complete(request))
+
+class FakeLLMServer(StandInServer):
+    """Stand-in LLM with configurable latency, generation speed and errors"""
+
+    handler_class = FakeLLMHandler
+
+    def __init__(self, tokens_per_second=50.0, completion_tokens=250, **kwargs):
+        """
+        Args:
+            tokens_per_second (float, optional): Generation speed; 0 returns completions instantly.
+                Defaults to 50.0.
+            completion_tokens (int, optional): Length of free-text completions. Defaults to 250.
+            **kwargs: Host, port, latency (time to first token) and error settings (see StandInServer)
+        """
+        super().__init__(**kwargs)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self._seed = kwargs.get("seed", 0)
+
+    @property
+    def base_url(self):
+        """The OPENAI_BASE_URL pointing the OpenAI client at this server"""
+        return self.url + "/v1"
+
+    def env(self):
+        """Environment variables pointing the app's OpenAI client at this server"""
+        # The stand-in honours json_schema whatever OPENAI_MODEL names
+        return {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "load-test", "OPENAI_BASE_URL": self.base_url,
+                "LLM_STRUCTURED_OUTPUT": "json_schema"}
+
+    def complete(self, request):
+        """Build a chat completion response, sleeping for its generation time
+
+        Args:
+            request (dict): The chat.completions.create request body
+
+        Returns:
+            dict: An OpenAI chat completion object
+        """
+        messages = request.get("messages") or []
+        # Equal prompts get equal answers, like a deterministic model
+        rng = random.Random(f"{self._seed}:{json.dumps(messages, sort_keys=True)}")
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(example_for_schema(response_format["json_schema"]["schema"], rng))
+        elif response_format.get("type") == "json_object":
+            content = json.dumps({"summary": " ".join(rng.choice(WORDS) for _ in range(20))})
+        else:
+            limit = min(self.completion_tokens, request.get("max_tokens") or self.completion_tokens)
+            # ~4 characters per token; the average word here is ~1.5 tokens
+            content = " ".join(rng.choice(WORDS) for _ in range(max(1, int(limit / 1.5))))
+
+        completion_tokens = max(1, len(content) // 4)
+        if self.tokens_per_second > 0:
+            time.sleep(completion_tokens / self.tokens_per_second)
+
+        prompt_tokens = _prompt_tokens(messages)
+        return {
+            "id": f"chatcmpl-{rng.getrandbits(48):012x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible chat completions stand-in")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8200)
+    parser.add_argument('--latency-ms', type=float, default=300.0, help="Time to first token (default: 300)")
+    parser.add_argument('--jitter-ms', type=float, default=100.0, help="Uniform jitter around the latency")
+    parser.add_argument('--tokens-per-second', type=float, default=50.0, help="Generation speed (default: 50)")
+    parser.add_argument('--completion-tokens', type=int, default=250, help="Free-text completion length")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=429, help="Status of injected errors (default: 429)")
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(tokens_per_second=args.tokens_per_second, completion_tokens=args.completion_tokens,
+                           host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, error_status=args.error_status)
+    for name, value in server.env().items():
+        print(f"{name}={value}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
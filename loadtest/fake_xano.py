@@ -0,0 +1,183 @@
+"""Local stand-in for the three Xano endpoints read by DataCollector
+
+Serves the response shapes DataCollector parses:
+- GET  /reviews_by_formId?form_id=: the insurance form record with the business and its reviews
+- POST /Yelp_review_by_name_address_and_biz_id: a biz_id lookup returns full business
+  details with reviews; name/address and phone lookups return the business ID
+- GET  /place_image_by_insurance_request_form_id?id=: the form's Google images
+
+Restaurants are generated deterministically from their business ID with the
+benchmark corpus generator, so repeated runs see the same data. Form N
+belongs to business "form-N".
+
+Run standalone with:
+    python -m loadtest.fake_xano --port 8100 --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.corpus import generate_restaurant
+from loadtest.server import StandInServer, StandInHandler
+
+FORM_PATH = "/reviews_by_formId"
+YELP_PATH = "/Yelp_review_by_name_address_and_biz_id"
+IMAGES_PATH = "/place_image_by_insurance_request_form_id"
+
+class FakeXanoHandler(StandInHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path not in (FORM_PATH, IMAGES_PATH):
+            self.send_json(404, {"error": "Not found"})
+            return
+        if self.stand_in.inject():
+            self.send_injected_error()
+            return
+        if url.path == FORM_PATH:
+            self.send_json(200, self.stand_in.form_record(query.get("form_id", "")))
+        else:
+            self.send_json(200, self.stand_in.images(query.get("id", "")))
+
+    def do_POST(self):
+        body = self.read_json() or {}
+        if urlparse(self.path).path != YELP_PATH:
+            self.send_json(404, {"error": "Not found"})
+            return
+        if self.stand_in.inject():
+            self.send_injected_error()
+            return
+        self.send_json(200, self.stand_in.yelp_lookup(body))
+
+class FakeXanoServer(StandInServer):
+    """Stand-in Xano API with configurable latency, errors and review volume"""
+
+    handler_class = FakeXanoHandler
+
+    def __init__(self, reviews_per_business=20, images_per_form=5, **kwargs):
+        """
+        Args:
+            reviews_per_business (int, optional): Reviews returned per business. Defaults to 20.
+            images_per_form (int, optional): Google images returned per form. Defaults to 5.
+            **kwargs: Host, port, latency and error settings (see StandInServer)
+        """
+        super().__init__(**kwargs)
+        self.reviews_per_business = reviews_per_business
+        self.images_per_form = images_per_form
+        # Business names served in form records, so name/address lookups resolve back to them
+        self._names = {}
+        self._names_lock = threading.Lock()
+
+    def env(self):
+        """Environment variables pointing DataCollector at this server
+
+        Returns:
+            dict: XANO_API_URL, YELP_API_URL and GOOGLE_IMAGE_API_URL
+        """
+        return {
+            "XANO_API_URL": self.url + FORM_PATH,
+            "YELP_API_URL": self.url + YELP_PATH,
+            "GOOGLE_IMAGE_API_URL": self.url + IMAGES_PATH
+        }
+
+    def restaurant(self, business_id):
+        """Generate the restaurant behind a business ID (same ID, same restaurant)"""
+        restaurant = generate_restaurant(self.reviews_per_business, seed=business_id)
+        # Generated names repeat across businesses; the ID keeps name lookups unambiguous
+        restaurant["business_details"]["name"] += f" {business_id}"
+        with self._names_lock:
+            self._names[restaurant["business_details"]["name"].lower()] = business_id
+        return restaurant
+
+    def _review_edges(self, restaurant):
+        return [{
+            "node": {
+                "encid": review["id"],
+                "rating": review["rating"],
+                "text": {"full": review["text"], "language": "en"},
+                "createdAt": {"localDateTimeForBusiness": "2025-03-01T19:30:00"},
+                "author": {"displayName": f"Reviewer {i + 1}."}
+            }
+        } for i, review in enumerate(restaurant["reviews"])]
+
+    def _business(self, business_id, restaurant):
+        details = restaurant["business_details"]
+        counts = [0, 0, 0, 0, 0]
+        for review in restaurant["reviews"]:
+            counts[review["rating"] - 1] += 1
+        return {
+            "encid": business_id,
+            "name": details["name"],
+            "alias": details["name"].lower().replace(" ", "-"),
+            "rating": details["rating"],
+            "reviewCount": len(restaurant["reviews"]),
+            "reviewCountsByRating": counts,
+            "categories": [{"root": {"alias": category["alias"]}} for category in details["categories"]],
+            "reviews": {"edges": self._review_edges(restaurant)}
+        }
+
+    def form_record(self, form_id):
+        """The reviews_by_formId response for a form"""
+        business_id = f"form-{form_id}"
+        restaurant = self.restaurant(business_id)
+        details = restaurant["business_details"]
+        return {
+            "business": {"name": details["name"], "location": details["location"]},
+            "reviews": [{
+                "id": 1,
+                "insurance_request_form_id": form_id,
+                "data": {"business": self._business(business_id, restaurant)}
+            }]
+        }
+
+    def images(self, form_id):
+        """The place_image_by_insurance_request_form_id response for a form"""
+        return {
+            "images": [{
+                "id": i + 1,
+                "href": f"https://maps.example.com/place/{form_id}/{i + 1}",
+                "image_ref": f"ref-{form_id}-{i + 1}",
+                "image": {"url": f"{self.url}/images/{form_id}/{i + 1}.jpg", "meta": {"width": 800, "height": 600}}
+            } for i in range(self.images_per_form)]
+        }
+
+    def yelp_lookup(self, body):
+        """The Yelp lookup response for a biz_id, name/address or phone number lookup"""
+        if body.get("type") == "biz_id":
+            business_id = body.get("biz_id") or "unknown"
+            return {"status": True, "data": [{"business": self._business(business_id, self.restaurant(business_id))}]}
+
+        if body.get("type") == "business_name_and_address":
+            name = body.get("name") or ""
+            with self._names_lock:
+                business_id = self._names.get(name.lower())
+            business_id = business_id or "name-" + "-".join(name.lower().split())
+        else:
+            business_id = "phone-" + "".join(c for c in body.get("ph_number", "") if c.isdigit())
+        details = self.restaurant(business_id)["business_details"]
+        return {
+            "status": True,
+            "data": [{"id": business_id, "name": details["name"], "alias": details["name"].lower().replace(" ", "-"),
+                      "location": details["location"]}]
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Xano endpoints")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Mean added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Uniform jitter around the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=500, help="Status of injected errors (default: 500)")
+    parser.add_argument('--reviews', type=int, default=20, help="Reviews per business (default: 20)")
+    args = parser.parse_args(argv)
+
+    server = FakeXanoServer(reviews_per_business=args.reviews, host=args.host, port=args.port,
+                            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            error_status=args.error_status)
+    for name, value in server.env().items():
+        print(f"{name}={value}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
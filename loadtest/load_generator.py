@@ -0,0 +1,210 @@
+"""Open-loop load generator for the analysis API
+
+Requests are started on a fixed schedule at the target rate, whether or
+not earlier requests have finished. A slow server therefore builds a queue
+instead of quietly lowering the offered load. Latency is measured from each
+request's scheduled start, so time spent waiting for a free client slot
+counts against the server (no coordinated omission). service_time
+excludes that wait.
+
+Examples:
+    python -m loadtest.load_generator --url http://127.0.0.1:5000/api/analyze --rps 2 --duration 60
+    python -m loadtest.load_generator --rps 5 --ids 200 --id-type form_id -o results.json
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list (None if empty)"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def request_bodies(ids, id_type="business_id"):
+    """Build the request bodies cycled through by the load generator
+
+    Fewer distinct IDs mean more upstream and LLM cache hits; use a large
+    number to measure the cold path.
+
+    Args:
+        ids (int): Number of distinct restaurants
+        id_type (str, optional): business_id or form_id. Defaults to "business_id".
+
+    Returns:
+        list: /api/analyze request bodies
+    """
+    return [{id_type: f"load-{i}" if id_type == "business_id" else str(1000 + i)} for i in range(ids)]
+
+class LoadGenerator:
+    """Drives an HTTP endpoint at a target request rate"""
+
+    def __init__(self, url, rps, duration, bodies, timeout=300, max_concurrency=64):
+        """
+        Args:
+            url (str): Endpoint to POST the bodies to
+            rps (float): Target requests per second
+            duration (float): Seconds to keep starting requests
+            bodies (list): JSON bodies, sent in turn
+            timeout (float, optional): Seconds before a request counts as failed. Defaults to 300.
+            max_concurrency (int, optional): Requests in flight at most; later requests
+                wait (and their wait counts as latency). Defaults to 64.
+        """
+        self.url = url
+        self.rps = rps
+        self.duration = duration
+        self.bodies = bodies
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._local = threading.local()
+
+    def _session(self):
+        # One keep-alive session per client thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, scheduled, body):
+        started = time.perf_counter()
+        try:
+            response = self._session().post(self.url, json=body, timeout=self.timeout)
+            status = response.status_code
+            error = None if status == 200 else response.text[:200]
+        except requests.RequestException as e:
+            status = None
+            error = f"{type(e).__name__}: {str(e)}"
+        finished = time.perf_counter()
+        return {
+            "scheduled": scheduled,
+            "status": status,
+            "latency": finished - scheduled,
+            "service_time": finished - started,
+            "error": error
+        }
+
+    def run(self, progress=None):
+        """Run the load and wait for every request to finish
+
+        Args:
+            progress (callable, optional): Called with a status line every few seconds
+
+        Returns:
+            dict: The summary (see summarize) with the raw results under "results"
+        """
+        total = max(1, int(self.rps * self.duration))
+        interval = 1.0 / self.rps
+        futures = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="load") as executor:
+            last_report = start
+            for i in range(total):
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self._send, scheduled, self.bodies[i % len(self.bodies)]))
+                now = time.perf_counter()
+                if progress is not None and now - last_report >= 5:
+                    done = sum(1 for future in futures if future.done())
+                    progress(f"{now - start:.0f}s: {len(futures)} sent, {done} done")
+                    last_report = now
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        summary = summarize(results, elapsed, self.rps)
+        summary["results"] = results
+        return summary
+
+def summarize(results, elapsed, target_rps=None):
+    """Summarize load test results
+
+    Args:
+        results (list): Per-request results from LoadGenerator
+        elapsed (float): Seconds from the first scheduled request to the last completion
+        target_rps (float, optional): Offered rate, reported alongside the achieved one
+
+    Returns:
+        dict: requests, succeeded, failed, error_rate, target_rps, throughput_rps
+            (successes per second), status_codes and latency / service_time
+            statistics (mean, p50, p95, p99, max in seconds)
+    """
+    succeeded = [result for result in results if result["status"] == 200]
+    status_codes = {}
+    for result in results:
+        key = str(result["status"]) if result["status"] is not None else "error"
+        status_codes[key] = status_codes.get(key, 0) + 1
+
+    def stats(field):
+        values = sorted(result[field] for result in results)
+        if not values:
+            return {}
+        return {
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1]
+        }
+
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "error_rate": (len(results) - len(succeeded)) / len(results) if results else 0.0,
+        "target_rps": target_rps,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(succeeded) / elapsed if elapsed > 0 else 0.0,
+        "status_codes": status_codes,
+        "latency": stats("latency"),
+        "service_time": stats("service_time")
+    }
+
+def print_summary(summary, stream=sys.stdout):
+    """Print a summary as a short report"""
+    print(f"requests      {summary['requests']} ({summary['succeeded']} ok, {summary['failed']} failed, "
+          f"error rate {summary['error_rate']:.1%})", file=stream)
+    print(f"throughput    {summary['throughput_rps']:.2f} req/s (target {summary['target_rps']} req/s) "
+          f"over {summary['elapsed_seconds']:.1f}s", file=stream)
+    print(f"status codes  {summary['status_codes']}", file=stream)
+    for field in ("latency", "service_time"):
+        values = summary[field]
+        if values:
+            print(f"{field:<13} p50 {values['p50']:.3f}s  p95 {values['p95']:.3f}s  p99 {values['p99']:.3f}s  "
+                  f"max {values['max']:.3f}s  mean {values['mean']:.3f}s", file=stream)
+
+def add_load_arguments(parser):
+    """Add the load shape options shared with loadtest.run_local"""
+    parser.add_argument('--rps', type=float, default=1.0, help="Target requests per second (default: 1)")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds to send requests for (default: 30)")
+    parser.add_argument('--ids', type=int, default=50, help="Distinct restaurants requested in turn (default: 50)")
+    parser.add_argument('--id-type', choices=['business_id', 'form_id'], default='business_id')
+    parser.add_argument('--concurrency', type=int, default=64, help="Requests in flight at most (default: 64)")
+    parser.add_argument('--timeout', type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument('-o', '--output', help="Write the summary and per-request results to this JSON file")
+
+def write_output(summary, path):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the analysis API at a target request rate")
+    parser.add_argument('--url', default="http://127.0.0.1:5000/api/analyze", help="Endpoint to load")
+    add_load_arguments(parser)
+    args = parser.parse_args(argv)
+
+    generator = LoadGenerator(args.url, args.rps, args.duration, request_bodies(args.ids, args.id_type),
+                              timeout=args.timeout, max_concurrency=args.concurrency)
+    summary = generator.run(progress=lambda line: print(line, file=sys.stderr))
+    print_summary(summary)
+    if args.output:
+        write_output(summary, args.output)
+    return 0 if summary["succeeded"] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
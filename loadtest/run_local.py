@@ -0,0 +1,97 @@
+"""Load test the real /api/analyze path offline, against local stand-ins
+
+Starts the fake Xano server and the fake OpenAI-compatible server, points the
+app at them through the environment, serves the Flask app on a threaded
+local server, and drives it with the open-loop load generator. At the end it
+reports the latency percentiles, throughput and error rate, the stand-ins'
+request counts, and how many reports fell back to the traditional flow.
+
+The LLM rate limits default to off here (the stand-in has no quota); set
+LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE to measure their effect.
+
+Examples:
+    python -m loadtest.run_local --rps 2 --duration 60
+    python -m loadtest.run_local --rps 5 --ids 500 --no-cache --llm-latency-ms 800 --tokens-per-second 40
+    python -m loadtest.run_local --rps 3 --xano-error-rate 0.05 --llm-error-rate 0.02 -o run.json
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+
+from loadtest.fake_llm import FakeLLMServer
+from loadtest.fake_xano import FakeXanoServer
+from loadtest.load_generator import LoadGenerator, add_load_arguments, request_bodies, print_summary, write_output
+
+def configure_environment(xano, llm, no_cache=False):
+    """Point the app at the stand-ins; must run before the app is imported"""
+    os.environ.update(xano.env())
+    os.environ.update(llm.env())
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "0")
+    os.environ.setdefault("LLM_TOKENS_PER_MINUTE", "0")
+    if no_cache:
+        for name in ("XANO_CACHE_ENABLED", "LLM_CACHE_ENABLED", "SENTIMENT_MEMO_ENABLED"):
+            os.environ[name] = "False"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /api/analyze against local Xano and LLM stand-ins")
+    add_load_arguments(parser)
+    parser.add_argument('--xano-latency-ms', type=float, default=80.0, help="Xano latency (default: 80)")
+    parser.add_argument('--xano-jitter-ms', type=float, default=40.0, help="Xano latency jitter (default: 40)")
+    parser.add_argument('--xano-error-rate', type=float, default=0.0, help="Share of Xano requests that fail with 500")
+    parser.add_argument('--reviews', type=int, default=20, help="Reviews per restaurant (default: 20)")
+    parser.add_argument('--llm-latency-ms', type=float, default=300.0, help="LLM time to first token (default: 300)")
+    parser.add_argument('--llm-jitter-ms', type=float, default=100.0, help="LLM latency jitter (default: 100)")
+    parser.add_argument('--tokens-per-second', type=float, default=50.0, help="LLM generation speed (default: 50)")
+    parser.add_argument('--completion-tokens', type=int, default=250, help="LLM free-text completion length")
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help="Share of LLM requests that fail with 429")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Disable the Xano, LLM and sentiment caches to measure the cold path")
+    parser.add_argument('--verbose', action='store_true', help="Keep the app's log output")
+    args = parser.parse_args(argv)
+
+    xano = FakeXanoServer(reviews_per_business=args.reviews, latency_ms=args.xano_latency_ms,
+                          jitter_ms=args.xano_jitter_ms, error_rate=args.xano_error_rate).start()
+    llm = FakeLLMServer(tokens_per_second=args.tokens_per_second, completion_tokens=args.completion_tokens,
+                        latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms,
+                        error_rate=args.llm_error_rate, error_status=429).start()
+    configure_environment(xano, llm, no_cache=args.no_cache)
+
+    # Imported only now: the app reads its configuration at import time
+    import app as underwriter_app
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, underwriter_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app", daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/analyze"
+    print(f"App at {url}, Xano stand-in at {xano.url}, LLM stand-in at {llm.base_url}", file=sys.stderr)
+
+    generator = LoadGenerator(url, args.rps, args.duration, request_bodies(args.ids, args.id_type),
+                              timeout=args.timeout, max_concurrency=args.concurrency)
+    progress = lambda line: print(line, file=sys.stderr)
+    try:
+        if args.verbose:
+            summary = generator.run(progress=progress)
+        else:
+            logging.disable(logging.WARNING)
+            summary = generator.run(progress=progress)
+            logging.disable(logging.NOTSET)
+    finally:
+        server.shutdown()
+        xano.stop()
+        llm.stop()
+
+    summary["stand_ins"] = {"xano": dict(xano.stats), "llm": dict(llm.stats)}
+    summary["fallback_reports"] = underwriter_app.fallback_reports.value(route="/api/analyze")
+    summary["settings"] = {name: value for name, value in vars(args).items() if name != "output"}
+
+    print_summary(summary)
+    print(f"stand-ins     xano {summary['stand_ins']['xano']}, llm {summary['stand_ins']['llm']}")
+    print(f"fallbacks     {summary['fallback_reports']} reports served by the traditional flow")
+    if args.output:
+        write_output(summary, args.output)
+    return 0 if summary["succeeded"] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Shared plumbing of the local stand-in servers used by the load test"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StandInServer:
+    """A threaded HTTP server with injected latency and errors
+
+    Subclasses set handler_class to a StandInHandler subclass. Each request
+    sleeps for latency_ms plus or minus jitter_ms, and fails with error_status
+    at error_rate, before the handler builds its response.
+    """
+
+    handler_class = None
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 error_status=500, seed=0):
+        """Create the server (bound, but not yet serving)
+
+        Args:
+            host (str, optional): Interface to bind. Defaults to "127.0.0.1".
+            port (int, optional): Port to bind; 0 picks a free one. Defaults to 0.
+            latency_ms (float, optional): Mean added latency per request. Defaults to 0.0.
+            jitter_ms (float, optional): Uniform jitter around the latency. Defaults to 0.0.
+            error_rate (float, optional): Share of requests answered with error_status. Defaults to 0.0.
+            error_status (int, optional): Status of injected errors. Defaults to 500.
+            seed (int, optional): Seed of the injected latency and errors. Defaults to 0.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the server, without a trailing slash"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread
+
+        Returns:
+            StandInServer: self, for chaining
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted"""
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def inject(self):
+        """Sleep for the configured latency and decide whether this request fails
+
+        Returns:
+            bool: True if the request should be answered with error_status
+        """
+        with self._rng_lock:
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if fail:
+                self.stats["errors"] += 1
+        return fail
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler with JSON helpers; log lines are suppressed to keep load test output readable"""
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def stand_in(self):
+        return self.server.stand_in
+
+    def read_json(self):
+        """Parse the request body as JSON (None if there is none)"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length))
+
+    def send_json(self, status, body, headers=None):
+        """Send a JSON response with a Content-Length so the connection can be kept alive"""
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_injected_error(self):
+        """Answer with the server's injected error status"""
+        headers = {"Retry-After": "1"} if self.stand_in.error_status == 429 else None
+        self.send_json(self.stand_in.error_status, {"error": "Injected failure"}, headers)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,194 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class TieredCache:
+    """Size-bounded LRU cache with per-entry TTL and an optional on-disk SQLite tier
+
+    The in-memory tier holds the most recently used entries. When a path is
+    given, every entry is also written to SQLite so it survives restarts and
+    can be promoted back into memory on a miss. Values stored on disk must be
+    JSON-serializable. Values returned from the memory tier are the stored
+    objects themselves, so callers must not mutate them.
+    """
+
+    def __init__(self, max_entries=1000, default_ttl=None, path=None, max_disk_entries=None, namespace="default"):
+        """Initialize the cache
+
+        Args:
+            max_entries (int, optional): Maximum entries kept in memory. Defaults to 1000.
+            default_ttl (float, optional): Seconds an entry stays valid; None never expires.
+            path (str, optional): SQLite database file for the on-disk tier. Defaults to None.
+            max_disk_entries (int, optional): Maximum entries kept on disk. Defaults to 10x max_entries.
+            namespace (str, optional): Partition of the database used by this cache. Defaults to "default".
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries or max_entries * 10
+        self.namespace = namespace
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0, "expired": 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, expires_at REAL, PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS cache_entries_stored_at ON cache_entries (namespace, stored_at)"
+            )
+            self._db.commit()
+
+    def get(self, key, default=None):
+        """Get a cached value
+
+        Args:
+            key (str): Cache key
+            default (optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        entry = self._get_entry(key)
+        return entry[0] if entry is not None else default
+
+    def get_entry(self, key):
+        """Get a cached value together with the time it was stored
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            tuple: (value, stored_at) where stored_at is a time.time() timestamp, or None if missing or expired
+        """
+        entry = self._get_entry(key)
+        return (entry[0], entry[1]) if entry is not None else None
+
+    def _get_entry(self, key):
+        """Look up (value, stored_at, expires_at) in memory, then on disk"""
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[2] is not None and entry[2] <= now:
+                    del self._memory[key]
+                    expired = True
+                else:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return entry
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, stored_at, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row is not None:
+                    if row[2] is not None and row[2] <= now:
+                        self._db.execute(
+                            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                        )
+                        self._db.commit()
+                        expired = True
+                    else:
+                        entry = (json.loads(row[0]), row[1], row[2])
+                        self._store_in_memory(key, entry)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return entry
+
+            if expired:
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """Store a value
+
+        Args:
+            key (str): Cache key
+            value: Value to cache (JSON-serializable if the disk tier is enabled)
+            ttl (float, optional): Seconds the entry stays valid. Defaults to default_ttl.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        entry = (value, now, now + ttl if ttl is not None else None)
+        with self._lock:
+            self._store_in_memory(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), entry[1], entry[2])
+                )
+                self._disk_writes += 1
+                # Trim the disk tier periodically rather than on every write
+                if self._disk_writes % 100 == 0:
+                    self._trim_disk()
+                self._db.commit()
+
+    def _store_in_memory(self, key, entry):
+        """Insert into the memory tier and evict least recently used entries (caller holds the lock)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _trim_disk(self):
+        """Drop expired entries and the oldest entries beyond max_disk_entries (caller holds the lock)"""
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, time.time())
+        )
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_disk_entries)
+        )
+
+    def delete(self, key):
+        """Remove a key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def stats(self):
+        """Get hit/miss counters
+
+        Returns:
+            dict: Counters plus the current entry count and hit ratio
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory)
@@ -1,17 +1,336 @@
 import requests
+import copy
 import os
 import json
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from modules.cache import TieredCache
+from modules.log_utils import log_sampled
+from modules.single_flight import SingleFlight
+from modules.tracing import span, propagate
+from modules.metrics import counter, histogram
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Upstream response cache shared by all DataCollector instances, and the keys
+# currently being refreshed in the background
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+# Name/address and phone lookups resolved to Yelp business IDs, shared by all
+# DataCollector instances so each restaurant is resolved once per process
+_resolution_cache = None
+_resolution_cache_lock = threading.Lock()
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Pooled HTTP session shared by all DataCollector instances, so HTTP_POOL_MAXSIZE
+# bounds the connections of the whole process
+_session = None
+_session_lock = threading.Lock()
+
+# Fan-out pool shared by all DataCollector instances, so COLLECTION_MAX_WORKERS
+# bounds the concurrent upstream calls of the whole process
+_executor = None
+_executor_lock = threading.Lock()
+
+# Concurrent collections of the same restaurant share one in-flight collection
+_collection_flights = SingleFlight()
+
+_upstream_requests = counter("underwriter_upstream_requests_total",
+                             "Upstream (Xano) requests by endpoint and HTTP status, or error", ("endpoint", "status"))
+_upstream_seconds = histogram("underwriter_upstream_request_duration_seconds",
+                              "Upstream (Xano) request latency, including transport retries", ("endpoint",))
+_upstream_cache_lookups = counter("underwriter_upstream_cache_lookups_total",
+                                  "Upstream response cache lookups by result (hit, stale or miss)", ("endpoint", "result"))
+
+def get_collection_flight_stats():
+    """Get counters of collections run and requests coalesced into in-flight collections
+    
+    Returns:
+        dict: executions, coalesced and in_flight counts
+    """
+    return _collection_flights.stats()
+
+def get_response_cache():
+    """Get the shared upstream response cache, or None when XANO_CACHE_ENABLED is off
+    
+    Bounded by XANO_CACHE_MAX_ENTRIES in memory; XANO_CACHE_PATH adds a SQLite
+    tier so cached payloads survive restarts.
+    """
+    global _response_cache
+    if os.getenv('XANO_CACHE_ENABLED', 'True').lower() not in ('true', '1', 't'):
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = TieredCache(
+                    max_entries=int(os.getenv('XANO_CACHE_MAX_ENTRIES', 500)),
+                    path=os.getenv('XANO_CACHE_PATH') or None,
+                    namespace="xano_responses"
+                )
+    return _response_cache
+
+def _create_session():
+    """Create the pooled HTTP session used for all upstream calls
+    
+    Connections are kept alive and reused per host, at most HTTP_POOL_MAXSIZE
+    at a time (extra requests wait for a free connection). Connection errors,
+    429 and 5xx responses are retried up to HTTP_MAX_RETRIES times with
+    exponential, jittered backoff, honouring Retry-After.
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = Retry(
+        total=int(os.getenv('HTTP_MAX_RETRIES', 3)),
+        backoff_factor=float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5)),
+        backoff_jitter=float(os.getenv('HTTP_BACKOFF_JITTER', 0.5)),
+        status_forcelist=(429, 500, 502, 503, 504),
+        # The Xano lookups are read-only, so POST is safe to retry as well
+        allowed_methods=frozenset(['GET', 'POST']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', 10)),
+        pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+        pool_block=True,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_upstream_session():
+    """Get the pooled HTTP session shared by all DataCollector instances, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+def close_upstream_session():
+    """Close the shared HTTP session's connections; a new session is created on next use"""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+def get_collection_executor():
+    """Get the fan-out thread pool shared by all DataCollector instances, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('COLLECTION_MAX_WORKERS', 8)),
+                    thread_name_prefix='data-collector'
+                )
+    return _executor
+
+def shutdown_collection_executor():
+    """Shut down the shared fan-out pool; it is recreated on next use"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def get_resolution_cache():
+    """Get the shared cache of lookups resolved to Yelp business IDs, creating it on first use
+    
+    Bounded by YELP_RESOLUTION_CACHE_SIZE; entries expire after YELP_RESOLUTION_TTL seconds.
+    """
+    global _resolution_cache
+    if _resolution_cache is None:
+        with _resolution_cache_lock:
+            if _resolution_cache is None:
+                _resolution_cache = TieredCache(
+                    max_entries=int(os.getenv('YELP_RESOLUTION_CACHE_SIZE', 1000)),
+                    default_ttl=float(os.getenv('YELP_RESOLUTION_TTL', 86400)),
+                    namespace="yelp_resolution"
+                )
+    return _resolution_cache
+
 class DataCollector:
     def __init__(self):
         # Set API credentials from environment variables or use the provided ones
         self.xano_api_url = os.getenv('XANO_API_URL', 'https://x0n1-tbv3-v8eo.n7.xano.io/api:ag2Iad7F/reviews_by_formId')
         self.google_image_api_url = os.getenv('GOOGLE_IMAGE_API_URL', 'https://x0n1-tbv3-v8eo.n7.xano.io/api:0LgARp2Y/place_image_by_insurance_request_form_id')
         self.yelp_api_url = os.getenv('YELP_API_URL', 'https://x0n1-tbv3-v8eo.n7.xano.io/api:ag2Iad7F/Yelp_review_by_name_address_and_biz_id')
+        
+        # (connect, read) timeout applied to every upstream request
+        self.timeout = (
+            float(os.getenv('HTTP_CONNECT_TIMEOUT', 5)),
+            float(os.getenv('HTTP_READ_TIMEOUT', 30))
+        )
+        
+        # Seconds each endpoint's cached payloads are served as fresh; after that they
+        # are served stale for up to cache_stale_ttl seconds while being refreshed
+        self.cache_ttls = {
+            'xano_form': float(os.getenv('XANO_FORM_CACHE_TTL', 300)),
+            'yelp': float(os.getenv('YELP_CACHE_TTL', 900)),
+            'google_images': float(os.getenv('GOOGLE_IMAGE_CACHE_TTL', 3600))
+        }
+        self.cache_stale_ttl = float(os.getenv('XANO_CACHE_STALE_TTL', 3600))
+        self.response_cache = get_response_cache()
+        
+        # Name/address and phone lookups resolved to Yelp business IDs (shared)
+        self._resolution_cache = get_resolution_cache()
+        
+        # Independent upstream calls are fanned out on the shared pool; each one must
+        # finish within collection_deadline seconds of the start of a collection
+        self.collection_deadline = float(os.getenv('COLLECTION_DEADLINE', 45))
+    
+    @property
+    def session(self):
+        """The pooled HTTP session shared by all instances (see get_upstream_session)"""
+        return get_upstream_session()
+    
+    @property
+    def _executor(self):
+        """The fan-out pool shared by all instances (see get_collection_executor)"""
+        return get_collection_executor()
+    
+    def _request(self, method, url, **kwargs):
+        """Send a request through the pooled session with the default timeouts
+        
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Additional arguments for requests (params, json, headers, ...)
+            
+        Returns:
+            requests.Response: The response (after any retries)
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with span("http.request", method=method, url=url) as request_span:
+            response = self.session.request(method, url, **kwargs)
+            request_span.set(status_code=response.status_code)
+            return response
+    
+    def _fetch_json(self, endpoint, method, url, validate=None, **kwargs):
+        """Fetch a JSON payload from an upstream endpoint through the response cache
+        
+        Payloads are keyed by endpoint and request parameters. A payload younger
+        than the endpoint's TTL is returned without network I/O; an older one is
+        still returned while a single background refresh replaces it
+        (stale-while-revalidate), until it is cache_stale_ttl seconds past its TTL.
+        Only 200 responses whose body passes validate are cached.
+        
+        Args:
+            endpoint (str): Endpoint name ('xano_form', 'yelp' or 'google_images')
+            method (str): HTTP method
+            url (str): Request URL
+            validate (callable, optional): Returns whether a response body may be cached
+            **kwargs: Additional arguments for requests (params, json, headers, ...)
+            
+        Returns:
+            tuple: (HTTP status code, parsed JSON body or None)
+        """
+        with span(f"upstream.{endpoint}") as fetch_span:
+            if self.response_cache is None:
+                fetch_span.set(cache="disabled")
+                return self._fetch_and_cache(None, endpoint, method, url, validate, **kwargs)
+            
+            key = endpoint + ":" + json.dumps(
+                {"url": url, "params": kwargs.get("params"), "json": kwargs.get("json")}, sort_keys=True
+            )
+            entry = self.response_cache.get_entry(key)
+            if entry is None:
+                fetch_span.set(cache="miss")
+                _upstream_cache_lookups.inc(endpoint=endpoint, result="miss")
+                return self._fetch_and_cache(key, endpoint, method, url, validate, **kwargs)
+            
+            body, stored_at = entry
+            stale = time.time() - stored_at >= self.cache_ttls[endpoint]
+            fetch_span.set(cache="stale" if stale else "hit")
+            _upstream_cache_lookups.inc(endpoint=endpoint, result="stale" if stale else "hit")
+            if stale:
+                self._refresh_in_background(key, endpoint, method, url, validate, **kwargs)
+            # Callers may modify the payload, so never hand out the cached object itself
+            return 200, copy.deepcopy(body)
+    
+    def _fetch_and_cache(self, key, endpoint, method, url, validate, **kwargs):
+        """Fetch a payload and store it under key if it is cacheable (see _fetch_json)"""
+        start = time.perf_counter()
+        try:
+            response = self._request(method, url, **kwargs)
+        except Exception:
+            _upstream_requests.inc(endpoint=endpoint, status="error")
+            raise
+        finally:
+            _upstream_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+        _upstream_requests.inc(endpoint=endpoint, status=str(response.status_code))
+        if response.status_code != 200:
+            return response.status_code, None
+        body = response.json()
+        if key is not None and (validate is None or validate(body)):
+            self.response_cache.set(
+                key, copy.deepcopy(body), ttl=self.cache_ttls[endpoint] + self.cache_stale_ttl
+            )
+        return 200, body
+    
+    def _refresh_in_background(self, key, endpoint, method, url, validate, **kwargs):
+        """Refetch a stale payload on the fan-out pool unless a refresh is already running"""
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+        
+        def refresh():
+            try:
+                status_code, _ = self._fetch_and_cache(key, endpoint, method, url, validate, **kwargs)
+                if status_code != 200:
+                    log_sampled(logger, logging.WARNING, "upstream.refresh_failed", "Background refresh of %s data failed: %s", endpoint, status_code)
+            except Exception as e:
+                log_sampled(logger, logging.WARNING, "upstream.refresh_failed", "Background refresh of %s data failed: %s", endpoint, e)
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+        
+        logger.debug("Serving stale %s data while refreshing it", endpoint)
+        try:
+            self._executor.submit(refresh)
+        except RuntimeError:
+            # The pool has been shut down
+            with _refreshing_lock:
+                _refreshing.discard(key)
+    
+    def _result_before(self, future, deadline, description, default=None):
+        """Wait for a fanned-out call until the collection deadline
+        
+        Args:
+            future (Future): The pending call
+            deadline (float): time.monotonic() value by which the call must finish
+            description (str): What the call fetches, for logging
+            default (optional): Value returned if the deadline passes. Defaults to None.
+            
+        Returns:
+            The call's result, or default if it did not finish in time
+        """
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning("Timed out waiting for %s, continuing without it", description)
+            future.cancel()
+            return default
+    
+    def close(self):
+        """Close the fan-out pool and the shared pooled HTTP connections (reopened on next use)"""
+        shutdown_collection_executor()
+        close_upstream_session()
     
     def get_yelp_reviews(self, restaurant_name=None, restaurant_address=None, business_id=None, phone_number=None):
         """Fetch Yelp reviews for a restaurant using the Xano API
@@ -21,6 +340,9 @@ class DataCollector:
         - By business name and address ("business_name_and_address") - Returns biz_id for further lookup
         - By phone number ("phone_number") - Returns biz_id for further lookup
         
+        Name/address and phone lookups are resolved to a business ID first (see
+        resolve_business_id), then the full details are fetched by ID.
+        
         Args:
             restaurant_name (str, optional): Name of the restaurant. Defaults to None.
             restaurant_address (str, optional): Address of the restaurant. Defaults to None.
@@ -31,33 +353,79 @@ class DataCollector:
             dict: Complete Yelp data including business details and reviews if successful, None otherwise
         """
         try:
-            # Determine which lookup method to use based on provided parameters
-            if business_id:
-                print(f"Fetching Yelp reviews by business ID: {business_id}")
-                data = {
-                    "type": "biz_id",
-                    "biz_id": business_id,
-                    "ph_number": "",
-                    "name": "",
-                    "address": "",
-                    "firm_city": "",
-                    "firm_state": "",
-                    "firm_country": ""
-                }
-                lookup_type = "biz_id"
-            elif restaurant_name and restaurant_address:
-                print(f"Fetching Yelp reviews by name and address: {restaurant_name}, {restaurant_address}")
+            if not business_id:
+                if not ((restaurant_name and restaurant_address) or phone_number):
+                    logger.warning("Insufficient data to fetch Yelp reviews")
+                    return None
+                business_id = self.resolve_business_id(
+                    restaurant_name=restaurant_name, restaurant_address=restaurant_address, phone_number=phone_number
+                )
+                if not business_id:
+                    return None
+                logger.debug("Retrieved business ID: %s, fetching full details", business_id)
+            
+            logger.debug("Fetching Yelp reviews by business ID: %s", business_id)
+            response_data = self._post_yelp_lookup({
+                "type": "biz_id",
+                "biz_id": business_id,
+                "ph_number": "",
+                "name": "",
+                "address": "",
+                "firm_city": "",
+                "firm_state": "",
+                "firm_country": ""
+            })
+            if response_data is None:
+                return None
+            
+            logger.debug("Successfully retrieved Yelp data with %d results", len(response_data.get('data', [])))
+            return response_data
+                
+        except Exception as e:
+            logger.warning("Exception while fetching Yelp reviews: %s", e)
+            return None
+    
+    def resolve_business_id(self, restaurant_name=None, restaurant_address=None, phone_number=None):
+        """Resolve a restaurant name and address (or phone number) to its Yelp business ID
+        
+        Resolved IDs are cached for YELP_RESOLUTION_TTL seconds, keyed by the
+        normalised name, address and phone number, so repeat lookups of the same
+        restaurant skip the lookup round-trip. Failed lookups are not cached.
+        
+        Args:
+            restaurant_name (str, optional): Name of the restaurant. Defaults to None.
+            restaurant_address (str, optional): Address of the restaurant. Defaults to None.
+            phone_number (str, optional): Phone number of the restaurant. Defaults to None.
+            
+        Returns:
+            str: The Yelp business ID, or None if it could not be resolved
+        """
+        if restaurant_name and restaurant_address:
+            lookup_type = "business_name_and_address"
+            cache_key = f"{lookup_type}|{self._normalise(restaurant_name)}|{self._normalise(restaurant_address)}"
+        elif phone_number:
+            lookup_type = "phone_number"
+            cache_key = f"{lookup_type}|{''.join(c for c in phone_number if c.isdigit() or c == '+')}"
+        else:
+            logger.warning("Insufficient data to resolve a Yelp business ID")
+            return None
+        
+        business_id = self._resolution_cache.get(cache_key)
+        if business_id:
+            logger.debug("Resolved business ID %s from cache", business_id)
+            return business_id
+        
+        try:
+            if lookup_type == "business_name_and_address":
+                logger.debug("Fetching Yelp reviews by name and address: %s, %s", restaurant_name, restaurant_address)
                 # Parse address into components - this is a simple approach
                 address_parts = restaurant_address.split(',')
                 
                 # Default values
-                address = ""
                 city = ""
                 state = ""
                 country = "US"
                 
-                if len(address_parts) >= 1:
-                    address = address_parts[0].strip()
                 if len(address_parts) >= 2:
                     city = address_parts[1].strip()
                 if len(address_parts) >= 3:
@@ -76,9 +444,8 @@ class DataCollector:
                     "firm_state": state,
                     "firm_country": country
                 }
-                lookup_type = "business_name_and_address"
-            elif phone_number:
-                print(f"Fetching Yelp reviews by phone number: {phone_number}")
+            else:
+                logger.debug("Fetching Yelp reviews by phone number: %s", phone_number)
                 data = {
                     "type": "phone_number",
                     "biz_id": "",
@@ -89,42 +456,108 @@ class DataCollector:
                     "firm_state": "",
                     "firm_country": ""
                 }
-                lookup_type = "phone_number"
-            else:
-                print("Insufficient data to fetch Yelp reviews")
-                return None
             
-            # Make the API call
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(self.yelp_api_url, headers=headers, json=data)
-            
-            if response.status_code == 200:
-                response_data = response.json()
-                
-                # Check if we have a successful response
-                if response_data.get("status") == True:
-                    yelp_data = response_data.get("data", [])
-                    
-                    # If we used business_name_and_address or phone_number type and got biz_id, 
-                    # make another call with the biz_id to get full details
-                    if lookup_type in ["business_name_and_address", "phone_number"] and yelp_data and len(yelp_data) > 0:
-                        business_id = yelp_data[0].get("id", "")
-                        if business_id:
-                            print(f"Retrieved business ID: {business_id}, fetching full details")
-                            return self.get_yelp_reviews(business_id=business_id)
-                    
-                    print(f"Successfully retrieved Yelp data with {len(yelp_data)} results")
-                    return response_data
-                else:
-                    print("Yelp API returned unsuccessful status")
-                    return None
-            else:
-                print(f"Error fetching Yelp reviews: {response.status_code}")
+            response_data = self._post_yelp_lookup(data)
+            yelp_data = response_data.get("data", []) if response_data else []
+            business_id = yelp_data[0].get("id", "") if yelp_data else ""
+            if not business_id:
+                logger.info("No Yelp business ID found for the lookup")
                 return None
-                
+            
+            self._resolution_cache.set(cache_key, business_id)
+            return business_id
+        
         except Exception as e:
-            print(f"Exception while fetching Yelp reviews: {str(e)}")
+            logger.warning("Exception while resolving Yelp business ID: %s", e)
             return None
+    
+    def _post_yelp_lookup(self, data):
+        """POST a lookup to the Yelp Xano endpoint
+        
+        Args:
+            data (dict): Lookup payload
+            
+        Returns:
+            dict: The response body if the lookup succeeded, None otherwise
+        """
+        headers = {'Content-Type': 'application/json'}
+        status_code, response_data = self._fetch_json(
+            'yelp', 'POST', self.yelp_api_url, headers=headers, json=data,
+            validate=lambda body: body.get("status") == True
+        )
+        
+        if status_code != 200:
+            logger.warning("Error fetching Yelp reviews: %s", status_code)
+            return None
+        
+        # Check if we have a successful response
+        if response_data.get("status") != True:
+            logger.warning("Yelp API returned unsuccessful status")
+            return None
+        return response_data
+    
+    @staticmethod
+    def _normalise(value):
+        """Lower-case a lookup field and collapse punctuation and whitespace"""
+        return " ".join("".join(c if c.isalnum() else " " for c in value.lower()).split())
+    
+    def collect_restaurant_data(self, form_id=None, business_id=None, restaurant_name=None,
+                                restaurant_address=None, phone_number=None):
+        """Collect restaurant data from whichever identifiers are available
+        
+        A Yelp business ID takes precedence, then the form ID, then a name and
+        address (or phone number), which is resolved to a business ID through the
+        resolution cache so the full Yelp data is only fetched once. Concurrent
+        collections for the same identifiers share one in-flight collection, and
+        each caller receives its own copy of the data.
+        
+        Args:
+            form_id (str, optional): The insurance request form ID. Defaults to None.
+            business_id (str, optional): Yelp business ID. Defaults to None.
+            restaurant_name (str, optional): Name of the restaurant. Defaults to None.
+            restaurant_address (str, optional): Address of the restaurant. Defaults to None.
+            phone_number (str, optional): Phone number of the restaurant. Defaults to None.
+            
+        Returns:
+            tuple: (restaurant data, or None if the restaurant could not be found;
+                business ID used for the collection, or None)
+        """
+        if business_id:
+            key = f"biz_id|{str(business_id).strip()}"
+        elif form_id:
+            key = f"form_id|{str(form_id).strip()}"
+        elif restaurant_name and restaurant_address:
+            key = f"name_and_address|{self._normalise(restaurant_name)}|{self._normalise(restaurant_address)}"
+        elif phone_number:
+            key = f"phone_number|{''.join(c for c in phone_number if c.isdigit() or c == '+')}"
+        else:
+            logger.info("No identifiers provided, using sample data")
+            return self.get_sample_data(), None
+        
+        with span("data_collection", key=key):
+            return _collection_flights.do(
+                key,
+                lambda: self._collect_restaurant_data(form_id, business_id, restaurant_name, restaurant_address, phone_number),
+                copy_result=copy.deepcopy
+            )
+    
+    def _collect_restaurant_data(self, form_id, business_id, restaurant_name, restaurant_address, phone_number):
+        """Collect restaurant data without coalescing (see collect_restaurant_data)"""
+        if business_id:
+            logger.debug("Collecting data with Yelp business ID: %s", business_id)
+            return self.get_xano_data(business_id=business_id), business_id
+        if form_id:
+            logger.debug("Collecting data with form ID: %s", form_id)
+            return self.get_xano_data(form_id=form_id), None
+        if (restaurant_name and restaurant_address) or phone_number:
+            business_id = self.resolve_business_id(
+                restaurant_name=restaurant_name, restaurant_address=restaurant_address, phone_number=phone_number
+            )
+            if not business_id:
+                return None, None
+            logger.debug("Found business ID: %s, fetching full details", business_id)
+            return self.get_xano_data(business_id=business_id), business_id
+        return self.get_sample_data(), None
             
     def get_google_images(self, form_id=None, restaurant_name=None, limit=5):
         """Fetch Google images for a restaurant via the Xano API endpoint or direct web search
@@ -145,15 +578,14 @@ class DataCollector:
         # Try using Xano API first if form_id is provided
         if form_id:
             try:
-                print(f"Fetching Google images for form ID: {form_id}")
-                response = requests.get(f"{self.google_image_api_url}?id={form_id}")
+                logger.debug("Fetching Google images for form ID: %s", form_id)
+                status_code, data = self._fetch_json('google_images', 'GET', self.google_image_api_url, params={"id": form_id})
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if status_code == 200:
                     
                     # Extract images from the response
                     images = data.get('images', [])
-                    print(f"Retrieved {len(images)} Google images for restaurant via Xano API")
+                    logger.debug("Retrieved %d Google images for restaurant via Xano API", len(images))
                     
                     # Process and return the top images up to the limit
                     for image in images[:limit]:
@@ -173,19 +605,18 @@ class DataCollector:
                             processed_images.append(image_metadata)
                     
                     if processed_images:
-                        print(f"Processed {len(processed_images)} Google images from Xano for analysis")
+                        logger.debug("Processed %d Google images from Xano for analysis", len(processed_images))
                         return processed_images
                     
-                print("No images found via Xano API, trying direct web search")
+                logger.debug("No images found via Xano API, trying direct web search")
             except Exception as e:
-                print(f"Exception while fetching Google images via Xano: {str(e)}")
-                print("Falling back to direct web search")
+                logger.warning("Exception while fetching Google images via Xano, falling back to direct web search: %s", e)
         
         # If we didn't get images from Xano or if no form_id was provided,
         # try to get images directly from web search if we have a restaurant name
         if (not processed_images or len(processed_images) < limit) and restaurant_name:
             try:
-                print(f"Fetching Google images for restaurant name: {restaurant_name}")
+                logger.debug("Fetching Google images for restaurant name: %s", restaurant_name)
                 
                 # Use a different API or create dummy images based on the restaurant name
                 # (In a real application, you would use a proper Google search API here)
@@ -221,14 +652,14 @@ class DataCollector:
                         }
                         processed_images.append(image_metadata)
                 
-                print(f"Retrieved {len(processed_images)} total Google images for analysis")
+                logger.debug("Retrieved %d total Google images for analysis", len(processed_images))
                 return processed_images
             except Exception as e:
-                print(f"Exception while fetching Google images from web: {str(e)}")
+                logger.warning("Exception while fetching Google images from web: %s", e)
         
         # If we still don't have images, return an empty list or sample images
         if not processed_images:
-            print("Unable to fetch Google images, using sample images")
+            logger.info("Unable to fetch Google images, using sample images")
             for i in range(min(3, limit)):
                 image_metadata = {
                     'url': f"https://placehold.co/800x600?text=Sample+Restaurant+Image+{i+1}",
@@ -257,7 +688,7 @@ class DataCollector:
             dict: Analysis results with observations
         """
         try:
-            print(f"Analyzing image: {image_url}")
+            logger.debug("Analyzing image: %s", image_url)
             
             # In a real system, we would call a computer vision API here
             # For this implementation, we'll simulate observations based on the URL
@@ -309,7 +740,7 @@ class DataCollector:
             }
             
         except Exception as e:
-            print(f"Error analyzing image: {str(e)}")
+            log_sampled(logger, logging.WARNING, "collector.image_error", "Error analyzing image: %s", e)
             return {
                 "image_url": image_url,
                 "observations": ["Unable to analyze image"],
@@ -331,23 +762,38 @@ class DataCollector:
         """
         try:
             if not form_id and not business_id:
-                print("No form_id or business_id provided, returning sample data")
+                logger.info("No form_id or business_id provided, returning sample data")
                 return self.get_sample_data()
                 
-            print(f"Fetching complete restaurant data using form ID: {form_id}")
+            logger.debug("Fetching complete restaurant data using form ID: %s", form_id)
+            deadline = time.monotonic() + self.collection_deadline
             
-            # Get the restaurant information from the original Xano API first to get business name and details
-            params = {"form_id": form_id}
-            response = requests.get(self.xano_api_url, params=params)
+            # Start every upstream call whose inputs are already known so they run
+            # concurrently: the form record, Yelp reviews by business ID and the
+            # Google images for the form
+            form_future = None
+            yelp_future = None
+            images_future = None
+            if form_id:
+                form_future = self._executor.submit(
+                    propagate(self._fetch_json), 'xano_form', 'GET', self.xano_api_url, params={"form_id": form_id}
+                )
+                images_future = self._executor.submit(propagate(self.get_google_images), form_id=form_id, limit=5)
+            if business_id:
+                logger.debug("Using provided business ID: %s", business_id)
+                yelp_future = self._executor.submit(propagate(self.get_yelp_reviews), business_id=business_id)
+            
+            # Get the restaurant information from the original Xano API to get business name and details
+            data = None
             restaurant_name = None
             restaurant_address = None
             
-            if response.status_code != 200:
-                print(f"Error fetching initial Xano data: {response.status_code}")
-                if not business_id:  # Only return sample data if we don't have a business_id
-                    return self.get_sample_data()
-            else:
-                data = response.json()
+            status_code = None
+            if form_future is not None:
+                status_code, data = self._result_before(form_future, deadline, "Xano form data", default=(None, None))
+            if status_code is not None and status_code != 200:
+                logger.warning("Error fetching initial Xano data: %s", status_code)
+            elif data is not None:
                 # Check if we have valid data structure to extract business name and address
                 if "business" in data:
                     restaurant_name = data.get("business", {}).get("name")
@@ -359,21 +805,23 @@ class DataCollector:
                         zip_code = location.get("zip_code", "")
                         restaurant_address = f"{address1}, {city}, {state} {zip_code}".strip()
                     
-                    print(f"Retrieved business name: {restaurant_name}, address: {restaurant_address}")
+                    logger.debug("Retrieved business name: %s, address: %s", restaurant_name, restaurant_address)
+            
+            if data is None and not business_id:  # Only return sample data if we don't have a business_id
+                return self.get_sample_data()
             
             # Get Yelp reviews using the new Xano API
             yelp_data = None
-            if business_id:
-                # If business_id is provided, use it directly
-                print(f"Using provided business ID: {business_id}")
-                yelp_data = self.get_yelp_reviews(business_id=business_id)
+            if yelp_future is not None:
+                # If business_id is provided, the lookup is already in flight
+                yelp_data = self._result_before(yelp_future, deadline, "Yelp reviews")
             elif restaurant_name and restaurant_address:
-                # If we have name and address, use those
-                print(f"Using business name and address for Yelp lookup")
+                # If we have name and address, use those (this depends on the form record)
+                logger.debug("Using business name and address for Yelp lookup")
                 yelp_data = self.get_yelp_reviews(restaurant_name=restaurant_name, restaurant_address=restaurant_address)
             else:
-                print("Insufficient information to fetch Yelp reviews")
-                if not response.status_code == 200:  # If we don't have original Xano data either
+                logger.warning("Insufficient information to fetch Yelp reviews")
+                if data is None:  # If we don't have original Xano data either
                     return self.get_sample_data()
             
             # Process business details and reviews
@@ -432,18 +880,19 @@ class DataCollector:
                         # Process reviews
                         # First, determine total review counts
                         review_count = business.get("reviewCount", 0)
-                        print(f"Restaurant has {review_count} total reviews according to Yelp")
+                        logger.debug("Restaurant has %d total reviews according to Yelp", review_count)
                         
                         # Get rating distribution if available
                         if "reviewCountsByRating" in business:
                             counts = business.get("reviewCountsByRating", [])
                             if len(counts) == 5:  # Yelp uses 5-star system
-                                print(f"Rating distribution - 5★: {counts[4]}, 4★: {counts[3]}, 3★: {counts[2]}, 2★: {counts[1]}, 1★: {counts[0]}")
+                                logger.debug("Rating distribution - 5★: %s, 4★: %s, 3★: %s, 2★: %s, 1★: %s",
+                                             counts[4], counts[3], counts[2], counts[1], counts[0])
                                 
                         # Process reviews from the response
                         if "reviews" in business and "edges" in business["reviews"]:
                             edge_count = len(business["reviews"]["edges"])
-                            print(f"Processing {edge_count} reviews from current response")
+                            logger.debug("Processing %d reviews from current response", edge_count)
                             
                             for edge in business["reviews"]["edges"]:
                                 if "node" in edge:
@@ -461,7 +910,7 @@ class DataCollector:
                             
                             # Synthesize additional reviews if we only got a small portion
                             if edge_count < 10 and review_count > 20:
-                                print(f"Received only {edge_count} reviews from API, synthesizing additional reviews based on rating distribution")
+                                logger.info("Received only %d reviews from API, synthesizing additional reviews based on rating distribution", edge_count)
                                 
                                 # Create synthetic reviews based on rating distribution
                                 sample_positive = [
@@ -485,7 +934,6 @@ class DataCollector:
                                     "The place wasn't very clean and the food was just okay. Service could be better."
                                 ]
                                 
-                                import time
                                 import random
                                 
                                 # Calculate percentages based on rating distribution or defaults
@@ -542,7 +990,7 @@ class DataCollector:
                         }
             
             # If we didn't get business details from Yelp, use the original Xano data
-            if not business_details and response.status_code == 200:
+            if not business_details and data is not None:
                 business_details = data.get("business", {})
                 
                 # Extract reviews from the original Xano format if we didn't get them from Yelp
@@ -565,28 +1013,30 @@ class DataCollector:
             
             # If we still don't have sufficient data, return sample data
             if not business_details:
-                print("Failed to get business details, returning sample data")
+                logger.warning("Failed to get business details, returning sample data")
                 return self.get_sample_data()
             
             # Get Google images - try with form_id and fall back to restaurant name
             restaurant_name = business_details.get('name')
             google_images = []
             
-            if form_id:
-                google_images = self.get_google_images(form_id=form_id, limit=5)
+            if images_future is not None:
+                google_images = self._result_before(images_future, deadline, "Google images", default=[])
             
             # If we didn't get images from form_id or if we got fewer than 5, try using restaurant name
             if (not google_images or len(google_images) < 5) and restaurant_name:
                 additional_images = self.get_google_images(restaurant_name=restaurant_name, limit=5-len(google_images))
                 google_images.extend(additional_images)
                 
-            print(f"Retrieved {len(google_images)} total Google images for {restaurant_name}")
+            logger.debug("Retrieved %d total Google images for %s", len(google_images), restaurant_name)
             
-            # Analyze images
+            # Analyze images concurrently, keeping the image order
+            analysis_futures = [self._executor.submit(propagate(self.analyze_image), image['url']) for image in google_images]
             image_analyses = []
-            for image in google_images:
-                image_analysis = self.analyze_image(image['url'])
-                image_analyses.append(image_analysis)
+            for image, future in zip(google_images, analysis_futures):
+                image_analysis = self._result_before(future, deadline, f"analysis of image {image['url']}")
+                if image_analysis is not None:
+                    image_analyses.append(image_analysis)
             
             # Prepare the complete dataset
             restaurant_data = {
@@ -603,13 +1053,12 @@ class DataCollector:
                 restaurant_data["images"] = []
             
             # Log details of what we got
-            print(f"Successfully processed data for {business_details.get('name', 'Unknown Business')}")
-            print(f"- Total reviews: {len(processed_reviews)}")
-            print(f"- Total Google images: {len(google_images)}")
+            logger.info("Successfully processed data for %s: %d reviews, %d Google images",
+                        business_details.get('name', 'Unknown Business'), len(processed_reviews), len(google_images))
             
             # If we have too few reviews, add some sample reviews
             if len(processed_reviews) < 5:
-                print(f"Only {len(processed_reviews)} reviews found, adding some sample reviews")
+                logger.info("Only %d reviews found, adding some sample reviews", len(processed_reviews))
                 sample_data = self.get_sample_data()
                 
                 # Add a note to sample reviews
@@ -617,12 +1066,12 @@ class DataCollector:
                     review["text"] = "[SAMPLE REVIEW] " + review["text"]
                     
                 restaurant_data["reviews"].extend(sample_data["reviews"])
-                print(f"Added sample reviews, now have {len(restaurant_data['reviews'])} total reviews")
+                logger.debug("Added sample reviews, now have %d total reviews", len(restaurant_data['reviews']))
             
             return restaurant_data
             
         except Exception as e:
-            print(f"Error fetching data from Xano: {str(e)}")
+            logger.error("Error fetching data from Xano: %s", e)
             return self.get_sample_data()
     
     def _analyze_rating_distribution(self, reviews):
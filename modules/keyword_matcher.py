@@ -0,0 +1,103 @@
+import re
+
+class KeywordMatcher:
+    """Multi-pattern keyword matcher that finds every keyword group in one pass over a text
+
+    All keywords are compiled once into a single trie-shaped regular expression
+    (a shared-prefix automaton), so scanning a text costs one pass inside the
+    regex engine however many keywords there are. Matching is case
+    insensitive and, by default, only counts whole words or phrases: "clean"
+    matches "clean." but not "unclean" or "cleanliness".
+    """
+
+    def __init__(self, groups, word_boundaries=True):
+        """Compile the matcher
+
+        Args:
+            groups (dict): Mapping of group name to a list of keywords or phrases
+            word_boundaries (bool, optional): Only match whole words. Defaults to True.
+        """
+        self.groups = {name: list(keywords) for name, keywords in groups.items()}
+        self.word_boundaries = word_boundaries
+        self._lowered_groups = {
+            name: [(kw, kw.lower()) for kw in keywords] for name, keywords in self.groups.items()
+        }
+
+        patterns = sorted({kw.lower() for keywords in self.groups.values() for kw in keywords if kw})
+        trie = {}
+        for pattern in patterns:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        # Non-overlapping matching is enough unless one phrase can start inside
+        # another and run past its end ("exposed food" / "food poisoning"); only
+        # then scan with a lookahead that reports a match at every position
+        body = self._trie_to_regex(trie) if patterns else "(?!)"
+        if self._has_partial_overlaps(patterns):
+            body = "(?=(" + body + "){})".format(r"(?!\w)" if word_boundaries else "")
+            self._regex = re.compile((r"(?<!\w)" if word_boundaries else "") + body)
+        elif word_boundaries:
+            self._regex = re.compile(r"(?<!\w)(" + body + r")(?!\w)")
+        else:
+            self._regex = re.compile("(" + body + ")")
+
+        # The scan reports the longest keyword at each match, so record which
+        # shorter keywords are contained in each one (e.g. "trained" in "well-trained")
+        self._implied = {}
+        for pattern in patterns:
+            self._implied[pattern] = [
+                other for other in patterns
+                if other != pattern and self._contains(pattern, other)
+            ]
+
+    def _has_partial_overlaps(self, patterns):
+        """Check whether a suffix of one keyword is a proper prefix of another"""
+        for pattern in patterns:
+            for start in range(1, len(pattern)):
+                if self.word_boundaries and (pattern[start - 1].isalnum() or not pattern[start].isalnum()):
+                    continue
+                suffix = pattern[start:]
+                for other in patterns:
+                    if len(other) > len(suffix) and other.startswith(suffix) and \
+                            (not self.word_boundaries or not other[len(suffix)].isalnum()):
+                        return True
+        return False
+
+    def _contains(self, text, keyword):
+        """Check whether keyword occurs in text under this matcher's boundary rules"""
+        if self.word_boundaries:
+            return re.search(r"(?<!\w)" + re.escape(keyword) + r"(?!\w)", text) is not None
+        return keyword in text
+
+    @classmethod
+    def _trie_to_regex(cls, node):
+        """Render a trie node as a regex, trying longer continuations before shorter ones"""
+        branches = [re.escape(char) + cls._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char != ""]
+        if not branches:
+            return ""
+        alternation = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + alternation + ")?"
+        return alternation
+
+    def find_all(self, text):
+        """Find the keywords of every group that occur in a text
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            dict: Group name to the matching keywords, in the order they were given
+        """
+        found = set()
+        for keyword in set(self._regex.findall(text.lower())):
+            found.add(keyword)
+            found.update(self._implied[keyword])
+
+        return {
+            name: [kw for kw, lowered in keywords if lowered in found]
+            for name, keywords in self._lowered_groups.items()
+        }
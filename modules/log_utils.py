@@ -0,0 +1,211 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from modules.tracing import current_trace_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not structured fields passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'trace_id'}
+
+# Listener draining the queue of the handler installed by configure_logging
+_listener = None
+_configure_lock = threading.Lock()
+
+def log_sample_every():
+    """Read LOG_SAMPLE_EVERY, the share of high-frequency events logged (1 in N; 1 logs them all)"""
+    return max(1, int(os.getenv('LOG_SAMPLE_EVERY', '100') or 1))
+
+class TraceContextFilter(logging.Filter):
+    """Tag each record with the ID of the trace it was logged in (None outside a trace)
+
+    Runs in the logging thread, before the record is handed to the queue,
+    so the trace context is still available.
+    """
+
+    def filter(self, record):
+        record.trace_id = current_trace_id()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line
+
+    Besides time, level, logger, message, thread and trace_id, fields passed
+    with extra= are included as they are.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener's handler
+
+    The message arguments are merged on the logging thread (they may not be
+    safe to read later) and a traceback is rendered to exc_text; the rest of
+    the formatting runs on the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class LogSampler:
+    """Lets through the first and then every Nth occurrence of each high-frequency event
+
+    Events are grouped by a caller-chosen key (e.g. "sentiment.review_error").
+    A logged occurrence reports how many of the same event were dropped
+    since the previous one, so the volume stays visible.
+    """
+
+    def __init__(self, every=None):
+        """
+        Args:
+            every (int, optional): Log 1 in every N occurrences. Defaults to LOG_SAMPLE_EVERY.
+        """
+        self.every = every if every is not None else log_sample_every()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def sample(self, key):
+        """Count an occurrence of an event and decide whether to log it
+
+        Args:
+            key (str): Event key
+
+        Returns:
+            int: The number of occurrences dropped since the last logged one,
+                or None if this one should be dropped too
+        """
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.every:
+            return None
+        return self.every - 1 if count else 0
+
+    def log(self, logger, level, key, msg, *args, **kwargs):
+        """Log a sampled event with lazy %-formatting, like logger.log
+
+        Nothing is counted or formatted when the level is disabled.
+
+        Args:
+            logger (logging.Logger): Logger to log to
+            level (int): Logging level
+            key (str): Event key
+            msg (str): Message with %-style placeholders
+            *args: Placeholder values
+            **kwargs: exc_info, extra etc., as for logger.log
+        """
+        if not logger.isEnabledFor(level):
+            return
+        dropped = self.sample(key)
+        if dropped is None:
+            return
+        if dropped:
+            msg += " (%d similar messages suppressed)"
+            args += (dropped,)
+        logger.log(level, msg, *args, **kwargs)
+
+# Sampler shared by the modules' high-frequency log lines
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_log_sampler():
+    """Get the shared log sampler (created on first use)"""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = LogSampler()
+    return _sampler
+
+def log_sampled(logger, level, key, msg, *args, **kwargs):
+    """Log a high-frequency event through the shared sampler (see LogSampler.log)"""
+    get_log_sampler().log(logger, level, key, msg, *args, **kwargs)
+
+def configure_logging(level=None, log_format=None, queued=None, stream=None):
+    """Configure the root logger for the app
+
+    With queued logging, records are put on an in-memory queue by the calling
+    thread and written out by a single listener thread, so request threads
+    never block on (or serialize over) writes to the stream. Calling it again
+    replaces the previous configuration.
+
+    Args:
+        level (str, optional): Minimum level. Defaults to LOG_LEVEL (INFO).
+        log_format (str, optional): "text" or "json". Defaults to LOG_FORMAT (text).
+        queued (bool, optional): Write records from a listener thread. Defaults to LOG_QUEUE (True).
+        stream (file, optional): Stream to write to. Defaults to stderr.
+
+    Returns:
+        logging.handlers.QueueListener: The started listener, or None if not queued
+    """
+    global _listener
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    log_format = (log_format or os.getenv('LOG_FORMAT', 'text')).lower()
+    if queued is None:
+        queued = os.getenv('LOG_QUEUE', 'True').lower() in ('true', '1', 't')
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        if queued:
+            records = queue.SimpleQueue()
+            handler = _QueueHandler(records)
+            _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+            _listener.start()
+        else:
+            handler = output
+        handler.addFilter(TraceContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+            existing.close()
+        root.addHandler(handler)
+        root.setLevel(level)
+        return _listener
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+atexit.register(shutdown_logging)
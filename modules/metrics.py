@@ -0,0 +1,274 @@
+import logging
+import math
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond cache hits to multi-minute workflows
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def metrics_enabled():
+    """Check METRICS_ENABLED (on by default)"""
+    return os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 't')
+
+def _format_value(value):
+    """Format a sample value in the Prometheus text format"""
+    if value is True or value is False:
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    """Format a label dict as {name="value",...}, or "" without labels"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class _Metric:
+    """Shared label handling of counters and histograms"""
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+    def render(self):
+        """Render the metric in the Prometheus text format
+
+        Returns:
+            list: Lines of the HELP, TYPE and sample lines
+        """
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._render_samples(self._labels(key), value))
+        return lines
+
+    def _render_samples(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """A monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Increase the count of a label set
+
+        Args:
+            amount (float, optional): Amount to add. Defaults to 1.
+            **labels: Value of every label of the counter
+        """
+        if not metrics_enabled():
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Get the current count of a label set"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+class Histogram(_Metric):
+    """A distribution of observed values (e.g. latencies) per label set, in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation
+
+        Args:
+            value (float): Observed value, e.g. a duration in seconds
+            **labels: Value of every label of the histogram
+        """
+        if not metrics_enabled():
+            return
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["counts"][i] += 1
+                    break
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def snapshot(self, **labels):
+        """Get the count and sum of a label set
+
+        Returns:
+            dict: count and sum of the observations (zero if none)
+        """
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return {"count": entry["count"], "sum": entry["sum"]} if entry else {"count": 0, "sum": 0.0}
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, dict(entry, counts=list(entry["counts"]))) for key, entry in self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key, entry in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(dict(labels, le=_format_value(float(bound))))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(dict(labels, le='+Inf'))} {entry['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(entry['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {entry['count']}")
+        return lines
+
+class MetricsRegistry:
+    """Process-wide set of metrics rendered together by /metrics
+
+    Counters and histograms are updated where the work happens. Collectors are
+    called at scrape time for values that other components already keep
+    (cache, rate limiter and pool statistics), so those components need no
+    metrics code of their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        """Get the counter registered under name, creating it on first use
+
+        Args:
+            name (str): Metric name, ending in _total
+            help_text (str): Description shown in the HELP line
+            labelnames (tuple, optional): Label names. Defaults to ().
+
+        Returns:
+            Counter: The shared counter
+        """
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get the histogram registered under name, creating it on first use
+
+        Args:
+            name (str): Metric name, e.g. ending in _seconds
+            help_text (str): Description shown in the HELP line
+            labelnames (tuple, optional): Label names. Defaults to ().
+            buckets (tuple, optional): Upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+
+        Returns:
+            Histogram: The shared histogram
+        """
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def register_collector(self, collector):
+        """Add a function called at scrape time for metrics computed on demand
+
+        Args:
+            collector (callable): Returns a list of (name, type, help, samples) tuples,
+                where type is "gauge" or "counter" and samples is a list of
+                (labels dict, value) pairs
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)
+
+        Returns:
+            str: The exposition, ending in a newline
+        """
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.warning("Error collecting metrics: %s", e)
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+def counter(name, help_text, labelnames=()):
+    """Get a counter of the process-wide registry (see MetricsRegistry.counter)"""
+    return REGISTRY.counter(name, help_text, labelnames)
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Get a histogram of the process-wide registry (see MetricsRegistry.histogram)"""
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
+
+def register_collector(collector):
+    """Add a scrape-time collector to the process-wide registry (see MetricsRegistry.register_collector)"""
+    REGISTRY.register_collector(collector)
+
+def render_metrics():
+    """Render the process-wide registry in the Prometheus text format"""
+    return REGISTRY.render()
+
+def cache_samples(cache_stats):
+    """Turn TieredCache statistics into collector families
+
+    Args:
+        cache_stats (dict): Cache label to TieredCache.stats() (empty stats are skipped)
+
+    Returns:
+        list: (name, type, help, samples) tuples for hits, misses, evictions,
+            entries and hit ratio per cache
+    """
+    stats = {name: entry for name, entry in cache_stats.items() if entry}
+    families = [
+        ("underwriter_cache_hits_total", "counter", "Cache lookups served from the cache", "hits"),
+        ("underwriter_cache_misses_total", "counter", "Cache lookups that missed", "misses"),
+        ("underwriter_cache_evictions_total", "counter", "Entries evicted from the in-memory tier", "evictions"),
+        ("underwriter_cache_entries", "gauge", "Entries held in the in-memory tier", "entries"),
+        ("underwriter_cache_hit_ratio", "gauge", "Hits over lookups since start", "hit_ratio")
+    ]
+    return [
+        (name, kind, help_text, [({"cache": cache}, entry[field]) for cache, entry in stats.items()])
+        for name, kind, help_text, field in families
+    ]
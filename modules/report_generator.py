@@ -12,7 +12,8 @@ class ReportGenerator:
                 "address": f"{business_details['location']['address1']}, {business_details['location']['city']}, {business_details['location']['state']} {business_details['location']['zip_code']}",
                 "rating": business_details["rating"],
                 "review_count": business_details["review_count"],
-                "price_level": business_details["price"],
+                # Yelp business-ID lookups carry no price level
+                "price_level": business_details.get("price", "N/A"),
                 "categories": [cat["title"] for cat in business_details["categories"]]
             },
             "sentiment_analysis": {
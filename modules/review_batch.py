@@ -0,0 +1,284 @@
+import numpy as np
+
+SENTIMENT_CATEGORIES = ('positive', 'negative', 'neutral')
+CATEGORY_CODES = {name: code for code, name in enumerate(SENTIMENT_CATEGORIES)}
+
+class AnalyzedReviewBatch:
+    """Columnar store of analyzed reviews
+
+    Ratings, VADER scores and sentiment categories are held in NumPy arrays
+    and keyword hits in a sparse CSR-style matrix (one row per review, one
+    column per keyword), so summary statistics are vectorised instead of
+    re-scanning a list of per-review dicts. Review texts are kept as
+    references to the original strings rather than copied.
+
+    The batch behaves like the list of analyzed review dicts it replaces:
+    len(), iteration and integer indexing yield dicts with the same keys
+    ('review_id', 'rating', 'text', 'sentiment_scores', 'sentiment_category',
+    'positive_keywords', 'negative_keywords'). Ratings come back as the
+    original objects (an int rating stays an int); the float64 column is
+    only used for arithmetic.
+    """
+
+    def __init__(self, review_ids, texts, ratings, compound, pos, neg, neu, categories,
+                 keyword_vocab, keyword_indptr, keyword_indices, rating_values=None):
+        """Initialize the batch from its columns
+
+        Use AnalyzedReviewBatchBuilder or from_records() rather than calling this directly.
+
+        Args:
+            review_ids (list): Review IDs
+            texts (list): Review texts
+            ratings (np.ndarray): Star ratings (float64)
+            compound, pos, neg, neu (np.ndarray): VADER scores (float64)
+            categories (np.ndarray): Sentiment category codes (int8, see CATEGORY_CODES)
+            keyword_vocab (list): (group, keyword) pairs, one per keyword column
+            keyword_indptr (np.ndarray): Row offsets into keyword_indices (length n + 1)
+            keyword_indices (np.ndarray): Keyword column of every hit
+            rating_values (list, optional): The ratings as given, returned by record().
+                Defaults to the float ratings.
+        """
+        self.review_ids = review_ids
+        self.texts = texts
+        self.ratings = ratings
+        self.rating_values = rating_values if rating_values is not None else ratings.tolist()
+        self.compound = compound
+        self.pos = pos
+        self.neg = neg
+        self.neu = neu
+        self.categories = categories
+        self.keyword_vocab = keyword_vocab
+        self.keyword_indptr = keyword_indptr
+        self.keyword_indices = keyword_indices
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch from a list of analyzed review dicts
+
+        Args:
+            records (list): Analyzed reviews as returned by SentimentAnalyzer.analyze_reviews
+
+        Returns:
+            AnalyzedReviewBatch: The columnar batch
+        """
+        builder = AnalyzedReviewBatchBuilder()
+        for record in records:
+            builder.append(
+                record['review_id'], record['text'], record['rating'], record['sentiment_scores'],
+                record['sentiment_category'], record['positive_keywords'], record['negative_keywords']
+            )
+        return builder.build()
+
+    def __len__(self):
+        return len(self.review_ids)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.record(int(index))
+        return self.take(index)
+
+    def record(self, i):
+        """Get one review as a dict in the analyzed review format
+
+        Args:
+            i (int): Row index
+
+        Returns:
+            dict: The analyzed review
+        """
+        return {
+            'review_id': self.review_ids[i],
+            'rating': self.rating_values[i],
+            'text': self.texts[i],
+            'sentiment_scores': {
+                'neg': self.neg[i].item(),
+                'neu': self.neu[i].item(),
+                'pos': self.pos[i].item(),
+                'compound': self.compound[i].item()
+            },
+            'sentiment_category': SENTIMENT_CATEGORIES[self.categories[i]],
+            'positive_keywords': self.keywords(i, 'positive'),
+            'negative_keywords': self.keywords(i, 'negative')
+        }
+
+    def keywords(self, i, group):
+        """Get the keywords of one group found in one review
+
+        Args:
+            i (int): Row index
+            group (str): 'positive' or 'negative'
+
+        Returns:
+            list: Matching keywords
+        """
+        columns = self.keyword_indices[self.keyword_indptr[i]:self.keyword_indptr[i + 1]]
+        return [self.keyword_vocab[c][1] for c in columns if self.keyword_vocab[c][0] == group]
+
+    def to_records(self):
+        """Convert the batch back to a list of analyzed review dicts
+
+        Returns:
+            list: Analyzed reviews
+        """
+        return [self.record(i) for i in range(len(self))]
+
+    def take(self, selector):
+        """Get a new batch with a subset of the reviews
+
+        Args:
+            selector: Boolean mask, array of row indices or slice
+
+        Returns:
+            AnalyzedReviewBatch: The selected reviews, in selector order
+        """
+        rows = np.arange(len(self))[selector]
+        starts = self.keyword_indptr[rows]
+        counts = self.keyword_indptr[rows + 1] - starts
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        if len(rows) and indptr[-1]:
+            # Gather each selected row's slice of keyword hits
+            offsets = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+            indices = self.keyword_indices[offsets]
+        else:
+            indices = np.zeros(0, dtype=self.keyword_indices.dtype)
+        return AnalyzedReviewBatch(
+            [self.review_ids[r] for r in rows], [self.texts[r] for r in rows],
+            self.ratings[rows], self.compound[rows], self.pos[rows], self.neg[rows], self.neu[rows],
+            self.categories[rows], self.keyword_vocab, indptr, indices,
+            [self.rating_values[r] for r in rows]
+        )
+
+    def category_mask(self, category):
+        """Get a boolean mask of the reviews in a sentiment category
+
+        Args:
+            category (str): 'positive', 'negative' or 'neutral'
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        return self.categories == CATEGORY_CODES[category]
+
+    def keyword_mask(self, group, keywords):
+        """Get a boolean mask of the reviews containing any of the given keywords
+
+        Args:
+            group (str): 'positive' or 'negative'
+            keywords (list): Keywords to look for
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        wanted = set(keywords)
+        columns = [c for c, (g, kw) in enumerate(self.keyword_vocab) if g == group and kw in wanted]
+        hits = np.isin(self.keyword_indices, columns)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.keyword_indptr))
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows[hits]] = True
+        return mask
+
+    def category_counts(self):
+        """Count reviews per sentiment category
+
+        Returns:
+            dict: Category name to count
+        """
+        counts = np.bincount(self.categories, minlength=len(SENTIMENT_CATEGORIES))
+        return {name: int(counts[code]) for name, code in CATEGORY_CODES.items()}
+
+    def mean_compound(self):
+        """Get the average VADER compound score
+
+        Returns:
+            float: Mean compound score, 0 for an empty batch
+        """
+        return float(self.compound.mean()) if len(self) else 0.0
+
+    def keyword_frequency(self, group):
+        """Count how many reviews mention each keyword of a group
+
+        Args:
+            group (str): 'positive' or 'negative'
+
+        Returns:
+            dict: Keyword to number of reviews mentioning it
+        """
+        counts = np.bincount(self.keyword_indices, minlength=len(self.keyword_vocab))
+        return {
+            kw: int(counts[c]) for c, (g, kw) in enumerate(self.keyword_vocab)
+            if g == group and counts[c]
+        }
+
+class AnalyzedReviewBatchBuilder:
+    """Accumulates analyzed reviews row by row and builds an AnalyzedReviewBatch"""
+
+    def __init__(self, keyword_vocab=None):
+        """Initialize the builder
+
+        Args:
+            keyword_vocab (list, optional): Known (group, keyword) pairs, in column order.
+                Keywords not listed are added as they are seen.
+        """
+        self.keyword_vocab = list(keyword_vocab or [])
+        self._columns = {entry: c for c, entry in enumerate(self.keyword_vocab)}
+        self.review_ids = []
+        self.texts = []
+        self.ratings = []
+        self.scores = []
+        self.categories = []
+        self.keyword_indptr = [0]
+        self.keyword_indices = []
+
+    def append(self, review_id, text, rating, sentiment_scores, sentiment_category,
+               positive_keywords, negative_keywords):
+        """Add one analyzed review
+
+        Args:
+            review_id (str): Review ID
+            text (str): Review text
+            rating (float): Star rating
+            sentiment_scores (dict): VADER scores with 'neg', 'neu', 'pos' and 'compound'
+            sentiment_category (str): 'positive', 'negative' or 'neutral'
+            positive_keywords (list): Positive keywords found in the review
+            negative_keywords (list): Negative keywords found in the review
+        """
+        self.review_ids.append(review_id)
+        self.texts.append(text)
+        self.ratings.append(rating)
+        self.scores.append((
+            sentiment_scores['compound'], sentiment_scores['pos'],
+            sentiment_scores['neg'], sentiment_scores['neu']
+        ))
+        self.categories.append(CATEGORY_CODES[sentiment_category])
+        for group, keywords in (('positive', positive_keywords), ('negative', negative_keywords)):
+            for kw in keywords:
+                column = self._columns.get((group, kw))
+                if column is None:
+                    column = self._columns[(group, kw)] = len(self.keyword_vocab)
+                    self.keyword_vocab.append((group, kw))
+                self.keyword_indices.append(column)
+        self.keyword_indptr.append(len(self.keyword_indices))
+
+    def build(self):
+        """Build the batch
+
+        Returns:
+            AnalyzedReviewBatch: The columnar batch
+        """
+        scores = np.array(self.scores, dtype=np.float64).reshape(-1, 4)
+        return AnalyzedReviewBatch(
+            self.review_ids,
+            self.texts,
+            np.array(self.ratings, dtype=np.float64),
+            scores[:, 0].copy(), scores[:, 1].copy(), scores[:, 2].copy(), scores[:, 3].copy(),
+            np.array(self.categories, dtype=np.int8),
+            self.keyword_vocab,
+            np.array(self.keyword_indptr, dtype=np.int64),
+            np.array(self.keyword_indices, dtype=np.int32),
+            list(self.ratings)
+        )
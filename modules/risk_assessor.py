@@ -1,3 +1,7 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 class RiskAssessor:
     def __init__(self):
         # Define risk factors based on underwriting guidelines
@@ -30,7 +34,7 @@ class RiskAssessor:
         categories = [cat['title'].lower() for cat in business_details['categories']]
         category_text = ' '.join(categories)
         
-        print(f"Determining class code for business with categories: {categories}")
+        logger.debug("Determining class code for business with categories: %s", categories)
         
         # Check for alcohol-related phrases - if there are many, it's likely a bar
         alcohol_keywords = ['bar', 'pub', 'tavern', 'brewery', 'cocktail', 'beer', 'wine', 'liquor', 
@@ -97,7 +101,7 @@ class RiskAssessor:
             'restaurant': restaurant_count + name_points['restaurant']
         }
         
-        print(f"Class code scores: {scores}")
+        logger.debug("Class code scores: %s", scores)
         
         # Determine the highest score
         max_score = 0
@@ -116,18 +120,8 @@ class RiskAssessor:
             max_category = 'restaurant'
             
         # Final result
-        if max_category == 'nightclub':
-            print(f"Classified as nightclub with score {max_score}")
-            return self.class_codes['nightclub']
-        elif max_category == 'bar':
-            print(f"Classified as bar with score {max_score}")
-            return self.class_codes['bar']
-        elif max_category == 'fast_food':
-            print(f"Classified as fast food with score {max_score}")
-            return self.class_codes['fast_food']
-        else:
-            print(f"Classified as restaurant with score {max_score}")
-            return self.class_codes['restaurant']
+        logger.debug("Classified as %s with score %s", max_category, max_score)
+        return self.class_codes[max_category]
     
     def assess_risk(self, sentiment_analysis, business_details):
         """Assess risk based on underwriting guidelines"""
@@ -135,16 +129,15 @@ class RiskAssessor:
         positive_percentage = sentiment_analysis.get('positive_percentage', 0)
         negative_percentage = sentiment_analysis.get('negative_percentage', 0)
         
-        # Print for debugging
-        print(f"Risk Assessment - Positive: {positive_percentage}%, Negative: {negative_percentage}%")
+        logger.debug("Risk Assessment - Positive: %s%%, Negative: %s%%", positive_percentage, negative_percentage)
         
         # For safety, ensure we don't have unrealistic percentages (sometimes LLMs give 100% positive)
         if positive_percentage > 95 and sentiment_analysis.get('total_reviews', 0) > 10:
-            print(f"Adjusting suspiciously high positive percentage: {positive_percentage}")
+            logger.debug("Adjusting suspiciously high positive percentage: %s", positive_percentage)
             positive_percentage = 85  # Cap at a more realistic max
             
         if negative_percentage < 5 and sentiment_analysis.get('total_reviews', 0) > 10:
-            print(f"Adjusting suspiciously low negative percentage: {negative_percentage}")
+            logger.debug("Adjusting suspiciously low negative percentage: %s", negative_percentage)
             negative_percentage = 5  # Ensure some minimum negative percentage
         
         # Check for critical negative keywords with safe dictionary access
@@ -158,7 +151,7 @@ class RiskAssessor:
             ]
             critical_keywords_found = len(critical_keywords) > 0
             
-        print(f"Critical keywords found: {critical_keywords_found}, Keywords: {critical_keywords}")
+        logger.debug("Critical keywords found: %s, Keywords: %s", critical_keywords_found, critical_keywords)
         
         # Determine risk level based on sentiment and keywords
         # Use a more nuanced approach that doesn't just rely on thresholds
@@ -195,7 +188,7 @@ class RiskAssessor:
             risk_level = 'high'
             confidence = 0.80
             
-        print(f"Risk level determined as '{risk_level}' with score {risk_score} and confidence {confidence}")
+        logger.info("Risk level determined as '%s' with score %d and confidence %s", risk_level, risk_score, confidence)
         
         # Determine eligibility based on risk level
         class_code = self.determine_class_code(business_details)
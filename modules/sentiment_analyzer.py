@@ -1,14 +1,117 @@
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import hashlib
+import json
+import logging
+import os
 import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from modules.cache import TieredCache
+from modules.keyword_matcher import KeywordMatcher
+from modules.log_utils import log_sampled
+from modules.review_batch import AnalyzedReviewBatch, AnalyzedReviewBatchBuilder
+from modules.tracing import span, current_span
+
+logger = logging.getLogger(__name__)
 
 # Download NLTK resources
 nltk.download('vader_lexicon', quiet=True)
 
+# Persistent pool for parallel VADER scoring, shared by all SentimentAnalyzer instances
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+# Analyzer loaded once per worker process by the pool initializer
+_worker_sid = None
+
+def _init_worker():
+    """Load the VADER lexicon once in each worker process"""
+    global _worker_sid
+    _worker_sid = SentimentIntensityAnalyzer()
+
+def _score_chunk(texts):
+    """Score one chunk of texts in a worker process"""
+    return [_polarity_scores(_worker_sid, text) for text in texts]
+
+def _polarity_scores(sid, text):
+    """Score one text, returning the error message instead of raising"""
+    try:
+        return sid.polarity_scores(text)
+    except Exception as e:
+        return str(e)
+
+def get_sentiment_process_pool(max_workers=None):
+    """Get the shared sentiment scoring process pool, creating it on first use
+    
+    The pool size is fixed by the first caller; later max_workers values are ignored.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+    return _process_pool
+
+def shutdown_sentiment_process_pool():
+    """Shut down the shared process pool; it is recreated on next use"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# Bump when the scoring or keyword extraction logic changes so memoized analyses are recomputed
+ANALYZER_VERSION = 1
+
+# Persistent memo of per-review analyses, shared by all SentimentAnalyzer instances
+_sentiment_memo = None
+_sentiment_memo_lock = threading.Lock()
+
+def get_sentiment_memo():
+    """Get the shared per-review analysis memo, or None when SENTIMENT_MEMO_ENABLED is off
+    
+    Bounded by SENTIMENT_MEMO_MAX_ENTRIES in memory; SENTIMENT_MEMO_PATH adds a
+    SQLite tier so analyses survive restarts.
+    """
+    global _sentiment_memo
+    if os.getenv('SENTIMENT_MEMO_ENABLED', 'True').lower() not in ('true', '1', 't'):
+        return None
+    if _sentiment_memo is None:
+        with _sentiment_memo_lock:
+            if _sentiment_memo is None:
+                max_entries = int(os.getenv('SENTIMENT_MEMO_MAX_ENTRIES', 50000))
+                _sentiment_memo = TieredCache(
+                    max_entries=max_entries,
+                    path=os.getenv('SENTIMENT_MEMO_PATH') or None,
+                    max_disk_entries=int(os.getenv('SENTIMENT_MEMO_MAX_DISK_ENTRIES', max_entries * 10)),
+                    namespace="review_sentiment"
+                )
+    return _sentiment_memo
+
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, parallel=None, parallel_threshold=None, max_workers=None, memo=None):
+        """Set up the analyzer
+        
+        Args:
+            parallel (bool, optional): Score large review sets on a process pool. Defaults to SENTIMENT_PARALLEL.
+            parallel_threshold (int, optional): Minimum number of reviews scored in parallel.
+                Defaults to SENTIMENT_PARALLEL_THRESHOLD.
+            max_workers (int, optional): Worker processes in the shared pool. Defaults to
+                SENTIMENT_MAX_WORKERS, or the CPU count when unset.
+            memo (TieredCache, optional): Per-review analysis memo. Defaults to the shared memo.
+        """
         self.sid = SentimentIntensityAnalyzer()
         
+        # Opt-in multi-core scoring for large review sets
+        if parallel is None:
+            parallel = os.getenv('SENTIMENT_PARALLEL', 'False').lower() in ('true', '1', 't')
+        self.parallel = parallel
+        self.parallel_threshold = parallel_threshold or int(os.getenv('SENTIMENT_PARALLEL_THRESHOLD', 2000))
+        self.parallel_chunk_size = int(os.getenv('SENTIMENT_CHUNK_SIZE', 250))
+        self.max_workers = max_workers or int(os.getenv('SENTIMENT_MAX_WORKERS', 0)) or None
+        
         # Expanded keywords to look for in reviews
         self.positive_indicators = [
             'professional', 'clean', 'safety', 'maintained', 'trained',
@@ -40,29 +143,90 @@ class SentimentAnalyzer:
             'spacious', 'proper', 'safety', 'following protocol', 'equipment',
             'ventilation', 'storage', 'professional', 'hygiene', 'compliance'
         ]
+        
+        # Compile the review indicators once so each review is scanned in a single pass
+        self.review_keyword_matcher = KeywordMatcher({
+            'positive': self.positive_indicators,
+            'negative': self.negative_indicators
+        })
+        
+        # Memoized analyses are only reused by analyzers with the same logic and indicators
+        self.memo = memo if memo is not None else get_sentiment_memo()
+        self.analyzer_version = hashlib.sha256(json.dumps(
+            [ANALYZER_VERSION, self.positive_indicators, self.negative_indicators]
+        ).encode('utf-8')).hexdigest()[:16]
     
     def analyze_reviews(self, reviews):
         """Analyze sentiment and extract key information from reviews"""
-        results = []
+        return self.analyze_reviews_batch(reviews).to_records()
+    
+    def analyze_reviews_batch(self, reviews):
+        """Analyze reviews into a columnar AnalyzedReviewBatch (see modules.review_batch)"""
+        with span("sentiment.analyze_reviews", reviews=len(reviews)):
+            return self._analyze_reviews_batch(reviews)
+    
+    def _analyze_reviews_batch(self, reviews):
+        """Body of analyze_reviews_batch, run inside its trace span"""
+        results = AnalyzedReviewBatchBuilder(
+            [('positive', kw) for kw in self.positive_indicators] +
+            [('negative', kw) for kw in self.negative_indicators]
+        )
         
         total_reviews = len(reviews)
-        print(f"Analyzing {total_reviews} reviews for sentiment")
+        logger.debug("Analyzing %d reviews for sentiment", total_reviews)
         
         # For large review sets, show progress
         progress_step = max(1, total_reviews // 10)
         progress_thresholds = [i * progress_step for i in range(1, 11)]
         
-        # Process in batches for large sets
-        processed_count = 0
-        batch_size = 50
-        
-        # Process all reviews
+        # Make sure we have text to analyze
+        scorable = []
         for i, review in enumerate(reviews):
             try:
-                # Make sure we have text to analyze
                 if 'text' not in review or not review['text']:
-                    print(f"Review {i} missing text field, skipping")
+                    log_sampled(logger, logging.WARNING, "sentiment.review_missing_text",
+                                "Review %d missing text field, skipping", i)
                     continue
+                scorable.append((i, review))
+            except Exception as e:
+                log_sampled(logger, logging.WARNING, "sentiment.review_error", "Error analyzing review %d: %s", i, e)
+        
+        # Reuse memoized analyses so only new or changed reviews are scored
+        analyses = [None] * len(scorable)
+        memo_keys = [self._memo_key(review) for _, review in scorable]
+        if self.memo is not None:
+            analyses = [self.memo.get(key) for key in memo_keys]
+        missing = [n for n, analysis in enumerate(analyses) if analysis is None]
+        current_span().set(memo_hits=len(scorable) - len(missing))
+        if len(missing) < len(scorable):
+            logger.debug("Reusing %d memoized review analyses", len(scorable) - len(missing))
+        
+        # Calculate sentiment scores for the remaining reviews up front, across worker
+        # processes when parallel scoring is enabled and the set is large enough
+        sentiments = self.score_texts([scorable[n][1]['text'] for n in missing])
+        for n, sentiment in zip(missing, sentiments):
+            if isinstance(sentiment, str):
+                analyses[n] = sentiment
+                continue
+            
+            # Extract positive and negative keywords in one pass over the text
+            keyword_matches = self.review_keyword_matcher.find_all(scorable[n][1]['text'])
+            analyses[n] = {
+                'sentiment_scores': sentiment,
+                'positive_keywords': keyword_matches['positive'],
+                'negative_keywords': keyword_matches['negative']
+            }
+            if self.memo is not None:
+                self.memo.set(memo_keys[n], analyses[n])
+        
+        processed_count = 0
+        
+        # Process all reviews
+        for (i, review), analysis in zip(scorable, analyses):
+            try:
+                if isinstance(analysis, str):
+                    raise ValueError(analysis)
+                sentiment = analysis['sentiment_scores']
                 
                 # Extract the rating - convert to a number if it's a string
                 rating = review.get('rating', 3)  # Default to neutral
@@ -72,33 +236,6 @@ class SentimentAnalyzer:
                     except ValueError:
                         rating = 3  # Default if can't convert
                 
-                # Calculate sentiment scores
-                sentiment = self.sid.polarity_scores(review['text'])
-                
-                # Extract keywords - more efficient with longer lists
-                pos_keywords = []
-                neg_keywords = []
-                
-                # Convert to lowercase once for efficiency
-                review_text_lower = review['text'].lower()
-                
-                # For very large review sets, optimize keyword extraction
-                if total_reviews > 100:
-                    # Use a more efficient algorithm for keyword extraction
-                    for word in self.positive_indicators:
-                        if word.lower() in review_text_lower:
-                            pos_keywords.append(word)
-                    
-                    for word in self.negative_indicators:
-                        if word.lower() in review_text_lower:
-                            neg_keywords.append(word)
-                else:
-                    # Original approach for smaller sets
-                    pos_keywords = [word for word in self.positive_indicators 
-                                  if word.lower() in review_text_lower]
-                    neg_keywords = [word for word in self.negative_indicators 
-                                  if word.lower() in review_text_lower]
-                
                 # Determine sentiment category - consider rating as well as text sentiment
                 # This gives more balanced results between positive, neutral and negative
                 if sentiment['compound'] >= 0.2 or rating >= 4:
@@ -112,36 +249,70 @@ class SentimentAnalyzer:
                 review_id = review.get('id', f"review_{i}")
                 
                 # Add the analyzed review
-                results.append({
-                    'review_id': review_id,
-                    'rating': rating,
-                    'text': review['text'],
-                    'sentiment_scores': sentiment,
-                    'sentiment_category': sentiment_category,
-                    'positive_keywords': pos_keywords,
-                    'negative_keywords': neg_keywords
-                })
+                results.append(
+                    review_id, review['text'], rating, sentiment, sentiment_category,
+                    analysis['positive_keywords'], analysis['negative_keywords']
+                )
                 
                 # Update processed count
                 processed_count += 1
                 
                 # Show progress for large review sets
                 if total_reviews > 10 and processed_count in progress_thresholds:
-                    print(f"Progress: {processed_count}/{total_reviews} reviews analyzed ({int(processed_count/total_reviews*100)}%)")
+                    logger.debug("Progress: %d/%d reviews analyzed (%d%%)",
+                                 processed_count, total_reviews, processed_count * 100 // total_reviews)
                 
             except Exception as e:
-                print(f"Error analyzing review {i}: {str(e)}")
+                log_sampled(logger, logging.WARNING, "sentiment.review_error", "Error analyzing review %d: %s", i, e)
                 continue
                 
-        print(f"Completed sentiment analysis on {len(results)} reviews")
-        return results
+        batch = results.build()
+        logger.info("Completed sentiment analysis on %d reviews", len(batch))
+        return batch
+    
+    def _memo_key(self, review):
+        """Build the memo key from the review ID, a hash of its text and the analyzer version"""
+        text_hash = hashlib.sha256(str(review['text']).encode('utf-8')).hexdigest()
+        return f"{self.analyzer_version}:{review.get('id', '')}:{text_hash}"
+    
+    def score_texts(self, texts):
+        """Get VADER polarity scores for a list of texts, in input order
+        
+        Sets of at least parallel_threshold texts are split into chunks and
+        scored on the shared process pool when parallel scoring is enabled;
+        smaller sets (and any pool failure) are scored serially in this process.
+        Each result is a polarity_scores dict, or an error message string if
+        that text could not be scored.
+        """
+        parallel = self.parallel and len(texts) >= self.parallel_threshold
+        with span("vader.score", texts=len(texts), parallel=parallel):
+            if not parallel:
+                return [_polarity_scores(self.sid, text) for text in texts]
+            return self._score_texts_parallel(texts)
+    
+    def _score_texts_parallel(self, texts):
+        """Score texts in chunks on the process pool, falling back to serial scoring (see score_texts)"""
+        chunks = [texts[start:start + self.parallel_chunk_size]
+                  for start in range(0, len(texts), self.parallel_chunk_size)]
+        logger.debug("Scoring %d reviews in %d chunks on the sentiment process pool", len(texts), len(chunks))
+        try:
+            pool = get_sentiment_process_pool(self.max_workers)
+            sentiments = []
+            # map() yields chunk results in submission order
+            for chunk_sentiments in pool.map(_score_chunk, chunks):
+                sentiments.extend(chunk_sentiments)
+            return sentiments
+        except Exception as e:
+            logger.warning("Parallel sentiment scoring failed, scoring serially: %s", e)
+            shutdown_sentiment_process_pool()
+            return [_polarity_scores(self.sid, text) for text in texts]
     
     def analyze_image_results(self, image_analyses):
         """Analyze the results from image analysis to extract sentiment and keywords"""
         if not image_analyses:
             return []
             
-        print(f"Analyzing sentiment from {len(image_analyses)} image analyses")
+        logger.debug("Analyzing sentiment from %d image analyses", len(image_analyses))
         results = []
         
         for i, analysis in enumerate(image_analyses):
@@ -175,14 +346,14 @@ class SentimentAnalyzer:
                 })
                 
             except Exception as e:
-                print(f"Error analyzing image {i}: {str(e)}")
+                log_sampled(logger, logging.WARNING, "sentiment.image_error", "Error analyzing image %d: %s", i, e)
                 continue
         
-        print(f"Completed sentiment analysis on {len(results)} images")
+        logger.info("Completed sentiment analysis on %d images", len(results))
         return results
         
     def get_overall_sentiment(self, analyzed_reviews, analyzed_images=None):
-        """Calculate overall sentiment metrics from analyzed reviews and images"""
+        """Calculate overall sentiment metrics from analyzed reviews (a list or an AnalyzedReviewBatch) and images"""
         total_reviews = len(analyzed_reviews)
         if total_reviews == 0:
             return {
@@ -193,40 +364,52 @@ class SentimentAnalyzer:
                 'average_compound_score': 0
             }
             
-        positive_count = sum(1 for r in analyzed_reviews if r['sentiment_category'] == 'positive')
-        negative_count = sum(1 for r in analyzed_reviews if r['sentiment_category'] == 'negative')
-        neutral_count = sum(1 for r in analyzed_reviews if r['sentiment_category'] == 'neutral')
-        
-        # Calculate average sentiment score
-        avg_compound = sum(r['sentiment_scores']['compound'] for r in analyzed_reviews) / total_reviews
-        
-        # Extract all keywords
-        all_positive_keywords = [kw for r in analyzed_reviews for kw in r['positive_keywords']]
-        all_negative_keywords = [kw for r in analyzed_reviews for kw in r['negative_keywords']]
+        if isinstance(analyzed_reviews, AnalyzedReviewBatch):
+            # Columnar batch: all aggregates are vectorised over its arrays
+            category_counts = analyzed_reviews.category_counts()
+            avg_compound = analyzed_reviews.mean_compound()
+            positive_keyword_freq = analyzed_reviews.keyword_frequency('positive')
+            negative_keyword_freq = analyzed_reviews.keyword_frequency('negative')
+        else:
+            # Count categories, sum compound scores and tally keywords in a single pass
+            category_counts = Counter()
+            positive_keyword_freq = Counter()
+            negative_keyword_freq = Counter()
+            compound_total = 0.0
+            for r in analyzed_reviews:
+                category_counts[r['sentiment_category']] += 1
+                compound_total += r['sentiment_scores']['compound']
+                positive_keyword_freq.update(r['positive_keywords'])
+                negative_keyword_freq.update(r['negative_keywords'])
+            
+            # Calculate average sentiment score
+            avg_compound = compound_total / total_reviews
         
-        # Count keyword frequencies
-        positive_keyword_freq = {kw: all_positive_keywords.count(kw) for kw in set(all_positive_keywords)}
-        negative_keyword_freq = {kw: all_negative_keywords.count(kw) for kw in set(all_negative_keywords)}
+        positive_count = category_counts['positive']
+        negative_count = category_counts['negative']
+        neutral_count = category_counts['neutral']
         
         # Process image sentiment if available
         image_sentiment = {}
         if analyzed_images and len(analyzed_images) > 0:
             # Calculate image sentiment statistics
             total_images = len(analyzed_images)
-            img_positive_count = sum(1 for img in analyzed_images if img['sentiment_category'] == 'positive')
-            img_negative_count = sum(1 for img in analyzed_images if img['sentiment_category'] == 'negative')
-            img_neutral_count = sum(1 for img in analyzed_images if img['sentiment_category'] == 'neutral')
-            
-            # Extract all risk and positive factors
-            all_risk_factors = [factor for img in analyzed_images for factor in img['risk_factors']]
-            all_positive_factors = [factor for img in analyzed_images for factor in img['positive_factors']]
+            img_category_counts = Counter()
+            risk_factor_freq = Counter()
+            positive_factor_freq = Counter()
+            img_compound_total = 0.0
+            for img in analyzed_images:
+                img_category_counts[img['sentiment_category']] += 1
+                img_compound_total += img['sentiment_scores']['compound']
+                risk_factor_freq.update(img['risk_factors'])
+                positive_factor_freq.update(img['positive_factors'])
             
-            # Count frequencies
-            risk_factor_freq = {factor: all_risk_factors.count(factor) for factor in set(all_risk_factors)}
-            positive_factor_freq = {factor: all_positive_factors.count(factor) for factor in set(all_positive_factors)}
+            img_positive_count = img_category_counts['positive']
+            img_negative_count = img_category_counts['negative']
+            img_neutral_count = img_category_counts['neutral']
             
             # Calculate average sentiment score
-            img_avg_compound = sum(img['sentiment_scores']['compound'] for img in analyzed_images) / total_images if total_images else 0
+            img_avg_compound = img_compound_total / total_images if total_images else 0
             
             image_sentiment = {
                 'total_images': total_images,
@@ -237,8 +420,8 @@ class SentimentAnalyzer:
                 'negative_percentage': (img_negative_count / total_images) * 100 if total_images else 0,
                 'neutral_percentage': (img_neutral_count / total_images) * 100 if total_images else 0,
                 'average_compound_score': img_avg_compound,
-                'risk_factor_frequency': risk_factor_freq,
-                'positive_factor_frequency': positive_factor_freq
+                'risk_factor_frequency': dict(risk_factor_freq),
+                'positive_factor_frequency': dict(positive_factor_freq)
             }
         
         # Return combined sentiment data
@@ -251,8 +434,8 @@ class SentimentAnalyzer:
             'negative_percentage': (negative_count / total_reviews) * 100,
             'neutral_percentage': (neutral_count / total_reviews) * 100,
             'average_compound_score': avg_compound,
-            'positive_keyword_frequency': positive_keyword_freq,
-            'negative_keyword_frequency': negative_keyword_freq
+            'positive_keyword_frequency': dict(positive_keyword_freq),
+            'negative_keyword_frequency': dict(negative_keyword_freq)
         }
         
         # Add image sentiment if available
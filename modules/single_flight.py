@@ -0,0 +1,79 @@
+import copy
+import threading
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait for it and receive its
+    result, or its exception, instead of running the function again. Once the
+    call completes the key is released, so later calls run afresh. Results
+    are not cached beyond the in-flight call.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key, func, copy_result=copy.copy):
+        """Run func, or wait for the in-flight call with the same key
+
+        Args:
+            key (str): Identifier of the work, e.g. a normalised business ID
+            func (callable): Zero-argument function doing the work
+            copy_result (callable, optional): Applied to the shared result for every
+                caller, the leader included, so no two callers share one mutable
+                object. Defaults to copy.copy (a shallow copy); None returns it as is.
+
+        Returns:
+            The result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return copy_result(call.result) if copy_result else call.result
+
+    def in_flight(self):
+        """Get the number of calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Get execution counters
+
+        Returns:
+            dict: executions (calls that ran func), coalesced (calls that shared one) and in_flight
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
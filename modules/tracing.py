@@ -0,0 +1,236 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# The span that new spans are nested under; unset outside a trace
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+_export_lock = threading.Lock()
+
+def tracing_enabled():
+    """Check TRACING_ENABLED (on by default)"""
+    return os.getenv('TRACING_ENABLED', 'True').lower() in ('true', '1', 't')
+
+def trace_in_report():
+    """Check TRACE_IN_REPORT, which embeds each request's trace in its report"""
+    return os.getenv('TRACE_IN_REPORT', 'False').lower() in ('true', '1', 't')
+
+class Span:
+    """One timed operation within a trace, with attributes and child spans"""
+
+    def __init__(self, trace, name, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+
+    def set(self, **attributes):
+        """Add or update attributes of the span"""
+        self.attributes.update(attributes)
+
+    def add(self, name, amount=1):
+        """Increase a numeric attribute, e.g. a count of retries"""
+        self.attributes[name] = self.attributes.get(name, 0) + amount
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000.0
+
+    def to_dict(self):
+        """Convert the span and its children to JSON-serializable dicts
+
+        Returns:
+            dict: name, start_ms (since the trace started), duration_ms, thread,
+                attributes, error (if it raised) and children
+        """
+        with self.trace._lock:
+            children = list(self.children)
+        span = {
+            "name": self.name,
+            "start_ms": round((self.start - self.trace.root.start) * 1000.0, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "thread": self.thread,
+            "attributes": self.attributes
+        }
+        if self.error is not None:
+            span["error"] = self.error
+        if children:
+            span["children"] = [child.to_dict() for child in sorted(children, key=lambda c: c.start)]
+        return span
+
+class _NoopSpan:
+    """Stand-in returned by span() outside a trace, so instrumentation costs almost nothing"""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name, amount=1):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """A tree of spans recorded for one request
+
+    Spans started in the same context nest under the innermost open span.
+    Worker threads only join the trace when their work is submitted through
+    propagate() (thread pools do not copy context variables on their own).
+    """
+
+    def __init__(self, name, attributes=None):
+        self.trace_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self.root = Span(self, name, attributes)
+
+    def to_dict(self):
+        """Convert the trace to JSON-serializable dicts
+
+        Returns:
+            dict: trace_id, duration_ms, the span tree and a per-name summary
+        """
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "spans": self.root.to_dict(),
+            "summary": self.summary()
+        }
+
+    def summary(self):
+        """Aggregate span timings by name, slowest total first
+
+        Returns:
+            dict: Span name to count, total_ms and max_ms
+        """
+        totals = {}
+        pending = [self.root]
+        while pending:
+            span = pending.pop()
+            with self._lock:
+                pending.extend(span.children)
+            entry = totals.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += span.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], span.duration_ms)
+        ordered = sorted(totals.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            name: {"count": entry["count"], "total_ms": round(entry["total_ms"], 3), "max_ms": round(entry["max_ms"], 3)}
+            for name, entry in ordered
+        }
+
+@contextmanager
+def start_trace(name, **attributes):
+    """Record a new trace for the code run inside the with block
+
+    Finished traces are appended to TRACE_EXPORT_PATH as JSON lines when it is set.
+
+    Args:
+        name (str): Name of the root span, e.g. the route
+        **attributes: Attributes of the root span
+
+    Yields:
+        Trace: The trace, or None when TRACING_ENABLED is off
+    """
+    if not tracing_enabled():
+        yield None
+        return
+
+    trace = Trace(name, attributes)
+    token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = type(e).__name__ + ": " + str(e)
+        raise
+    finally:
+        trace.root.end = time.perf_counter()
+        _current_span.reset(token)
+        export_trace(trace)
+
+@contextmanager
+def span(name, **attributes):
+    """Time the code run inside the with block as a span of the current trace
+
+    Outside a trace this yields a no-op span and records nothing.
+
+    Args:
+        name (str): Span name, e.g. 'llm.call' or 'upstream.yelp'
+        **attributes: Initial span attributes
+
+    Yields:
+        Span: The span, whose attributes can be set while it runs
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield _NOOP_SPAN
+        return
+
+    child = Span(parent.trace, name, attributes)
+    with parent.trace._lock:
+        parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__ + ": " + str(e)
+        raise
+    finally:
+        child.end = time.perf_counter()
+        _current_span.reset(token)
+
+def current_span():
+    """Get the innermost open span, or a no-op span outside a trace"""
+    return _current_span.get() or _NOOP_SPAN
+
+def current_trace_id():
+    """Get the ID of the trace the current context belongs to, or None outside a trace"""
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None else None
+
+def propagate(func):
+    """Bind func to a copy of the current context so it joins the current trace on another thread
+
+    Call this at submit time, e.g. executor.submit(propagate(func), *args); each
+    call takes its own copy, so the result may run concurrently with others.
+
+    Args:
+        func (callable): The work to run
+
+    Returns:
+        callable: func running in the copied context
+    """
+    if _current_span.get() is None:
+        return func
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return run
+
+def export_trace(trace):
+    """Append a finished trace to TRACE_EXPORT_PATH as one JSON line, if it is set
+
+    Args:
+        trace (Trace): The finished trace
+    """
+    path = os.getenv('TRACE_EXPORT_PATH')
+    if not path:
+        return
+    line = json.dumps(trace.to_dict(), default=str)
+    try:
+        with _export_lock:
+            with open(path, 'a') as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning("Error exporting trace: %s", e)